@@ -0,0 +1,66 @@
+# app/api/conditional.py
+import json
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi.responses import Response
+
+from app.database.database import Database
+
+# Generations restart at 0 with the process; the epoch keeps ETags from before a restart from matching.
+_ETAG_EPOCH = secrets.token_hex(4)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match holds "*" or a comma separated list of (possibly weak) ETags; comparison is weak.
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tag = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == tag:
+            return True
+    return False
+
+
+class ResponseCache:
+    # Serialized GET responses, each valid for one database generation of the tables it was read from.
+    # Unchanged configuration is answered from memory: 304 for a matching If-None-Match, else the stored bytes.
+    def __init__(self, max_entries: int = 256) -> None:
+        self._max_entries = int(max_entries)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[int, bytes]]" = OrderedDict()
+
+    def respond(self, db: Database, tables: Tuple[str, ...], key: str, if_none_match: Optional[str],
+                build: Callable[[], Any]) -> Response:
+        # The generation is read before build(): a write committed meanwhile moves it on, so the stored body
+        # is never older than its generation.
+        generation = db.generation(*tables)
+        etag = f'"{_ETAG_EPOCH}-{generation}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        cache_key = (id(db), key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(cache_key)
+                return Response(content=entry[1], media_type="application/json", headers=headers)
+
+        body = json.dumps(build(), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._entries[cache_key] = (generation, body)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+RESPONSE_CACHE = ResponseCache()
@@ -0,0 +1,59 @@
+# app/api/routers/config_router.py
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.api.routers.fans_router import FanCreateIn
+from app.api.routers.sensors_router import SensorCreateIn
+from app.api.routers.settings_router import SettingsUpdateIn
+from app.database.database import Database
+from app.services.config_bundle_service import ConfigBundleService
+from app.services.runtime_state import RuntimeState
+
+router = APIRouter(prefix="/config", tags=["config"])
+
+
+class BundlePointIn(BaseModel):
+    temp_c: float
+    duty_percent: int = Field(ge=0, le=100)
+
+
+class BundleCurveIn(BaseModel):
+    name: str = Field(min_length=1)
+    # Name of the fan driven by this curve; unset means the first fan.
+    fan: str | None = None
+    active: bool = False
+    # Unset keeps the points of an existing curve.
+    points: list[BundlePointIn] | None = None
+
+
+class BundleSensorIn(SensorCreateIn):
+    # Unset leaves the curves of the sensor as they are.
+    curves: list[BundleCurveIn] | None = None
+
+
+class ConfigBundleIn(BaseModel):
+    # Same shape as GET /config/export. Unset sections are not touched.
+    settings: SettingsUpdateIn | None = None
+    fans: list[FanCreateIn] | None = None
+    sensors: list[BundleSensorIn] | None = None
+
+
+def _db() -> Database:
+    return RuntimeState.db()
+
+
+@router.get("/export")
+def export_config() -> dict:
+    return ConfigBundleService(db=_db()).export_bundle()
+
+
+@router.post("/import")
+def import_config(payload: ConfigBundleIn, replace: bool = False) -> dict:
+    # Applies the whole bundle in one transaction. replace=true also deletes fans, sensors and curves that
+    # are missing from the given sections and resets missing settings to their defaults.
+    bundle = payload.model_dump(exclude={"settings"})
+    bundle["settings"] = payload.settings.model_dump(exclude_none=True) if payload.settings else None
+    try:
+        return ConfigBundleService(db=_db()).apply_bundle(bundle, replace=replace)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
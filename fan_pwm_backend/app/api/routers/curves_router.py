@@ -1,20 +1,30 @@
 # app/api/routers/curves_router.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 
+from app.api.conditional import RESPONSE_CACHE
 from app.database.database import Database
 from app.services.runtime_state import RuntimeState
 from app.core.units import display_to_c
 
 router = APIRouter(tags=["curves"])
 
+# Tables behind the cached curve and point lists: point changes touch the curve's updated_at, and deleting a
+# sensor removes its curves and points without a change notification for those tables.
+_CURVE_TABLES = ("sensors", "curves", "curve_points")
+
 
 class CurveCreateIn(BaseModel):
     name: str = Field(min_length=1)
+    # Fan driven by this curve; unset means the first fan.
+    fan_id: int | None = None
 
 
 class CurveUpdateIn(BaseModel):
     name: str | None = Field(default=None, min_length=1)
+    # Leaving it out keeps the fan; null moves the curve back to the first fan.
+    fan_id: int | None = None
 
 
 class PointCreateIn(BaseModel):
@@ -36,14 +46,16 @@ def _db() -> Database:
 
 
 @router.get("/sensors/{sensor_id}/curves")
-def list_curves(sensor_id: int) -> list[dict]:
-    return _db().curves.list(sensor_id=sensor_id)
+def list_curves(sensor_id: int, if_none_match: str | None = Header(default=None)) -> Response:
+    db = _db()
+    return RESPONSE_CACHE.respond(db, _CURVE_TABLES, f"/sensors/{sensor_id}/curves", if_none_match,
+                                  lambda: db.curves.list(sensor_id=sensor_id))
 
 
 @router.post("/sensors/{sensor_id}/curves")
 def create_curve(sensor_id: int, payload: CurveCreateIn) -> dict:
     try:
-        return _db().curves.create(sensor_id=sensor_id, name=payload.name)
+        return _db().curves.create(sensor_id=sensor_id, name=payload.name, fan_id=payload.fan_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -59,7 +71,8 @@ def get_curve(curve_id: int) -> dict:
 @router.patch("/curves/{curve_id}")
 def update_curve(curve_id: int, payload: CurveUpdateIn) -> dict:
     try:
-        return _db().curves.update(curve_id=curve_id, name=payload.name)
+        fields = payload.model_dump(exclude_unset=True)
+        return _db().curves.update(curve_id=curve_id, **fields)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -81,8 +94,10 @@ def activate_curve(curve_id: int) -> dict:
 
 
 @router.get("/curves/{curve_id}/points")
-def list_points(curve_id: int) -> list[dict]:
-    return _db().curve_points.list(curve_id=curve_id)
+def list_points(curve_id: int, if_none_match: str | None = Header(default=None)) -> Response:
+    db = _db()
+    return RESPONSE_CACHE.respond(db, _CURVE_TABLES, f"/curves/{curve_id}/points", if_none_match,
+                                  lambda: db.curve_points.list(curve_id=curve_id))
 
 
 @router.post("/curves/{curve_id}/points")
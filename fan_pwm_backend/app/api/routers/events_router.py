@@ -0,0 +1,125 @@
+# app/api/routers/events_router.py
+import base64
+import csv
+import io
+import itertools
+import json
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.database.database import Database
+from app.database.schemas.events import EventCursor
+from app.services.runtime_state import RuntimeState
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+_CSV_FIELDS = ("id", "level", "message", "context", "count", "created_at", "last_at")
+
+# Rows per chunk written to the response.
+_EXPORT_CHUNK_ROWS = 500
+
+
+def _db() -> Database:
+    return RuntimeState.db()
+
+
+@router.get("")
+def list_events(
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    order: str = Query(default="desc", pattern="^(asc|desc)$"),
+    level: str | None = Query(default=None),
+    message: str | None = Query(default=None),
+    start_ts: float | None = Query(default=None, description="Unix seconds, inclusive"),
+    end_ts: float | None = Query(default=None, description="Unix seconds, inclusive"),
+    q: str | None = Query(default=None, description="Full-text search over context (FTS5 syntax)"),
+) -> dict:
+    # Keyset pagination on (created_at, id): pages stay stable while new events arrive and deep pages cost
+    # the same as the first one. Filters must stay the same while following next_cursor.
+    _check_range(start_ts, end_ts)
+    try:
+        items, next_cursor = _db().events.query(
+            limit=limit, after=_decode_cursor(cursor) if cursor else None, ascending=order == "asc",
+            level=level, message=message, start_ts=start_ts, end_ts=end_ts, search=q,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        # Search index still being built after an upgrade.
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"items": items, "next_cursor": _encode_cursor(next_cursor) if next_cursor else None}
+
+
+@router.get("/export")
+def export_events(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    order: str = Query(default="asc", pattern="^(asc|desc)$"),
+    level: str | None = Query(default=None),
+    message: str | None = Query(default=None),
+    start_ts: float | None = Query(default=None),
+    end_ts: float | None = Query(default=None),
+    q: str | None = Query(default=None),
+) -> StreamingResponse:
+    # Streams all matching events; rows are read and written in chunks, never collected in memory.
+    _check_range(start_ts, end_ts)
+    rows = _db().events.iter_query(ascending=order == "asc", level=level, message=message,
+                                   start_ts=start_ts, end_ts=end_ts, search=q)
+    # Runs the query now, so that a bad search term is still a 400 and not a broken stream.
+    try:
+        first = next(rows, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if first is not None:
+        rows = itertools.chain((first,), rows)
+
+    if format == "csv":
+        return StreamingResponse(_csv_chunks(rows), media_type="text/csv",
+                                 headers={"Content-Disposition": 'attachment; filename="events.csv"'})
+    return StreamingResponse(_ndjson_chunks(rows), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": 'attachment; filename="events.ndjson"'})
+
+
+def _ndjson_chunks(rows: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    while True:
+        batch = list(itertools.islice(rows, _EXPORT_CHUNK_ROWS))
+        if not batch:
+            return
+        yield "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in batch).encode("utf-8")
+
+
+def _csv_chunks(rows: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=_CSV_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    while True:
+        batch = list(itertools.islice(rows, _EXPORT_CHUNK_ROWS))
+        writer.writerows(batch)
+        if buf.tell():
+            yield buf.getvalue().encode("utf-8")
+        if not batch:
+            return
+        buf.seek(0)
+        buf.truncate()
+
+
+def _check_range(start_ts: Optional[float], end_ts: Optional[float]) -> None:
+    if start_ts is not None and end_ts is not None and end_ts < start_ts:
+        raise HTTPException(status_code=400, detail="end_ts must be >= start_ts")
+
+
+def _encode_cursor(cursor: EventCursor) -> str:
+    raw = f"{cursor[0]!r}:{cursor[1]}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(value: str) -> EventCursor:
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode("ascii")
+        created_at, event_id = raw.split(":")
+        return float(created_at), int(event_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,81 @@
+# app/api/routers/fans_router.py
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.database.database import Database
+from app.services.runtime_state import RuntimeState
+
+router = APIRouter(prefix="/fans", tags=["fans"])
+
+
+class FanCreateIn(BaseModel):
+    name: str = Field(min_length=1)
+    pwm_chip: str = Field(min_length=1)
+    pwm_channel: int = Field(ge=0)
+    # Unset values follow the global settings.
+    frequency_hz: int | None = Field(default=None, gt=0)
+    kickstart_enabled: bool | None = None
+    kickstart_duty_percent: int | None = Field(default=None, ge=0, le=100)
+    kickstart_ms: int | None = Field(default=None, ge=0, le=5000)
+    enabled: bool = True
+
+
+class FanUpdateIn(BaseModel):
+    name: str | None = Field(default=None, min_length=1)
+    pwm_chip: str | None = Field(default=None, min_length=1)
+    pwm_channel: int | None = Field(default=None, ge=0)
+    # An explicit null resets the value to the global setting.
+    frequency_hz: int | None = Field(default=None, gt=0)
+    kickstart_enabled: bool | None = None
+    kickstart_duty_percent: int | None = Field(default=None, ge=0, le=100)
+    kickstart_ms: int | None = Field(default=None, ge=0, le=5000)
+    enabled: bool | None = None
+
+
+def _db() -> Database:
+    return RuntimeState.db()
+
+
+@router.get("")
+def list_fans() -> list[dict]:
+    return _db().fans.list()
+
+
+@router.post("")
+def create_fan(payload: FanCreateIn) -> dict:
+    try:
+        return _db().fans.create(**payload.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{fan_id}")
+def get_fan(fan_id: int) -> dict:
+    try:
+        return _db().fans.get(fan_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.patch("/{fan_id}")
+def update_fan(fan_id: int, payload: FanUpdateIn) -> dict:
+    fields = payload.model_dump(exclude_unset=True)
+    try:
+        return _db().fans.update(
+            fan_id=fan_id,
+            name=fields.pop("name", None),
+            pwm_chip=fields.pop("pwm_chip", None),
+            pwm_channel=fields.pop("pwm_channel", None),
+            enabled=fields.pop("enabled", None),
+            **fields,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/{fan_id}")
+def delete_fan(fan_id: int) -> dict:
+    try:
+        return _db().fans.delete(fan_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,27 @@
+# app/api/routers/history_router.py
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core.time_utils import now_ts
+from app.services.runtime_state import RuntimeState
+
+router = APIRouter(tags=["history"])
+
+
+@router.get("/history")
+def history(
+    start_ts: float | None = Query(default=None, description="Unix seconds; defaults to one hour ago"),
+    end_ts: float | None = Query(default=None, description="Unix seconds; defaults to now"),
+    points: int = Query(default=500, ge=2, le=5000),
+    method: str = Query(default="minmax", pattern="^(minmax|lttb)$"),
+) -> dict:
+    try:
+        telemetry = RuntimeState.history()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if start_ts is None:
+        start_ts = (end_ts if end_ts is not None else now_ts()) - 3600.0
+    if end_ts is not None and end_ts < start_ts:
+        raise HTTPException(status_code=400, detail="end_ts must be >= start_ts")
+
+    return telemetry.query(start_ts=start_ts, end_ts=end_ts, max_points=points, method=method)
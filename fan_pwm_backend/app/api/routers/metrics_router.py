@@ -0,0 +1,33 @@
+# app/api/routers/metrics_router.py
+import time
+
+from fastapi import APIRouter, Request, Response
+
+from app.services.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+_http_duration = REGISTRY.histogram("fan_http_request_duration_seconds", "HTTP request latency per route.",
+                                    ("method", "route"))
+_http_requests = REGISTRY.counter("fan_http_requests_total", "HTTP requests per route and status.",
+                                  ("method", "route", "status"))
+
+
+@router.get("/metrics")
+def metrics() -> Response:
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+async def http_metrics_middleware(request: Request, call_next):
+    # Labels use the route template (e.g. /sensors/{sensor_id}) so the number of series stays bounded.
+    started = time.perf_counter_ns()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or "unmatched"
+        _http_duration.labels(request.method, path).observe_ns(time.perf_counter_ns() - started)
+        _http_requests.labels(request.method, path, str(status)).inc()
@@ -0,0 +1,61 @@
+# app/api/routers/replay_router.py
+import math
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from app.api.routers.curves_router import PointCreateIn
+from app.api.routers.settings_router import SettingsUpdateIn
+from app.core.units import display_to_c
+from app.services.runtime_state import RuntimeState
+from app.services.trace_replay import TraceReplay
+
+router = APIRouter(prefix="/replay", tags=["replay"])
+
+
+class ReplayIn(BaseModel):
+    # Raw readings in Celsius per sensor name, one per tick; null is a failed read.
+    sensors: Dict[str, List[float | None]] = Field(min_length=1)
+    # Unix seconds per tick. Without it, ticks are interval_s apart starting at start_ts.
+    ts: List[float] | None = None
+    interval_s: float = Field(default=1.0, gt=0)
+    start_ts: float = 0.0
+    # What-if changes; nothing is stored. Curve points replace the points of an active curve (temps in ?unit=).
+    settings: SettingsUpdateIn | None = None
+    curve_points: Dict[int, List[PointCreateIn]] = Field(default_factory=dict)
+    # Return the per-tick series (filtered temperatures and duty per fan) and not only the summary.
+    include_series: bool = True
+
+
+@router.post("")
+def replay(payload: ReplayIn, unit: str = Query(default="C", pattern="^(C|F|K)$")) -> dict:
+    # Replays the trace through the control pipeline of the current configuration (plus the what-if changes)
+    # and returns the duty each fan would have run at.
+    try:
+        control_plane = RuntimeState.control_plane()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    n = len(next(iter(payload.sensors.values())))
+    ts = payload.ts if payload.ts is not None else [payload.start_ts + i * payload.interval_s for i in range(n)]
+    try:
+        plan = control_plane.preview(
+            settings=payload.settings.model_dump(exclude_none=True) if payload.settings else None,
+            curve_points={
+                curve_id: [(round(display_to_c(p.temp, unit), 1), p.duty_percent) for p in points]
+                for curve_id, points in payload.curve_points.items()
+            },
+        )
+        result = TraceReplay(plan).run(ts, payload.sensors)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    out: Dict[str, Any] = {"stats": result.stats}
+    if payload.include_series:
+        out["series"] = {
+            "ts": result.ts,
+            "temps_c": {name: [None if math.isnan(v) else v for v in series] for name, series in result.temps_c.items()},
+            "duty": result.duty,
+        }
+    return out
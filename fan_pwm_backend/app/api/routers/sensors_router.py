@@ -1,7 +1,9 @@
 # app/api/routers/sensors_router.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 
+from app.api.conditional import RESPONSE_CACHE
 from app.database.database import Database
 from app.services.runtime_state import RuntimeState
 from app.services.sensor_registry_service import SensorRegistryService
@@ -16,6 +18,12 @@ class SensorCreateIn(BaseModel):
     enabled: bool = True
 
 
+class SensorRegisterIn(BaseModel):
+    # Keys from GET /sensors/discovered; unset registers everything that is not registered yet.
+    keys: list[str] | None = None
+    enabled: bool = True
+
+
 class SensorUpdateIn(BaseModel):
     name: str | None = Field(default=None, min_length=1)
     path: str | None = Field(default=None, min_length=1)
@@ -32,9 +40,23 @@ def auto_detect() -> dict:
     return {"created": svc.auto_detect_default_sensors()}
 
 
+@router.get("/discovered")
+def discovered_sensors() -> dict:
+    return SensorRegistryService(db=_db()).discover()
+
+
+@router.post("/discovered/register")
+def register_discovered(payload: SensorRegisterIn) -> dict:
+    try:
+        return {"created": SensorRegistryService(db=_db()).register_discovered(keys=payload.keys, enabled=payload.enabled)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("")
-def list_sensors() -> list[dict]:
-    return _db().sensors.list()
+def list_sensors(if_none_match: str | None = Header(default=None)) -> Response:
+    db = _db()
+    return RESPONSE_CACHE.respond(db, ("sensors",), "/sensors", if_none_match, db.sensors.list)
 
 
 @router.post("")
@@ -1,7 +1,9 @@
 # app/api/routers/settings_router.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 
+from app.api.conditional import RESPONSE_CACHE
 from app.database.database import Database
 from app.services.runtime_state import RuntimeState
 
@@ -12,9 +14,13 @@ class SettingsUpdateIn(BaseModel):
     unit_display: str | None = Field(default=None, pattern="^(C|F|K)$")
 
     loop_interval_s: float | None = Field(default=None, gt=0)
+    sensor_timeout_ms: int | None = Field(default=None, ge=0, le=10000)
     smoothing_window_s: float | None = Field(default=None, ge=0)
     hysteresis_c: float | None = Field(default=None, ge=0)
 
+    smoothing_filter: str | None = Field(default=None, pattern="^(mean|ema|median)$")
+    spike_threshold_c: float | None = Field(default=None, ge=0)
+
     kickstart_enabled: bool | None = None
     kickstart_duty_percent: int | None = Field(default=None, ge=0, le=100)
     kickstart_ms: int | None = Field(default=None, ge=0, le=5000)
@@ -24,14 +30,19 @@ class SettingsUpdateIn(BaseModel):
 
     pwm_frequency_hz: int | None = Field(default=None, gt=0)
 
+    events_max_age_days: float | None = Field(default=None, ge=0)
+    events_max_rows: int | None = Field(default=None, ge=0)
+    events_rollup_window_s: float | None = Field(default=None, ge=0, le=86400)
+
 
 def _db() -> Database:
     return RuntimeState.db()
 
 
 @router.get("")
-def get_settings() -> dict:
-    return _db().settings.get_all()
+def get_settings(if_none_match: str | None = Header(default=None)) -> Response:
+    db = _db()
+    return RESPONSE_CACHE.respond(db, ("app_settings",), "/settings", if_none_match, db.settings.get_all)
 
 
 @router.patch("")
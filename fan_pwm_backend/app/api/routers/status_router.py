@@ -1,11 +1,41 @@
 # app/api/routers/status_router.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 
+from app.api.conditional import etag_matches
 from app.services.runtime_state import RuntimeState
 
 router = APIRouter(tags=["status"])
 
 
 @router.get("/status")
-def status() -> dict:
-    return RuntimeState.snapshot()
\ No newline at end of file
+async def status(if_none_match: str | None = Header(default=None)) -> Response:
+    # The body is serialized once per tick when the control loop publishes; a request only sends those bytes.
+    # Nothing here blocks, so it runs on the event loop instead of the thread pool.
+    snap = RuntimeState.status()
+    headers = {"ETag": snap.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, snap.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snap.body, media_type="application/json", headers=headers)
+
+
+@router.get("/status/timing")
+def status_timing() -> dict:
+    # Control loop tick lateness and duration histograms.
+    return RuntimeState.timing_snapshot()
+
+
+@router.get("/status/stream")
+def status_stream(max_rate_hz: float = Query(default=2.0, gt=0, le=20)) -> StreamingResponse:
+    # Server-Sent Events: a full "snapshot" first (and after skipped updates), then "delta" events with the
+    # changed top-level keys. At most max_rate_hz events per second are sent to this client.
+    try:
+        broadcaster = RuntimeState.broadcaster()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return StreamingResponse(
+        broadcaster.stream(min_interval_s=1.0 / max_rate_hz),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
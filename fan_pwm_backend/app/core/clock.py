@@ -0,0 +1,93 @@
+# app/core/clock.py
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional, Protocol, Tuple
+
+
+class TimerHandle(Protocol):
+    def cancel(self) -> None:
+        ...
+
+
+class Clock:
+    # Wall and monotonic time as seen by the control loop, plus the two ways it waits: sleeping on an event
+    # and one-shot timers. The system clock is used on real hardware; the simulation swaps in a VirtualClock.
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def monotonic_ns(self) -> int:
+        return time.monotonic_ns()
+
+    def wait(self, event: threading.Event, timeout_s: float) -> bool:
+        return event.wait(timeout_s)
+
+    def call_later(self, delay_s: float, fn: Callable[[], None], name: str = "clock-timer") -> TimerHandle:
+        timer = threading.Timer(max(0.0, float(delay_s)), fn)
+        timer.name = name
+        timer.daemon = True
+        timer.start()
+        return timer
+
+
+SYSTEM_CLOCK = Clock()
+
+
+class _VirtualTimer:
+    __slots__ = ("fn", "cancelled")
+
+    def __init__(self, fn: Callable[[], None]) -> None:
+        self.fn = fn
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class VirtualClock(Clock):
+    # Simulated time that only moves forward when the loop waits: wait() returns at once, as if the whole
+    # timeout had passed (unless the event is already set), and timers due on the way fire on the waiting
+    # thread. A loop driven by this clock runs its ticks back to back, as fast as the CPU allows.
+    def __init__(self, start_ts: Optional[float] = None) -> None:
+        self._lock = threading.Lock()
+        self._start_ts = time.time() if start_ts is None else float(start_ts)
+        self._now_ns = 0
+        self._timers: List[Tuple[int, int, _VirtualTimer]] = []
+        self._seq = itertools.count()
+
+    def time(self) -> float:
+        return self._start_ts + self._now_ns / 1e9
+
+    def monotonic(self) -> float:
+        return self._now_ns / 1e9
+
+    def monotonic_ns(self) -> int:
+        return self._now_ns
+
+    def wait(self, event: threading.Event, timeout_s: float) -> bool:
+        if not event.is_set():
+            self.advance(timeout_s)
+        return event.is_set()
+
+    def advance(self, seconds: float) -> None:
+        target_ns = self._now_ns + max(0, int(seconds * 1e9))
+        while True:
+            with self._lock:
+                if not self._timers or self._timers[0][0] > target_ns:
+                    self._now_ns = target_ns
+                    return
+                due_ns, _, timer = heapq.heappop(self._timers)
+                self._now_ns = max(self._now_ns, due_ns)
+            if not timer.cancelled:
+                timer.fn()
+
+    def call_later(self, delay_s: float, fn: Callable[[], None], name: str = "clock-timer") -> TimerHandle:
+        timer = _VirtualTimer(fn)
+        with self._lock:
+            due_ns = self._now_ns + max(0, int(float(delay_s) * 1e9))
+            heapq.heappush(self._timers, (due_ns, next(self._seq), timer))
+        return timer
@@ -1,6 +1,7 @@
 # app/core/config.py
 import os
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass(frozen=True)
@@ -13,6 +14,18 @@ class AppConfig:
     pwm_channel: int
     pwm_frequency_hz: int
 
+    # Control loop thread tuning. Both are optional and only applied when the OS permits it.
+    control_loop_cpu: Optional[int] = None
+    control_loop_rt_priority: int = 0
+
+    # Number of ticks kept in the in-memory telemetry history (3600 = 1h at the default 1s interval).
+    history_capacity: int = 3600
+
+    # "sysfs" drives the real hardware; "simulated" replaces sensors and PWM outputs with a thermal model
+    # (simulation_sensors thermal zones under DATA_DIR/simulation) for development without a Pi.
+    hardware_backend: str = "sysfs"
+    simulation_sensors: int = 1
+
     @staticmethod
     def from_env() -> "AppConfig":
         data_dir = os.getenv("DATA_DIR", "/data").strip() or "/data"
@@ -26,6 +39,16 @@ class AppConfig:
         if pwm_frequency_hz <= 0:
             pwm_frequency_hz = 25000
 
+        control_loop_cpu_raw = os.getenv("CONTROL_LOOP_CPU", "").strip()
+        control_loop_cpu = int(control_loop_cpu_raw) if control_loop_cpu_raw else None
+        control_loop_rt_priority = max(0, min(99, int(os.getenv("CONTROL_LOOP_RT_PRIORITY", "0"))))
+        history_capacity = max(2, int(os.getenv("HISTORY_CAPACITY", "3600")))
+
+        hardware_backend = os.getenv("HARDWARE_BACKEND", "sysfs").strip().lower() or "sysfs"
+        if hardware_backend not in ("sysfs", "simulated"):
+            hardware_backend = "sysfs"
+        simulation_sensors = max(1, int(os.getenv("SIMULATION_SENSORS", "1")))
+
         return AppConfig(
             data_dir=data_dir,
             log_level=log_level,
@@ -33,6 +56,11 @@ class AppConfig:
             pwm_chip=pwm_chip,
             pwm_channel=pwm_channel,
             pwm_frequency_hz=pwm_frequency_hz,
+            control_loop_cpu=control_loop_cpu,
+            control_loop_rt_priority=control_loop_rt_priority,
+            history_capacity=history_capacity,
+            hardware_backend=hardware_backend,
+            simulation_sensors=simulation_sensors,
         )
 
 
@@ -0,0 +1,191 @@
+# app/database/connection_manager.py
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+ChangeListener = Callable[[str], None]
+
+
+class _PooledConnection(sqlite3.Connection):
+    # Plain sqlite3.Connection does not support weak references; the subclass does.
+    pass
+
+
+class _WriterConnection(_PooledConnection):
+    # Schema methods call commit() themselves. Inside ConnectionManager.transaction() those commits are
+    # deferred so that several method calls end up in a single transaction.
+    batch_depth = 0
+
+    def commit(self) -> None:
+        if self.batch_depth > 0:
+            return
+        super().commit()
+
+
+class ConnectionManager:
+    # One manager per database file. Every thread gets its own reusable reader connection; all writes go
+    # through one shared writer connection that is serialized by a lock.
+    _registry_lock = threading.Lock()
+    _registry: Dict[str, "ConnectionManager"] = {}
+
+    @classmethod
+    def for_path(cls, db_path: str) -> "ConnectionManager":
+        with cls._registry_lock:
+            manager = cls._registry.get(db_path)
+            if manager is None:
+                manager = ConnectionManager(db_path)
+                cls._registry[db_path] = manager
+            return manager
+
+    def __init__(self, db_path: str) -> None:
+        self._db_path = db_path
+
+        self._local = threading.local()
+        self._readers: "weakref.WeakSet[_PooledConnection]" = weakref.WeakSet()
+        self._readers_lock = threading.Lock()
+
+        self._writer: Optional[_WriterConnection] = None
+        self._writer_lock = threading.RLock()
+
+        self._listeners_lock = threading.Lock()
+        self._listeners: List[ChangeListener] = []
+        self._pending_changes: List[str] = []
+
+        # Database-wide write counter, advanced by every committed change. Each table remembers the value of
+        # its last change, so readers of a few tables are not affected by writes to others (e.g. events).
+        self._generation_lock = threading.Lock()
+        self._generation = 0
+        self._table_generations: Dict[str, int] = {}
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path
+
+    def connect(self) -> sqlite3.Connection:
+        # Dedicated connection owned by the caller. Used for schema setup and long running jobs.
+        return self._open(sqlite3.Connection)
+
+    def reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "reader", None)
+        if conn is None:
+            conn = self._open(_PooledConnection)
+            self._local.reader = conn
+            with self._readers_lock:
+                self._readers.add(conn)
+        return conn
+
+    @contextmanager
+    def snapshot(self) -> Iterator[sqlite3.Connection]:
+        # Consistent view over several SELECTs on the calling thread's reader connection.
+        conn = self.reader()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+    def acquire_writer(self) -> sqlite3.Connection:
+        self._writer_lock.acquire()
+        try:
+            if self._writer is None:
+                self._writer = self._open(_WriterConnection)
+            return self._writer
+        except Exception:
+            self._writer_lock.release()
+            raise
+
+    def release_writer(self) -> None:
+        try:
+            writer = self._writer
+            # A method that raised half way must not leave its changes for the next writer to commit.
+            if writer is not None and writer.batch_depth == 0 and writer.in_transaction:
+                writer.rollback()
+        finally:
+            self._writer_lock.release()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        # Groups all writes made through the yielded connection into one commit. Nested use joins the
+        # outer transaction.
+        conn = self.acquire_writer()
+        assert isinstance(conn, _WriterConnection)
+        conn.batch_depth += 1
+        ok = False
+        try:
+            yield conn
+            ok = True
+        finally:
+            conn.batch_depth -= 1
+            changes: List[str] = []
+            if conn.batch_depth == 0:
+                if ok:
+                    conn.commit()
+                    changes = list(self._pending_changes)
+                else:
+                    conn.rollback()
+                self._pending_changes.clear()
+            self.release_writer()
+            for table in dict.fromkeys(changes):
+                self._fire(table)
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        with self._listeners_lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener) -> None:
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def notify(self, table: str) -> None:
+        # Called by schema methods right after commit(). Inside a transaction the commit is only
+        # effective at the end, so the notification is held back until then.
+        # Only the thread holding the writer commits, so a non-zero depth here is always our own batch.
+        writer = self._writer
+        if writer is not None and writer.batch_depth > 0:
+            self._pending_changes.append(table)
+            return
+        self._fire(table)
+
+    def generation(self, tables: Iterable[str]) -> int:
+        # Last committed change to any of the tables; 0 if none changed since the process started.
+        return max((self._table_generations.get(t, 0) for t in tables), default=0)
+
+    def close_all(self) -> None:
+        with self._readers_lock:
+            readers = list(self._readers)
+            self._readers = weakref.WeakSet()
+        for conn in readers:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+        with self._writer_lock:
+            if self._writer is not None:
+                try:
+                    self._writer.close()
+                finally:
+                    self._writer = None
+
+    def _fire(self, table: str) -> None:
+        with self._generation_lock:
+            self._generation += 1
+            self._table_generations[table] = self._generation
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(table)
+
+    def _open(self, factory: type) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, check_same_thread=False, factory=factory)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA foreign_keys=ON;")
+        return conn
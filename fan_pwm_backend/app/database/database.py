@@ -1,31 +1,50 @@
 # app/database/database.py
 import os
+import sqlite3
+from typing import Dict, Optional
 from app.database.database_base import DatabaseBase
 from app.database.schemas.sensors import Sensors
 from app.database.schemas.curves import Curves
 from app.database.schemas.curve_points import CurvePoints
 from app.database.schemas.settings import Settings
 from app.database.schemas.events import Events
+from app.database.schemas.fans import Fans
 
 
 class Database(DatabaseBase):
-    def __init__(self, data_dir: str) -> None:
+    def __init__(self, data_dir: str, settings_defaults: Optional[Dict[str, str]] = None) -> None:
+        # settings_defaults: environment values for settings that are not stored (see Settings).
         super().__init__(data_dir, db_name="app.db")
         os.makedirs(self._data_dir, exist_ok=True)
         self.sensors = Sensors(data_dir)
+        self.fans = Fans(data_dir)
         self.curves = Curves(data_dir)
         self.curve_points = CurvePoints(data_dir)
-        self.settings = Settings(data_dir)
+        self.settings = Settings(data_dir, defaults=settings_defaults)
         self.events = Events(data_dir)
 
     def init(self) -> None:
         conn = self._connect()
         try:
+            self._enable_incremental_vacuum(conn)
             self.sensors._create_schema(conn)
+            self.fans._create_schema(conn)
             self.curves._create_schema(conn)
             self.curve_points._create_schema(conn)
             self.settings._create_schema(conn)
             self.events._create_schema(conn)
             conn.commit()
         finally:
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+    def _enable_incremental_vacuum(self, conn: sqlite3.Connection) -> None:
+        # Lets event retention hand freed pages back to the file system. The mode only changes with a VACUUM
+        # (the connection is already in WAL mode), which is instant while the file has no tables. Existing
+        # files are switched by event retention in the background after its first pass
+        # (Events.enable_incremental_vacuum).
+        if conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone() is None:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+
+    def close(self) -> None:
+        self._connections.close_all()
\ No newline at end of file
@@ -1,22 +1,55 @@
 # app/database/database_base.py
 import os
 import sqlite3
-from typing import Optional, Tuple
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from app.database.connection_manager import ChangeListener, ConnectionManager
 
 
 class DatabaseBase:
     def __init__(self, data_dir: str, db_name: str = "app.db") -> None:
         self._data_dir = data_dir
         self._db_path = os.path.join(self._data_dir, db_name)
+        # Shared by every schema object of the same database file.
+        self._connections = ConnectionManager.for_path(self._db_path)
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self._db_path, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("PRAGMA foreign_keys=ON;")
-        return conn
+        return self._connections.connect()
+
+    def _reader(self, conn: Optional[sqlite3.Connection]) -> sqlite3.Connection:
+        if conn is not None:
+            return conn
+        return self._connections.reader()
 
-    def _use_conn(self, conn: Optional[sqlite3.Connection]) -> Tuple[sqlite3.Connection, bool]:
+    def _use_writer(self, conn: Optional[sqlite3.Connection]) -> Tuple[sqlite3.Connection, bool]:
         if conn is not None:
             return conn, False
-        return self._connect(), True
\ No newline at end of file
+        return self._connections.acquire_writer(), True
+
+    def _release_writer(self) -> None:
+        self._connections.release_writer()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connections.transaction() as conn:
+            yield conn
+
+    @contextmanager
+    def read_snapshot(self) -> Iterator[sqlite3.Connection]:
+        with self._connections.snapshot() as conn:
+            yield conn
+
+    def add_change_listener(self, listener: ChangeListener) -> None:
+        # The listener is called with the table name after every committed write.
+        self._connections.add_listener(listener)
+
+    def remove_change_listener(self, listener: ChangeListener) -> None:
+        self._connections.remove_listener(listener)
+
+    def generation(self, *tables: str) -> int:
+        # Advances with every committed write to one of the tables (in memory, no query).
+        return self._connections.generation(tables)
+
+    def _notify_change(self, table: str) -> None:
+        self._connections.notify(table)
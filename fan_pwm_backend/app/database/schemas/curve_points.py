@@ -27,16 +27,31 @@ class CurvePoints(DatabaseBase):
         )
 
     def list(self, curve_id: int, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
-        c, close = self._use_conn(conn)
-        try:
-            rows = c.execute(
-                "SELECT id, curve_id, temp_c, duty_percent, created_at, updated_at FROM curve_points WHERE curve_id = ? ORDER BY temp_c",
-                (curve_id,),
-            ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            if close:
-                c.close()
+        c = self._reader(conn)
+        rows = c.execute(
+            "SELECT id, curve_id, temp_c, duty_percent, created_at, updated_at FROM curve_points WHERE curve_id = ? ORDER BY temp_c",
+            (curve_id,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def list_all(self, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+        c = self._reader(conn)
+        rows = c.execute(
+            "SELECT id, curve_id, temp_c, duty_percent, created_at, updated_at FROM curve_points ORDER BY curve_id, temp_c"
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def list_for_active_curves(self, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+        c = self._reader(conn)
+        rows = c.execute(
+            """
+            SELECT p.id, p.curve_id, p.temp_c, p.duty_percent, p.created_at, p.updated_at
+            FROM curve_points p JOIN curves cu ON cu.id = p.curve_id
+            WHERE cu.is_active = 1
+            ORDER BY p.curve_id, p.temp_c
+            """
+        ).fetchall()
+        return [dict(r) for r in rows]
 
     def create(self, curve_id: int, temp_c: float, duty_percent: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
         if duty_percent < 0 or duty_percent > 100:
@@ -45,7 +60,7 @@ class CurvePoints(DatabaseBase):
         temp_c = float(temp_c)
         temp_c = round(temp_c, 1)
 
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
             curve_row = c.execute("SELECT id FROM curves WHERE id = ?", (curve_id,)).fetchone()
             if not curve_row:
@@ -56,7 +71,9 @@ class CurvePoints(DatabaseBase):
                 "INSERT OR REPLACE INTO curve_points(curve_id, temp_c, duty_percent, created_at, updated_at) VALUES(?, ?, ?, ?, ?)",
                 (curve_id, temp_c, duty_percent, now, now),
             )
+            _touch_curve(c, curve_id, now)
             c.commit()
+            self._notify_change("curve_points")
             row = c.execute(
                 "SELECT id, curve_id, temp_c, duty_percent, created_at, updated_at FROM curve_points WHERE curve_id = ? AND temp_c = ?",
                 (curve_id, temp_c),
@@ -65,33 +82,51 @@ class CurvePoints(DatabaseBase):
                 raise ValueError("Failed to create curve point")
             return dict(row)
         finally:
-            if close:
-                c.close()
+            if release:
+                self._release_writer()
 
     def replace_all(self, curve_id: int, points: List[Tuple[float, int]], conn: Optional[sqlite3.Connection] = None) -> None:
-        c, close = self._use_conn(conn)
-        try:
-            curve_row = c.execute("SELECT id FROM curves WHERE id = ?", (curve_id,)).fetchone()
-            if not curve_row:
-                raise ValueError("Unknown curve_id")
+        self.replace_many({curve_id: points}, conn=conn)
 
-            c.execute("DELETE FROM curve_points WHERE curve_id = ?", (curve_id,))
-            now = now_ts()
+    def replace_many(self, points_by_curve: Dict[int, List[Tuple[float, int]]],
+                     conn: Optional[sqlite3.Connection] = None) -> int:
+        # Replaces the points of several curves with three statements in total. Returns the number of points written.
+        rows: List[Tuple[int, float, int]] = []
+        for curve_id, points in points_by_curve.items():
             for temp_c, duty in points:
                 if duty < 0 or duty > 100:
                     raise ValueError("duty_percent must be 0..100")
-                c.execute(
+                rows.append((int(curve_id), round(float(temp_c), 1), int(duty)))
+        if not points_by_curve:
+            return 0
+
+        c, release = self._use_writer(conn)
+        try:
+            curve_ids = [(int(curve_id),) for curve_id in points_by_curve]
+            known = _known_curves(c, [curve_id for (curve_id,) in curve_ids])
+            if len(known) != len(curve_ids):
+                raise ValueError("Unknown curve_id")
+
+            now = now_ts()
+            c.executemany("DELETE FROM curve_points WHERE curve_id = ?", curve_ids)
+            try:
+                c.executemany(
                     "INSERT INTO curve_points(curve_id, temp_c, duty_percent, created_at, updated_at) VALUES(?, ?, ?, ?, ?)",
-                    (curve_id, round(float(temp_c), 1), int(duty), now, now),
+                    [(curve_id, temp_c, duty, now, now) for curve_id, temp_c, duty in rows],
                 )
+            except sqlite3.IntegrityError:
+                raise ValueError("Duplicate temperature in curve points")
+            c.executemany("UPDATE curves SET updated_at = ? WHERE id = ?", [(now, curve_id) for (curve_id,) in curve_ids])
             c.commit()
+            self._notify_change("curve_points")
+            return len(rows)
         finally:
-            if close:
-                c.close()
+            if release:
+                self._release_writer()
 
     def update(self, point_id: int, temp_c: Optional[float] = None, duty_percent: Optional[int] = None,
                conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
             current = c.execute("SELECT id, curve_id, temp_c, duty_percent FROM curve_points WHERE id = ?", (point_id,)).fetchone()
             if not current:
@@ -109,7 +144,9 @@ class CurvePoints(DatabaseBase):
                 "UPDATE curve_points SET temp_c = ?, duty_percent = ?, updated_at = ? WHERE id = ?",
                 (new_temp, new_duty, now, point_id),
             )
+            _touch_curve(c, int(current["curve_id"]), now)
             c.commit()
+            self._notify_change("curve_points")
 
             row = c.execute(
                 "SELECT id, curve_id, temp_c, duty_percent, created_at, updated_at FROM curve_points WHERE id = ?",
@@ -119,11 +156,11 @@ class CurvePoints(DatabaseBase):
                 raise ValueError("Unknown point_id")
             return dict(row)
         finally:
-            if close:
-                c.close()
+            if release:
+                self._release_writer()
 
     def delete(self, point_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
             row = c.execute(
                 "SELECT id, curve_id, temp_c, duty_percent, created_at, updated_at FROM curve_points WHERE id = ?",
@@ -133,8 +170,25 @@ class CurvePoints(DatabaseBase):
                 raise ValueError("Unknown point_id")
 
             c.execute("DELETE FROM curve_points WHERE id = ?", (point_id,))
+            _touch_curve(c, int(row["curve_id"]), now_ts())
             c.commit()
+            self._notify_change("curve_points")
             return dict(row)
         finally:
-            if close:
-                c.close()
\ No newline at end of file
+            if release:
+                self._release_writer()
+
+
+def _touch_curve(c: sqlite3.Connection, curve_id: int, now: float) -> None:
+    # Point changes count as a change of the curve (compiled curves are keyed by curve updated_at).
+    c.execute("UPDATE curves SET updated_at = ? WHERE id = ?", (now, curve_id))
+
+
+def _known_curves(c: sqlite3.Connection, curve_ids: List[int]) -> set:
+    known = set()
+    # Chunked below SQLite's default limit of bound parameters.
+    for i in range(0, len(curve_ids), 500):
+        chunk = curve_ids[i:i + 500]
+        marks = ", ".join("?" * len(chunk))
+        known.update(int(r[0]) for r in c.execute(f"SELECT id FROM curves WHERE id IN ({marks})", chunk).fetchall())
+    return known
\ No newline at end of file
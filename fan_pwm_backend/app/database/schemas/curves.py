@@ -1,9 +1,12 @@
 # app/database/schemas/curves.py
 import sqlite3
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from app.core.time_utils import now_ts
 from app.database.database_base import DatabaseBase
 
+# Default of Curves.update(fan_id=...): keep the current fan. None moves the curve back to the first fan.
+_UNCHANGED: Any = object()
+
 
 class Curves(DatabaseBase):
     def __init__(self, data_dir: str) -> None:
@@ -15,37 +18,47 @@ class Curves(DatabaseBase):
             CREATE TABLE IF NOT EXISTS curves (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 sensor_id INTEGER NOT NULL,
+                fan_id INTEGER NULL,
                 name TEXT NOT NULL,
                 is_active INTEGER NOT NULL,
                 created_at REAL NOT NULL,
                 updated_at REAL NOT NULL,
                 FOREIGN KEY(sensor_id) REFERENCES sensors(id) ON DELETE CASCADE,
+                FOREIGN KEY(fan_id) REFERENCES fans(id) ON DELETE SET NULL,
                 UNIQUE(sensor_id, name)
             );
             CREATE INDEX IF NOT EXISTS ix_curves_sensor_id ON curves(sensor_id);
             """
         )
+        # Databases created before fans existed: curves without a fan drive the first fan.
+        columns = {str(r[1]) for r in conn.execute("PRAGMA table_info(curves)").fetchall()}
+        if "fan_id" not in columns:
+            conn.execute("ALTER TABLE curves ADD COLUMN fan_id INTEGER NULL REFERENCES fans(id) ON DELETE SET NULL")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_curves_fan_id ON curves(fan_id)")
 
-    def create(self, sensor_id: int, name: str, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+    def create(self, sensor_id: int, name: str, fan_id: Optional[int] = None,
+               conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
         name = (name or "").strip()
         if not name:
             raise ValueError("Curve name must not be empty")
 
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
             sensor_row = c.execute("SELECT id FROM sensors WHERE id = ?", (sensor_id,)).fetchone()
             if not sensor_row:
                 raise ValueError("Unknown sensor_id")
+            _check_fan(c, fan_id)
 
             now = now_ts()
             c.execute(
-                "INSERT OR IGNORE INTO curves(sensor_id, name, is_active, created_at, updated_at) VALUES(?, ?, 0, ?, ?)",
-                (sensor_id, name, now, now),
+                "INSERT OR IGNORE INTO curves(sensor_id, fan_id, name, is_active, created_at, updated_at) VALUES(?, ?, ?, 0, ?, ?)",
+                (sensor_id, fan_id, name, now, now),
             )
             c.commit()
+            self._notify_change("curves")
 
             row = c.execute(
-                "SELECT id, sensor_id, name, is_active, created_at, updated_at FROM curves WHERE sensor_id = ? AND name = ?",
+                "SELECT id, sensor_id, fan_id, name, is_active, created_at, updated_at FROM curves WHERE sensor_id = ? AND name = ?",
                 (sensor_id, name),
             ).fetchone()
             if not row:
@@ -54,46 +67,52 @@ class Curves(DatabaseBase):
             out["is_active"] = bool(out["is_active"])
             return out
         finally:
-            if close:
-                c.close()
+            if release:
+                self._release_writer()
 
     def get(self, curve_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
-        try:
-            row = c.execute(
-                "SELECT id, sensor_id, name, is_active, created_at, updated_at FROM curves WHERE id = ?",
-                (curve_id,),
-            ).fetchone()
-            if not row:
-                raise ValueError("Unknown curve_id")
-            out = dict(row)
-            out["is_active"] = bool(out["is_active"])
-            return out
-        finally:
-            if close:
-                c.close()
+        c = self._reader(conn)
+        row = c.execute(
+            "SELECT id, sensor_id, fan_id, name, is_active, created_at, updated_at FROM curves WHERE id = ?",
+            (curve_id,),
+        ).fetchone()
+        if not row:
+            raise ValueError("Unknown curve_id")
+        out = dict(row)
+        out["is_active"] = bool(out["is_active"])
+        return out
 
     def list(self, sensor_id: int, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
-        c, close = self._use_conn(conn)
-        try:
-            rows = c.execute(
-                "SELECT id, sensor_id, name, is_active, created_at, updated_at FROM curves WHERE sensor_id = ? ORDER BY name",
-                (sensor_id,),
-            ).fetchall()
-            out = []
-            for r in rows:
-                d = dict(r)
-                d["is_active"] = bool(d["is_active"])
-                out.append(d)
-            return out
-        finally:
-            if close:
-                c.close()
+        c = self._reader(conn)
+        rows = c.execute(
+            "SELECT id, sensor_id, fan_id, name, is_active, created_at, updated_at FROM curves WHERE sensor_id = ? ORDER BY name",
+            (sensor_id,),
+        ).fetchall()
+        out = []
+        for r in rows:
+            d = dict(r)
+            d["is_active"] = bool(d["is_active"])
+            out.append(d)
+        return out
 
-    def update(self, curve_id: int, name: Optional[str] = None, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
+    def list_active(self, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+        c = self._reader(conn)
+        rows = c.execute(
+            "SELECT id, sensor_id, fan_id, name, is_active, created_at, updated_at FROM curves WHERE is_active = 1 "
+            "ORDER BY sensor_id, fan_id IS NULL, id"
+        ).fetchall()
+        out = []
+        for r in rows:
+            d = dict(r)
+            d["is_active"] = bool(d["is_active"])
+            out.append(d)
+        return out
+
+    def update(self, curve_id: int, name: Optional[str] = None, fan_id: Optional[int] = _UNCHANGED,
+               conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        c, release = self._use_writer(conn)
         try:
-            current = c.execute("SELECT id, sensor_id, name FROM curves WHERE id = ?", (curve_id,)).fetchone()
+            current = c.execute("SELECT id, sensor_id, fan_id, name, is_active FROM curves WHERE id = ?", (curve_id,)).fetchone()
             if not current:
                 raise ValueError("Unknown curve_id")
 
@@ -101,36 +120,57 @@ class Curves(DatabaseBase):
             if not new_name:
                 raise ValueError("Curve name must not be empty")
 
+            new_fan_id = current["fan_id"]
+            is_active = int(current["is_active"])
+            if fan_id is not _UNCHANGED and fan_id != current["fan_id"]:
+                _check_fan(c, fan_id)
+                new_fan_id = fan_id
+                # Moving to another fan must not leave two active curves for one sensor/fan pair. NULL and the
+                # first fan's id are the same fan.
+                first_fan_id = _first_fan_id(c)
+                if _resolve_fan(new_fan_id, first_fan_id) != _resolve_fan(current["fan_id"], first_fan_id):
+                    is_active = 0
+
             now = now_ts()
-            c.execute("UPDATE curves SET name = ?, updated_at = ? WHERE id = ?", (new_name, now, curve_id))
+            c.execute(
+                "UPDATE curves SET name = ?, fan_id = ?, is_active = ?, updated_at = ? WHERE id = ?",
+                (new_name, new_fan_id, is_active, now, curve_id),
+            )
             c.commit()
+            self._notify_change("curves")
             return self.get(curve_id, conn=c)
         finally:
-            if close:
-                c.close()
+            if release:
+                self._release_writer()
 
     def activate(self, curve_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
-            row = c.execute("SELECT id, sensor_id FROM curves WHERE id = ?", (curve_id,)).fetchone()
+            row = c.execute("SELECT id, sensor_id, fan_id FROM curves WHERE id = ?", (curve_id,)).fetchone()
             if not row:
                 raise ValueError("Unknown curve_id")
             sensor_id = int(row["sensor_id"])
 
+            # One active curve per sensor and fan; a curve without a fan drives the first fan.
+            first_fan_id = _first_fan_id(c)
             now = now_ts()
-            c.execute("UPDATE curves SET is_active = 0, updated_at = ? WHERE sensor_id = ?", (now, sensor_id))
+            c.execute(
+                "UPDATE curves SET is_active = 0, updated_at = ? WHERE sensor_id = ? AND COALESCE(fan_id, ?) IS ?",
+                (now, sensor_id, first_fan_id, _resolve_fan(row["fan_id"], first_fan_id)),
+            )
             c.execute("UPDATE curves SET is_active = 1, updated_at = ? WHERE id = ?", (now, curve_id))
             c.commit()
+            self._notify_change("curves")
             return self.get(curve_id, conn=c)
         finally:
-            if close:
-                c.close()
+            if release:
+                self._release_writer()
 
     def delete(self, curve_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
             row = c.execute(
-                "SELECT id, sensor_id, name, is_active, created_at, updated_at FROM curves WHERE id = ?",
+                "SELECT id, sensor_id, fan_id, name, is_active, created_at, updated_at FROM curves WHERE id = ?",
                 (curve_id,),
             ).fetchone()
             if not row:
@@ -138,10 +178,107 @@ class Curves(DatabaseBase):
 
             c.execute("DELETE FROM curves WHERE id = ?", (curve_id,))
             c.commit()
+            self._notify_change("curves")
 
             out = dict(row)
             out["is_active"] = bool(out["is_active"])
             return out
         finally:
-            if close:
-                c.close()
\ No newline at end of file
+            if release:
+                self._release_writer()
+
+    def list_all(self, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+        c = self._reader(conn)
+        rows = c.execute(
+            "SELECT id, sensor_id, fan_id, name, is_active, created_at, updated_at FROM curves ORDER BY sensor_id, name"
+        ).fetchall()
+        out = []
+        for r in rows:
+            d = dict(r)
+            d["is_active"] = bool(d["is_active"])
+            out.append(d)
+        return out
+
+    def upsert_many(self, curves: List[Dict[str, Any]],
+                    conn: Optional[sqlite3.Connection] = None) -> Dict[Tuple[int, str], int]:
+        # Creates or updates curves by sensor_id and name with one statement; "is_active" is taken as given.
+        # An active curve deactivates the other curves of its sensor and fan. Returns the id of every curve by
+        # (sensor_id, name).
+        rows = []
+        for curve in curves:
+            name = (curve.get("name") or "").strip()
+            if not name:
+                raise ValueError("Curve name must not be empty")
+            sensor_id = int(curve["sensor_id"])
+            fan_id = None if curve.get("fan_id") is None else int(curve["fan_id"])
+            is_active = 1 if curve.get("is_active") else 0
+            rows.append((sensor_id, fan_id, name, is_active))
+
+        c, release = self._use_writer(conn)
+        try:
+            known_sensors = {int(r[0]) for r in c.execute("SELECT id FROM sensors").fetchall()}
+            if any(row[0] not in known_sensors for row in rows):
+                raise ValueError("Unknown sensor_id")
+            known_fans = {int(r[0]) for r in c.execute("SELECT id FROM fans").fetchall()}
+            if any(row[1] is not None and row[1] not in known_fans for row in rows):
+                raise ValueError("Unknown fan_id")
+
+            first_fan_id = _first_fan_id(c)
+            active_pairs = set()
+            for sensor_id, fan_id, _, is_active in rows:
+                if is_active:
+                    pair = (sensor_id, _resolve_fan(fan_id, first_fan_id))
+                    if pair in active_pairs:
+                        raise ValueError(f"More than one active curve for sensor {sensor_id} and the same fan")
+                    active_pairs.add(pair)
+
+            now = now_ts()
+            c.executemany(
+                "UPDATE curves SET is_active = 0, updated_at = ? "
+                "WHERE sensor_id = ? AND COALESCE(fan_id, ?) IS ? AND is_active = 1",
+                [(now, sensor_id, first_fan_id, fan_id) for sensor_id, fan_id in active_pairs],
+            )
+            c.executemany(
+                """
+                INSERT INTO curves(sensor_id, fan_id, name, is_active, created_at, updated_at) VALUES(?, ?, ?, ?, ?, ?)
+                ON CONFLICT(sensor_id, name) DO UPDATE SET
+                    fan_id = excluded.fan_id, is_active = excluded.is_active, updated_at = excluded.updated_at
+                """,
+                [row + (now, now) for row in rows],
+            )
+            c.commit()
+            if rows:
+                self._notify_change("curves")
+            return {(int(r["sensor_id"]), str(r["name"])): int(r["id"])
+                    for r in c.execute("SELECT id, sensor_id, name FROM curves").fetchall()}
+        finally:
+            if release:
+                self._release_writer()
+
+    def delete_many(self, curve_ids: List[int], conn: Optional[sqlite3.Connection] = None) -> int:
+        if not curve_ids:
+            return 0
+        c, release = self._use_writer(conn)
+        try:
+            c.executemany("DELETE FROM curves WHERE id = ?", [(int(curve_id),) for curve_id in curve_ids])
+            c.commit()
+            self._notify_change("curves")
+            return len(curve_ids)
+        finally:
+            if release:
+                self._release_writer()
+
+
+def _check_fan(c: sqlite3.Connection, fan_id: Optional[int]) -> None:
+    if fan_id is not None and not c.execute("SELECT id FROM fans WHERE id = ?", (fan_id,)).fetchone():
+        raise ValueError("Unknown fan_id")
+
+
+def _first_fan_id(c: sqlite3.Connection) -> Optional[int]:
+    row = c.execute("SELECT MIN(id) FROM fans").fetchone()
+    return None if row[0] is None else int(row[0])
+
+
+def _resolve_fan(fan_id: Optional[int], first_fan_id: Optional[int]) -> Optional[int]:
+    # Curves without a fan drive the first fan (see ControlPlaneCache).
+    return first_fan_id if fan_id is None else int(fan_id)
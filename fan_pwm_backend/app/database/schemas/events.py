@@ -1,13 +1,38 @@
 # app/database/schemas/events.py
 import sqlite3
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
 from app.core.time_utils import now_ts
 from app.database.database_base import DatabaseBase
 
+_COLUMNS = "id, level, message, context, count, created_at, last_at"
+
+_RollupKey = Tuple[str, str, Optional[str]]
+
+_SEARCH_TRIGGERS = """
+    CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts(rowid, context) VALUES (new.id, new.context);
+    END;
+    CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, context) VALUES ('delete', old.id, old.context);
+    END;
+    CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF context ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, context) VALUES ('delete', old.id, old.context);
+        INSERT INTO events_fts(rowid, context) VALUES (new.id, new.context);
+    END;
+"""
+
+# (created_at, id) of a row; pages continue strictly after it.
+EventCursor = Tuple[float, int]
+
 
 class Events(DatabaseBase):
     def __init__(self, data_dir: str) -> None:
         super().__init__(data_dir, db_name="app.db")
+        # Open rollup rows by (level, message, context): (row id, first occurrence). Only touched while
+        # holding the writer.
+        self._rollups: Dict[_RollupKey, Tuple[int, float]] = {}
+        # Set once creating the full-text index failed (SQLite without FTS5).
+        self._search_unsupported = False
 
     def _create_schema(self, conn: sqlite3.Connection) -> None:
         conn.executescript(
@@ -17,11 +42,52 @@ class Events(DatabaseBase):
                 level TEXT NOT NULL,
                 message TEXT NOT NULL,
                 context TEXT NULL,
-                created_at REAL NOT NULL
+                count INTEGER NOT NULL DEFAULT 1,
+                created_at REAL NOT NULL,
+                last_at REAL NULL
             );
             CREATE INDEX IF NOT EXISTS ix_events_created_at ON events(created_at);
+            CREATE INDEX IF NOT EXISTS ix_events_level_created_at ON events(level, created_at);
+            CREATE INDEX IF NOT EXISTS ix_events_message_created_at ON events(message, created_at);
             """
         )
+        # Databases created before events were rolled up.
+        columns = {str(r[1]) for r in conn.execute("PRAGMA table_info(events)").fetchall()}
+        if "count" not in columns:
+            conn.execute("ALTER TABLE events ADD COLUMN count INTEGER NOT NULL DEFAULT 1")
+        if "last_at" not in columns:
+            conn.execute("ALTER TABLE events ADD COLUMN last_at REAL NULL")
+            conn.execute("UPDATE events SET last_at = created_at")
+        # On a new (empty) table the index is built right away; building it over existing rows is left to
+        # event retention, after its first pass (build_search_index).
+        if self.has_search(conn) or conn.execute("SELECT 1 FROM events LIMIT 1").fetchone() is None:
+            self._create_search_index(conn)
+
+    def _create_search_index(self, conn: sqlite3.Connection) -> bool:
+        # Full-text index over context, kept in sync by triggers. Table, initial build and triggers are one
+        # transaction, so search is offered once the index is complete. Optional: SQLite builds without FTS5
+        # simply do not offer search (returns False).
+        if self.has_search(conn):
+            conn.executescript(_SEARCH_TRIGGERS)
+            return True
+        try:
+            conn.executescript(
+                "BEGIN;"
+                "CREATE VIRTUAL TABLE events_fts USING fts5(context, content='events', content_rowid='id');"
+                "INSERT INTO events_fts(events_fts) VALUES('rebuild');"
+                f"{_SEARCH_TRIGGERS}"
+                "COMMIT;"
+            )
+        except sqlite3.OperationalError:
+            if conn.in_transaction:
+                conn.rollback()
+            self._search_unsupported = True
+            return False
+        return True
+
+    def has_search(self, conn: Optional[sqlite3.Connection] = None) -> bool:
+        c = self._reader(conn)
+        return c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events_fts'").fetchone() is not None
 
     def create(self, level: str, message: str, context: Optional[str] = None,
                conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
@@ -30,33 +96,268 @@ class Events(DatabaseBase):
         if not message:
             raise ValueError("message must not be empty")
 
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
             now = now_ts()
             c.execute(
-                "INSERT INTO events(level, message, context, created_at) VALUES(?, ?, ?, ?)",
-                (level, message, context, now),
+                "INSERT INTO events(level, message, context, created_at, last_at) VALUES(?, ?, ?, ?, ?)",
+                (level, message, context, now, now),
             )
             c.commit()
-            row = c.execute(
-                "SELECT id, level, message, context, created_at FROM events WHERE id = last_insert_rowid()"
-            ).fetchone()
+            self._notify_change("events")
+            row = c.execute(f"SELECT {_COLUMNS} FROM events WHERE id = last_insert_rowid()").fetchone()
             if not row:
                 raise ValueError("Failed to create event")
             return dict(row)
         finally:
-            if close:
-                c.close()
+            if release:
+                self._release_writer()
+
+    def create_many(self, events: Iterable[Tuple[str, str, Optional[str], float]], rollup_window_s: float = 0.0,
+                    conn: Optional[sqlite3.Connection] = None) -> int:
+        # Bulk insert of (level, message, context, created_at) rows in one transaction. With a rollup window,
+        # repeats of an identical event within rollup_window_s of its first occurrence only raise the count
+        # and last_at of that row. Returns the number of events stored (including rolled up ones).
+        rows = []
+        for level, message, context, created_at in events:
+            message = (message or "").strip()
+            if not message:
+                continue
+            rows.append(((level or "").strip().upper() or "INFO", message, context, float(created_at)))
+        if not rows:
+            return 0
+
+        c, release = self._use_writer(conn)
+        try:
+            if rollup_window_s > 0:
+                self._write_rolled_up(c, rows, rollup_window_s)
+            else:
+                c.executemany(
+                    "INSERT INTO events(level, message, context, created_at, last_at) VALUES(?, ?, ?, ?, ?)",
+                    [(level, message, context, ts, ts) for level, message, context, ts in rows],
+                )
+            c.commit()
+            self._notify_change("events")
+            return len(rows)
+        except Exception:
+            # Row ids remembered for this batch may have been rolled back.
+            self._rollups.clear()
+            raise
+        finally:
+            if release:
+                self._release_writer()
 
     def list_recent(self, limit: int = 100, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
         limit = max(1, min(int(limit), 500))
-        c, close = self._use_conn(conn)
+        c = self._reader(conn)
+        rows = c.execute(
+            f"SELECT {_COLUMNS} FROM events ORDER BY created_at DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def query(self, limit: int = 100, after: Optional[EventCursor] = None, ascending: bool = False,
+              level: Optional[str] = None, message: Optional[str] = None, start_ts: Optional[float] = None,
+              end_ts: Optional[float] = None, search: Optional[str] = None,
+              conn: Optional[sqlite3.Connection] = None) -> Tuple[List[Dict[str, Any]], Optional[EventCursor]]:
+        # One page ordered by (created_at, id), newest first unless ascending. Pass the returned cursor as
+        # after to get the next page (None when there is none). Every filter combination is an index range
+        # scan; no OFFSET is ever used.
+        limit = max(1, min(int(limit), 1000))
+        c = self._reader(conn)
+        sql, params = self._select(after, ascending, level, message, start_ts, end_ts, search, c)
+        try:
+            rows = c.execute(f"{sql} LIMIT ?", (*params, limit + 1)).fetchall()
+        except sqlite3.OperationalError as e:
+            raise _query_error(e, search)
+        page = [dict(r) for r in rows[:limit]]
+        cursor = (page[-1]["created_at"], page[-1]["id"]) if len(rows) > limit else None
+        return page, cursor
+
+    def iter_query(self, ascending: bool = True, level: Optional[str] = None, message: Optional[str] = None,
+                   start_ts: Optional[float] = None, end_ts: Optional[float] = None, search: Optional[str] = None,
+                   batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        # Streams every matching row. Uses a connection of its own, because the consumer (a streaming
+        # response) may resume the generator on a different thread each time; it is closed with the generator.
+        conn = self._connect()
+        try:
+            sql, params = self._select(None, ascending, level, message, start_ts, end_ts, search, conn)
+            try:
+                cur = conn.execute(sql, params)
+            except sqlite3.OperationalError as e:
+                raise _query_error(e, search)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                for r in rows:
+                    yield dict(r)
+        finally:
+            conn.close()
+
+    def count(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        c = self._reader(conn)
+        return int(c.execute("SELECT COUNT(*) FROM events").fetchone()[0])
+
+    def retention_boundary_id(self, max_rows: int, conn: Optional[sqlite3.Connection] = None) -> Optional[int]:
+        # Highest id that has to go so that at most max_rows of the newest rows remain (None if nothing does).
+        c = self._reader(conn)
+        row = c.execute("SELECT id FROM events ORDER BY id DESC LIMIT 1 OFFSET ?", (max(0, int(max_rows)),)).fetchone()
+        return int(row[0]) if row else None
+
+    def delete_older_than(self, cutoff_ts: float, limit: int, conn: Optional[sqlite3.Connection] = None) -> int:
+        # Deletes at most limit rows, so callers can prune in short write transactions.
+        return self._delete_batch(
+            "SELECT id FROM events WHERE created_at < ? ORDER BY created_at LIMIT ?", (float(cutoff_ts), int(limit)), conn)
+
+    def delete_up_to_id(self, max_id: int, limit: int, conn: Optional[sqlite3.Connection] = None) -> int:
+        return self._delete_batch("SELECT id FROM events WHERE id <= ? ORDER BY id LIMIT ?", (int(max_id), int(limit)), conn)
+
+    # The maintenance calls below must not run inside a transaction, so they always use the writer directly.
+    def enable_incremental_vacuum(self) -> bool:
+        # One full VACUUM that switches a file created before retention existed to auto_vacuum=INCREMENTAL.
+        # Holds the writer for as long as it takes, so it belongs on a background thread and after a prune.
+        # Returns False if the file already uses incremental vacuum.
+        c = self._connections.acquire_writer()
         try:
-            rows = c.execute(
-                "SELECT id, level, message, context, created_at FROM events ORDER BY created_at DESC LIMIT ?",
-                (limit,),
-            ).fetchall()
-            return [dict(r) for r in rows]
+            if int(c.execute("PRAGMA auto_vacuum").fetchone()[0]) == 2:
+                return False
+            c.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            c.execute("VACUUM")
+            return True
         finally:
-            if close:
-                c.close()
\ No newline at end of file
+            self._release_writer()
+
+    def build_search_index(self) -> bool:
+        # Builds the full-text index over the existing rows of a table created before search existed. Holds
+        # the writer for the whole build. Returns False if there is no index (SQLite without FTS5).
+        c = self._connections.acquire_writer()
+        try:
+            return self._create_search_index(c)
+        finally:
+            self._release_writer()
+
+    def incremental_vacuum(self, max_pages: int) -> int:
+        # Hands at most max_pages free pages back to the file system (needs auto_vacuum=INCREMENTAL, see
+        # enable_incremental_vacuum). Returns the number of pages released.
+        c = self._connections.acquire_writer()
+        try:
+            before = int(c.execute("PRAGMA freelist_count").fetchone()[0])
+            # execute() would only step the pragma once, which frees a single page.
+            c.executescript(f"PRAGMA incremental_vacuum({max(1, int(max_pages))});")
+            return before - int(c.execute("PRAGMA freelist_count").fetchone()[0])
+        finally:
+            self._release_writer()
+
+    def merge_search_index(self, pages: int) -> bool:
+        # One bounded step of merging full-text index segments, which is also what drops the entries of deleted
+        # rows (FTS5 only marks them). Returns False once there is nothing left to merge.
+        c = self._connections.acquire_writer()
+        try:
+            if c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events_fts'").fetchone() is None:
+                return False
+            before = c.total_changes
+            # A negative page count merges segments of all levels, not only full ones.
+            c.execute(f"INSERT INTO events_fts(events_fts, rank) VALUES('merge', {-max(1, int(pages))})")
+            c.commit()
+            return c.total_changes - before >= 2
+        finally:
+            self._release_writer()
+
+    def checkpoint(self) -> None:
+        # Copies the WAL back into the database file and truncates it, so the freed space shows up on disk.
+        c = self._connections.acquire_writer()
+        try:
+            c.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        finally:
+            self._release_writer()
+
+    def _delete_batch(self, select_ids: str, params: Tuple[Any, ...], conn: Optional[sqlite3.Connection]) -> int:
+        c, release = self._use_writer(conn)
+        try:
+            deleted = c.execute(f"DELETE FROM events WHERE id IN ({select_ids})", params).rowcount
+            c.commit()
+            if deleted:
+                self._notify_change("events")
+            return deleted
+        finally:
+            if release:
+                self._release_writer()
+
+    def _select(self, after: Optional[EventCursor], ascending: bool, level: Optional[str], message: Optional[str],
+                start_ts: Optional[float], end_ts: Optional[float], search: Optional[str],
+                conn: sqlite3.Connection) -> Tuple[str, List[Any]]:
+        where: List[str] = []
+        params: List[Any] = []
+        if level:
+            where.append("level = ?")
+            params.append(level.strip().upper())
+        if message:
+            where.append("message = ?")
+            params.append(message.strip())
+        if start_ts is not None:
+            where.append("created_at >= ?")
+            params.append(float(start_ts))
+        if end_ts is not None:
+            where.append("created_at <= ?")
+            params.append(float(end_ts))
+        if after is not None:
+            # Row value comparison: SQLite turns it into a range on the (…, created_at) index.
+            where.append("(created_at, id) > (?, ?)" if ascending else "(created_at, id) < (?, ?)")
+            params.extend((float(after[0]), int(after[1])))
+        if search:
+            if not self.has_search(conn):
+                if self._search_unsupported:
+                    raise ValueError("Full-text search is not available (SQLite without FTS5)")
+                raise RuntimeError("Full-text search is not available yet: the index is being built")
+            where.append("id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)")
+            params.append(search)
+
+        direction = "ASC" if ascending else "DESC"
+        sql = f"SELECT {_COLUMNS} FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return f"{sql} ORDER BY created_at {direction}, id {direction}", params
+
+    def _write_rolled_up(self, c: sqlite3.Connection, rows: List[Tuple[str, str, Optional[str], float]],
+                         window_s: float) -> None:
+        # Folds the batch into per-row increments first, so a burst of repeats costs one UPDATE.
+        increments: Dict[int, List[Any]] = {}
+        for level, message, context, ts in rows:
+            key = (level, message, context)
+            open_row = self._rollups.get(key)
+            if open_row is not None and ts - open_row[1] < window_s:
+                pending = increments.setdefault(open_row[0], [key, 0, ts])
+                pending[1] += 1
+                pending[2] = max(pending[2], ts)
+                continue
+
+            cur = c.execute(
+                "INSERT INTO events(level, message, context, created_at, last_at) VALUES(?, ?, ?, ?, ?)",
+                (level, message, context, ts, ts),
+            )
+            self._rollups[key] = (int(cur.lastrowid), ts)
+
+        for row_id, (key, n, last_at) in increments.items():
+            updated = c.execute(
+                "UPDATE events SET count = count + ?, last_at = MAX(COALESCE(last_at, created_at), ?) WHERE id = ?",
+                (n, last_at, row_id),
+            ).rowcount
+            if not updated:
+                # Pruned in the meantime: keep the occurrences as a new row.
+                cur = c.execute(
+                    "INSERT INTO events(level, message, context, count, created_at, last_at) VALUES(?, ?, ?, ?, ?, ?)",
+                    (*key, n, last_at, last_at),
+                )
+                if self._rollups.get(key, (None,))[0] == row_id:
+                    self._rollups[key] = (int(cur.lastrowid), last_at)
+
+        # Forget rollups whose window has passed; the map stays as small as the set of recent distinct events.
+        newest = rows[-1][3]
+        for key in [k for k, (_, first) in self._rollups.items() if newest - first >= window_s]:
+            del self._rollups[key]
+
+
+def _query_error(e: sqlite3.OperationalError, search: Optional[str]) -> Exception:
+    # With a search term the usual cause is malformed FTS5 query syntax, which is a caller error.
+    return ValueError(f"Invalid search query: {e}") if search else e
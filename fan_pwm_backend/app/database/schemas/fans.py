@@ -0,0 +1,245 @@
+# app/database/schemas/fans.py
+import sqlite3
+from typing import Optional, Dict, Any, List
+from app.core.time_utils import now_ts
+from app.database.database_base import DatabaseBase
+
+_COLUMNS = ("id, name, pwm_chip, pwm_channel, frequency_hz, kickstart_enabled, kickstart_duty_percent, kickstart_ms, "
+            "enabled, created_at, updated_at")
+
+# Per-fan overrides. NULL means "use the global setting of the same name".
+_OPTIONAL_FIELDS = ("frequency_hz", "kickstart_enabled", "kickstart_duty_percent", "kickstart_ms")
+
+
+class Fans(DatabaseBase):
+    def __init__(self, data_dir: str) -> None:
+        super().__init__(data_dir, db_name="app.db")
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS fans (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                pwm_chip TEXT NOT NULL,
+                pwm_channel INTEGER NOT NULL,
+                frequency_hz INTEGER NULL,
+                kickstart_enabled INTEGER NULL,
+                kickstart_duty_percent INTEGER NULL,
+                kickstart_ms INTEGER NULL,
+                enabled INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                UNIQUE(pwm_chip, pwm_channel)
+            );
+            """
+        )
+
+    def create(self, name: str, pwm_chip: str, pwm_channel: int, frequency_hz: Optional[int] = None,
+               kickstart_enabled: Optional[bool] = None, kickstart_duty_percent: Optional[int] = None,
+               kickstart_ms: Optional[int] = None, enabled: bool = True,
+               conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("Fan name must not be empty")
+        pwm_chip = _validate_chip(pwm_chip)
+        pwm_channel = _validate_channel(pwm_channel)
+        optional = _validate_optional({
+            "frequency_hz": frequency_hz,
+            "kickstart_enabled": kickstart_enabled,
+            "kickstart_duty_percent": kickstart_duty_percent,
+            "kickstart_ms": kickstart_ms,
+        })
+
+        c, release = self._use_writer(conn)
+        try:
+            now = now_ts()
+            try:
+                c.execute(
+                    """
+                    INSERT INTO fans(name, pwm_chip, pwm_channel, frequency_hz, kickstart_enabled, kickstart_duty_percent,
+                                     kickstart_ms, enabled, created_at, updated_at)
+                    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (name, pwm_chip, pwm_channel, optional["frequency_hz"], optional["kickstart_enabled"],
+                     optional["kickstart_duty_percent"], optional["kickstart_ms"], 1 if enabled else 0, now, now),
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError("A fan with this name or PWM chip/channel already exists")
+            fan_id = int(c.execute("SELECT last_insert_rowid()").fetchone()[0])
+            c.commit()
+            self._notify_change("fans")
+            return self.get(fan_id, conn=c)
+        finally:
+            if release:
+                self._release_writer()
+
+    def get(self, fan_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        c = self._reader(conn)
+        row = c.execute(f"SELECT {_COLUMNS} FROM fans WHERE id = ?", (fan_id,)).fetchone()
+        if not row:
+            raise ValueError("Unknown fan_id")
+        return _to_dict(row)
+
+    def list(self, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+        c = self._reader(conn)
+        rows = c.execute(f"SELECT {_COLUMNS} FROM fans ORDER BY id").fetchall()
+        return [_to_dict(r) for r in rows]
+
+    def update(self, fan_id: int, name: Optional[str] = None, pwm_chip: Optional[str] = None,
+               pwm_channel: Optional[int] = None, enabled: Optional[bool] = None,
+               conn: Optional[sqlite3.Connection] = None, **optional: Any) -> Dict[str, Any]:
+        # optional: frequency_hz, kickstart_enabled, kickstart_duty_percent, kickstart_ms. Passing None resets
+        # a field to the global setting; leaving it out keeps the current value.
+        unknown = set(optional) - set(_OPTIONAL_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fan fields: {', '.join(sorted(unknown))}")
+
+        c, release = self._use_writer(conn)
+        try:
+            current = c.execute(f"SELECT {_COLUMNS} FROM fans WHERE id = ?", (fan_id,)).fetchone()
+            if not current:
+                raise ValueError("Unknown fan_id")
+
+            new_name = (name.strip() if name is not None else str(current["name"])).strip()
+            if not new_name:
+                raise ValueError("Fan name must not be empty")
+            new_chip = _validate_chip(pwm_chip) if pwm_chip is not None else str(current["pwm_chip"])
+            new_channel = _validate_channel(pwm_channel) if pwm_channel is not None else int(current["pwm_channel"])
+            new_enabled = int(bool(enabled)) if enabled is not None else int(current["enabled"])
+            values = _validate_optional({k: optional.get(k, current[k]) for k in _OPTIONAL_FIELDS})
+
+            now = now_ts()
+            try:
+                c.execute(
+                    """
+                    UPDATE fans SET name = ?, pwm_chip = ?, pwm_channel = ?, frequency_hz = ?, kickstart_enabled = ?,
+                                    kickstart_duty_percent = ?, kickstart_ms = ?, enabled = ?, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (new_name, new_chip, new_channel, values["frequency_hz"], values["kickstart_enabled"],
+                     values["kickstart_duty_percent"], values["kickstart_ms"], new_enabled, now, fan_id),
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError("A fan with this name or PWM chip/channel already exists")
+            c.commit()
+            self._notify_change("fans")
+            return self.get(fan_id, conn=c)
+        finally:
+            if release:
+                self._release_writer()
+
+    def delete(self, fan_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        # Curves mapped to the fan fall back to the first fan (their fan_id becomes NULL).
+        c, release = self._use_writer(conn)
+        try:
+            row = c.execute(f"SELECT {_COLUMNS} FROM fans WHERE id = ?", (fan_id,)).fetchone()
+            if not row:
+                raise ValueError("Unknown fan_id")
+
+            c.execute("DELETE FROM fans WHERE id = ?", (fan_id,))
+            c.commit()
+            self._notify_change("fans")
+            self._notify_change("curves")
+            return _to_dict(row)
+        finally:
+            if release:
+                self._release_writer()
+
+    def upsert_many(self, fans: List[Dict[str, Any]], conn: Optional[sqlite3.Connection] = None) -> Dict[str, int]:
+        # Creates or updates fans by name with one statement. Unset per-fan overrides follow the global settings.
+        # Returns the id of every fan by name.
+        rows = []
+        for fan in fans:
+            name = (fan.get("name") or "").strip()
+            if not name:
+                raise ValueError("Fan name must not be empty")
+            optional = _validate_optional({k: fan.get(k) for k in _OPTIONAL_FIELDS})
+            rows.append((name, _validate_chip(fan.get("pwm_chip")), _validate_channel(fan.get("pwm_channel")),
+                         optional["frequency_hz"], optional["kickstart_enabled"], optional["kickstart_duty_percent"],
+                         optional["kickstart_ms"], 1 if fan.get("enabled", True) else 0))
+
+        c, release = self._use_writer(conn)
+        try:
+            now = now_ts()
+            try:
+                c.executemany(
+                    """
+                    INSERT INTO fans(name, pwm_chip, pwm_channel, frequency_hz, kickstart_enabled, kickstart_duty_percent,
+                                     kickstart_ms, enabled, created_at, updated_at)
+                    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        pwm_chip = excluded.pwm_chip, pwm_channel = excluded.pwm_channel,
+                        frequency_hz = excluded.frequency_hz, kickstart_enabled = excluded.kickstart_enabled,
+                        kickstart_duty_percent = excluded.kickstart_duty_percent, kickstart_ms = excluded.kickstart_ms,
+                        enabled = excluded.enabled, updated_at = excluded.updated_at
+                    """,
+                    [row + (now, now) for row in rows],
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError("A fan with this PWM chip/channel already exists")
+            c.commit()
+            if rows:
+                self._notify_change("fans")
+            return {str(r["name"]): int(r["id"]) for r in c.execute("SELECT id, name FROM fans").fetchall()}
+        finally:
+            if release:
+                self._release_writer()
+
+    def delete_many(self, fan_ids: List[int], conn: Optional[sqlite3.Connection] = None) -> int:
+        if not fan_ids:
+            return 0
+        c, release = self._use_writer(conn)
+        try:
+            c.executemany("DELETE FROM fans WHERE id = ?", [(int(fan_id),) for fan_id in fan_ids])
+            c.commit()
+            self._notify_change("fans")
+            self._notify_change("curves")
+            return len(fan_ids)
+        finally:
+            if release:
+                self._release_writer()
+
+
+def _validate_chip(pwm_chip: str) -> str:
+    pwm_chip = (pwm_chip or "").strip()
+    if not pwm_chip or "/" in pwm_chip:
+        raise ValueError("pwm_chip must be a pwmchip name like 'pwmchip0'")
+    return pwm_chip
+
+
+def _validate_channel(pwm_channel: int) -> int:
+    pwm_channel = int(pwm_channel)
+    if pwm_channel < 0:
+        raise ValueError("pwm_channel must be >= 0")
+    return pwm_channel
+
+
+def _validate_optional(values: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    frequency_hz = values.get("frequency_hz")
+    if frequency_hz is not None and int(frequency_hz) <= 0:
+        raise ValueError("frequency_hz must be > 0")
+    out["frequency_hz"] = None if frequency_hz is None else int(frequency_hz)
+
+    kickstart_enabled = values.get("kickstart_enabled")
+    out["kickstart_enabled"] = None if kickstart_enabled is None else int(bool(kickstart_enabled))
+
+    duty = values.get("kickstart_duty_percent")
+    if duty is not None and (int(duty) < 0 or int(duty) > 100):
+        raise ValueError("kickstart_duty_percent must be 0..100")
+    out["kickstart_duty_percent"] = None if duty is None else int(duty)
+
+    ms = values.get("kickstart_ms")
+    if ms is not None and (int(ms) < 0 or int(ms) > 5000):
+        raise ValueError("kickstart_ms must be 0..5000")
+    out["kickstart_ms"] = None if ms is None else int(ms)
+    return out
+
+
+def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    out = dict(row)
+    out["enabled"] = bool(out["enabled"])
+    if out["kickstart_enabled"] is not None:
+        out["kickstart_enabled"] = bool(out["kickstart_enabled"])
+    return out
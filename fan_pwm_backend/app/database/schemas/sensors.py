@@ -5,6 +5,8 @@ from typing import Optional, Dict, Any, List
 from app.core.time_utils import now_ts
 from app.database.database_base import DatabaseBase
 
+_COLUMNS = "id, name, type, path, source_key, enabled, created_at, updated_at"
+
 
 class Sensors(DatabaseBase):
     def __init__(self, data_dir: str) -> None:
@@ -18,14 +20,21 @@ class Sensors(DatabaseBase):
                 name TEXT NOT NULL UNIQUE,
                 type TEXT NOT NULL,
                 path TEXT NOT NULL,
+                source_key TEXT NULL,
                 enabled INTEGER NOT NULL,
                 created_at REAL NOT NULL,
                 updated_at REAL NOT NULL
             );
             """
         )
-
-    def create(self, name: str, sensor_type: str, path: str, enabled: bool = True,
+        # source_key: stable identity of a sensor registered from discovery (see SensorScanner). The control
+        # plane reads the path it currently resolves to; path only records where it was at registration.
+        # Databases created before discovery existed get the column here.
+        columns = {str(r[1]) for r in conn.execute("PRAGMA table_info(sensors)").fetchall()}
+        if "source_key" not in columns:
+            conn.execute("ALTER TABLE sensors ADD COLUMN source_key TEXT NULL")
+
+    def create(self, name: str, sensor_type: str, path: str, enabled: bool = True, source_key: Optional[str] = None,
                conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
         name = (name or "").strip()
         if not name:
@@ -42,17 +51,19 @@ class Sensors(DatabaseBase):
         if not os.path.exists(path):
             raise ValueError("path does not exist on this system")
 
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
             now = now_ts()
             c.execute(
-                "INSERT OR IGNORE INTO sensors(name, type, path, enabled, created_at, updated_at) VALUES(?, ?, ?, ?, ?, ?)",
-                (name, sensor_type, path, 1 if enabled else 0, now, now),
+                "INSERT OR IGNORE INTO sensors(name, type, path, source_key, enabled, created_at, updated_at) "
+                "VALUES(?, ?, ?, ?, ?, ?, ?)",
+                (name, sensor_type, path, source_key or None, 1 if enabled else 0, now, now),
             )
             c.commit()
+            self._notify_change("sensors")
 
             row = c.execute(
-                "SELECT id, name, type, path, enabled, created_at, updated_at FROM sensors WHERE name = ?",
+                f"SELECT {_COLUMNS} FROM sensors WHERE name = ?",
                 (name,),
             ).fetchone()
             if not row:
@@ -61,46 +72,39 @@ class Sensors(DatabaseBase):
             out["enabled"] = bool(out["enabled"])
             return out
         finally:
-            if close:
-                c.close()
+            if release:
+                self._release_writer()
 
     def get(self, sensor_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
-        try:
-            row = c.execute(
-                "SELECT id, name, type, path, enabled, created_at, updated_at FROM sensors WHERE id = ?",
-                (sensor_id,),
-            ).fetchone()
-            if not row:
-                raise ValueError("Unknown sensor_id")
-            out = dict(row)
-            out["enabled"] = bool(out["enabled"])
-            return out
-        finally:
-            if close:
-                c.close()
+        c = self._reader(conn)
+        row = c.execute(
+            f"SELECT {_COLUMNS} FROM sensors WHERE id = ?",
+            (sensor_id,),
+        ).fetchone()
+        if not row:
+            raise ValueError("Unknown sensor_id")
+        out = dict(row)
+        out["enabled"] = bool(out["enabled"])
+        return out
 
     def list(self, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
-        c, close = self._use_conn(conn)
-        try:
-            rows = c.execute(
-                "SELECT id, name, type, path, enabled, created_at, updated_at FROM sensors ORDER BY name"
-            ).fetchall()
-            out = []
-            for r in rows:
-                d = dict(r)
-                d["enabled"] = bool(d["enabled"])
-                out.append(d)
-            return out
-        finally:
-            if close:
-                c.close()
+        c = self._reader(conn)
+        rows = c.execute(
+            f"SELECT {_COLUMNS} FROM sensors ORDER BY name"
+        ).fetchall()
+        out = []
+        for r in rows:
+            d = dict(r)
+            d["enabled"] = bool(d["enabled"])
+            out.append(d)
+        return out
 
     def update(self, sensor_id: int, name: Optional[str] = None, path: Optional[str] = None,
                enabled: Optional[bool] = None, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
-            current = c.execute("SELECT id, name, type, path, enabled FROM sensors WHERE id = ?", (sensor_id,)).fetchone()
+            current = c.execute("SELECT id, name, type, path, source_key, enabled FROM sensors WHERE id = ?",
+                                (sensor_id,)).fetchone()
             if not current:
                 raise ValueError("Unknown sensor_id")
 
@@ -114,24 +118,28 @@ class Sensors(DatabaseBase):
             if not os.path.exists(new_path):
                 raise ValueError("path does not exist on this system")
 
+            # A path set by hand unbinds the sensor from its discovered identity.
+            new_source_key = current["source_key"] if path is None else None
+
             new_enabled = int(bool(enabled)) if enabled is not None else int(current["enabled"])
             now = now_ts()
 
             c.execute(
-                "UPDATE sensors SET name = ?, path = ?, enabled = ?, updated_at = ? WHERE id = ?",
-                (new_name, new_path, new_enabled, now, sensor_id),
+                "UPDATE sensors SET name = ?, path = ?, source_key = ?, enabled = ?, updated_at = ? WHERE id = ?",
+                (new_name, new_path, new_source_key, new_enabled, now, sensor_id),
             )
             c.commit()
+            self._notify_change("sensors")
             return self.get(sensor_id, conn=c)
         finally:
-            if close:
-                c.close()
+            if release:
+                self._release_writer()
 
     def delete(self, sensor_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
             row = c.execute(
-                "SELECT id, name, type, path, enabled, created_at, updated_at FROM sensors WHERE id = ?",
+                f"SELECT {_COLUMNS} FROM sensors WHERE id = ?",
                 (sensor_id,),
             ).fetchone()
             if not row:
@@ -139,10 +147,65 @@ class Sensors(DatabaseBase):
 
             c.execute("DELETE FROM sensors WHERE id = ?", (sensor_id,))
             c.commit()
+            self._notify_change("sensors")
 
             out = dict(row)
             out["enabled"] = bool(out["enabled"])
             return out
         finally:
-            if close:
-                c.close()
\ No newline at end of file
+            if release:
+                self._release_writer()
+
+    def upsert_many(self, sensors: List[Dict[str, Any]], conn: Optional[sqlite3.Connection] = None) -> Dict[str, int]:
+        # Creates or updates sensors by name with one statement. Returns the id of every sensor by name.
+        rows = []
+        for sensor in sensors:
+            name = (sensor.get("name") or "").strip()
+            if not name:
+                raise ValueError("Sensor name must not be empty")
+            sensor_type = (sensor.get("type") or "").strip().lower()
+            if sensor_type not in ("thermal_zone", "hwmon"):
+                raise ValueError("type must be 'thermal_zone' or 'hwmon'")
+            path = (sensor.get("path") or "").strip()
+            if not path.startswith("/"):
+                raise ValueError("path must be an absolute filesystem path")
+            if not os.path.exists(path):
+                raise ValueError(f"path does not exist on this system: {path}")
+            source_key = sensor.get("source_key") or None
+            rows.append((name, sensor_type, path, source_key, 1 if sensor.get("enabled", True) else 0))
+
+        c, release = self._use_writer(conn)
+        try:
+            now = now_ts()
+            c.executemany(
+                """
+                INSERT INTO sensors(name, type, path, source_key, enabled, created_at, updated_at)
+                VALUES(?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    type = excluded.type, path = excluded.path, source_key = excluded.source_key,
+                    enabled = excluded.enabled, updated_at = excluded.updated_at
+                """,
+                [row + (now, now) for row in rows],
+            )
+            c.commit()
+            if rows:
+                self._notify_change("sensors")
+            return {str(r["name"]): int(r["id"]) for r in c.execute("SELECT id, name FROM sensors").fetchall()}
+        finally:
+            if release:
+                self._release_writer()
+
+    def delete_many(self, sensor_ids: List[int], conn: Optional[sqlite3.Connection] = None) -> int:
+        # Their curves and points go with them (ON DELETE CASCADE).
+        if not sensor_ids:
+            return 0
+        c, release = self._use_writer(conn)
+        try:
+            c.executemany("DELETE FROM sensors WHERE id = ?", [(int(sensor_id),) for sensor_id in sensor_ids])
+            c.commit()
+            self._notify_change("sensors")
+            self._notify_change("curves")
+            return len(sensor_ids)
+        finally:
+            if release:
+                self._release_writer()
\ No newline at end of file
@@ -1,8 +1,16 @@
 # app/database/schemas/settings.py
+import logging
 import sqlite3
+import threading
 from typing import Optional, Dict, Any
+
+from pydantic import ValidationError
+
 from app.core.time_utils import now_ts
 from app.database.database_base import DatabaseBase
+from app.domain.models.settings import SettingsModel
+
+logger = logging.getLogger(__name__)
 
 
 DEFAULTS: Dict[str, str] = {
@@ -11,9 +19,14 @@ DEFAULTS: Dict[str, str] = {
 
     # Control loop behavior
     "loop_interval_s": "1.0",
+    "sensor_timeout_ms": "250",
     "smoothing_window_s": "15.0",
     "hysteresis_c": "1.0",
 
+    # Temperature filtering
+    "smoothing_filter": "mean",
+    "spike_threshold_c": "0.0",
+
     # Kickstart
     "kickstart_enabled": "1",
     "kickstart_duty_percent": "100",
@@ -25,12 +38,25 @@ DEFAULTS: Dict[str, str] = {
 
     # PWM
     "pwm_frequency_hz": "25000",
+
+    # Event log retention (0 disables the limit / the rollup)
+    "events_max_age_days": "30",
+    "events_max_rows": "100000",
+    "events_rollup_window_s": "60",
 }
 
 
 class Settings(DatabaseBase):
-    def __init__(self, data_dir: str) -> None:
+    def __init__(self, data_dir: str, defaults: Optional[Dict[str, str]] = None) -> None:
         super().__init__(data_dir, db_name="app.db")
+        # Values for keys missing in the database: DEFAULTS, overridden by the environment (e.g. PWM_FREQUENCY_HZ).
+        # Every parsed model uses the same ones, so the cached model does not depend on who asked first.
+        self._defaults: Dict[str, str] = {**DEFAULTS, **(defaults or {})}
+        # Last validated settings. Replaced as a whole, never mutated; dropped after every committed write.
+        self._model: Optional[SettingsModel] = None
+        self._model_generation = 0
+        self._model_lock = threading.Lock()
+        self.add_change_listener(self._on_change)
 
     def _create_schema(self, conn: sqlite3.Connection) -> None:
         conn.executescript(
@@ -54,22 +80,18 @@ class Settings(DatabaseBase):
         key = (key or "").strip()
         if not key:
             return default
-        c, close = self._use_conn(conn)
-        try:
-            row = c.execute("SELECT value FROM app_settings WHERE key = ?", (key,)).fetchone()
-            if not row:
-                return default
-            return str(row["value"])
-        finally:
-            if close:
-                c.close()
+        c = self._reader(conn)
+        row = c.execute("SELECT value FROM app_settings WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return default
+        return str(row["value"])
 
     def set(self, key: str, value: str, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
         key = (key or "").strip()
         if not key:
             raise ValueError("key must not be empty")
 
-        c, close = self._use_conn(conn)
+        c, release = self._use_writer(conn)
         try:
             now = now_ts()
             c.execute(
@@ -77,32 +99,98 @@ class Settings(DatabaseBase):
                 (key, str(value), now),
             )
             c.commit()
+            self._notify_change("app_settings")
             row = c.execute("SELECT key, value, updated_at FROM app_settings WHERE key = ?", (key,)).fetchone()
             if not row:
                 raise ValueError("Failed to set setting")
             return dict(row)
         finally:
-            if close:
-                c.close()
+            if release:
+                self._release_writer()
 
     def get_all(self, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
-        try:
-            rows = c.execute("SELECT key, value, updated_at FROM app_settings ORDER BY key").fetchall()
-            out = {}
-            for r in rows:
-                out[str(r["key"])] = str(r["value"])
-            return out
-        finally:
-            if close:
-                c.close()
+        c = self._reader(conn)
+        rows = c.execute("SELECT key, value, updated_at FROM app_settings ORDER BY key").fetchall()
+        out = {}
+        for r in rows:
+            out[str(r["key"])] = str(r["value"])
+        return out
+
+    def get_model(self, conn: Optional[sqlite3.Connection] = None) -> SettingsModel:
+        # Typed, validated settings. Parsed once per change; later calls return the same immutable object.
+        model = self._model
+        if model is not None:
+            return model
+
+        generation = self._model_generation
+        model = _parse_model({**self._defaults, **self.get_all(conn=conn)}, self._defaults)
+        with self._model_lock:
+            if generation == self._model_generation:
+                self._model = model
+        return model
 
     def update_from_payload(self, payload: Dict[str, Any], conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
-        c, close = self._use_conn(conn)
+        if conn is not None:
+            model = self._validate_update(payload, conn)
+            self._store(conn, _to_raw(model, payload))
+            return self.get_all(conn=conn)
+
+        # All keys are committed together.
+        with self.transaction() as c:
+            model = self._validate_update(payload, c)
+            self._store(c, _to_raw(model, payload))
+            out = self.get_all(conn=c)
+
+        # Change listeners already ran on commit; publish the validated object for the next reader.
+        with self._model_lock:
+            self._model = model
+        return out
+
+    def _store(self, c: sqlite3.Connection, raw: Dict[str, str]) -> None:
+        # One statement for all keys; committed by the caller's transaction.
+        if not raw:
+            return
+        now = now_ts()
+        c.executemany(
+            "INSERT OR REPLACE INTO app_settings(key, value, updated_at) VALUES(?, ?, ?)",
+            [(k, v, now) for k, v in raw.items()],
+        )
+        c.commit()
+        self._notify_change("app_settings")
+
+    def _validate_update(self, payload: Dict[str, Any], conn: sqlite3.Connection) -> SettingsModel:
+        current = _parse_model({**self._defaults, **self.get_all(conn=conn)}, self._defaults).model_dump()
         try:
-            for k, v in payload.items():
-                self.set(str(k), str(v), conn=c)
-            return self.get_all(conn=c)
-        finally:
-            if close:
-                c.close()
\ No newline at end of file
+            return SettingsModel.model_validate({**current, **payload})
+        except ValidationError as e:
+            raise ValueError(_describe(e))
+
+    def _on_change(self, table: str) -> None:
+        if table == "app_settings":
+            with self._model_lock:
+                self._model_generation += 1
+                self._model = None
+
+
+def _parse_model(raw: Dict[str, Any], defaults: Dict[str, str]) -> SettingsModel:
+    # Stored values that do not validate (edited by hand, older versions) fall back to their defaults.
+    try:
+        return SettingsModel.model_validate(raw)
+    except ValidationError as e:
+        invalid = {str(err["loc"][0]) for err in e.errors() if err.get("loc")}
+        for key in invalid:
+            logger.warning("Invalid setting %s=%r; using default %r", key, raw.get(key), defaults.get(key))
+        return SettingsModel.model_validate({**raw, **{k: defaults[k] for k in invalid if k in defaults}})
+
+
+def _to_raw(model: SettingsModel, payload: Dict[str, Any]) -> Dict[str, str]:
+    # Stores the normalized form of the updated keys (e.g. booleans as "1"/"0", like the defaults).
+    out: Dict[str, str] = {}
+    for key in payload:
+        value = getattr(model, key, payload[key])
+        out[key] = ("1" if value else "0") if isinstance(value, bool) else str(value)
+    return out
+
+
+def _describe(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
\ No newline at end of file
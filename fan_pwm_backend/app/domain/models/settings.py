@@ -1,14 +1,21 @@
 # app/domain/models/settings.py
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SettingsModel(BaseModel):
+    # Immutable: one instance is shared by the control loop until the settings change.
+    model_config = ConfigDict(frozen=True)
+
     unit_display: str = Field(pattern="^(C|F|K)$")
 
     loop_interval_s: float = Field(gt=0)
+    sensor_timeout_ms: int = Field(ge=0, le=10000)
     smoothing_window_s: float = Field(ge=0)
     hysteresis_c: float = Field(ge=0)
 
+    smoothing_filter: str = Field(pattern="^(mean|ema|median)$")
+    spike_threshold_c: float = Field(ge=0)
+
     kickstart_enabled: bool
     kickstart_duty_percent: int = Field(ge=0, le=100)
     kickstart_ms: int = Field(ge=0, le=5000)
@@ -16,4 +23,8 @@ class SettingsModel(BaseModel):
     hard_limit_c: float = Field(ge=0)
     hard_limit_margin_c: float = Field(ge=0, le=20)
 
-    pwm_frequency_hz: int = Field(gt=0)
\ No newline at end of file
+    pwm_frequency_hz: int = Field(gt=0)
+
+    events_max_age_days: float = Field(ge=0)
+    events_max_rows: int = Field(ge=0)
+    events_rollup_window_s: float = Field(ge=0, le=86400)
\ No newline at end of file
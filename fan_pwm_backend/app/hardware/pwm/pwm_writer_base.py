@@ -1,5 +1,6 @@
 # app/hardware/pwm/pwm_writer_base.py
 from abc import ABC, abstractmethod
+from typing import Dict
 
 
 class PwmWriterBase(ABC):
@@ -21,4 +22,7 @@ class PwmWriterBase(ABC):
 
     @abstractmethod
     def disable(self) -> None:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def write_stats(self) -> Dict[str, int]:
+        return {}
\ No newline at end of file
@@ -1,15 +1,26 @@
 # app/hardware/pwm/sysfs_pwm_writer.py
 import os
+from typing import Dict, Optional
+
 from app.hardware.pwm.pwm_writer_base import PwmWriterBase
 
 
 class SysfsPwmWriter(PwmWriterBase):
-    def __init__(self, pwm_chip: str, pwm_channel: int) -> None:
+    def __init__(self, pwm_chip: str, pwm_channel: int, sysfs_root: str = "/sys/class/pwm") -> None:
+        # sysfs_root only differs from the default for fake trees (benchmarks).
         self._chip = pwm_chip
         self._channel = int(pwm_channel)
-        self._chip_path = os.path.join("/sys/class/pwm", self._chip)
+        self._chip_path = os.path.join(sysfs_root, self._chip)
         self._pwm_path = os.path.join(self._chip_path, f"pwm{self._channel}")
 
+        # Cached hardware state. Reset whenever a write fails so the next call starts from scratch.
+        self._period_ns: Optional[int] = None
+        self._duty_fd: Optional[int] = None
+        self._last_duty_ns: Optional[int] = None
+
+        self._writes_issued = 0
+        self._writes_suppressed = 0
+
     def ensure_exported(self) -> None:
         if os.path.isdir(self._pwm_path):
             return
@@ -22,28 +33,71 @@ class SysfsPwmWriter(PwmWriterBase):
         self.ensure_exported()
         period_ns = int(1_000_000_000 // int(hz))
         period_path = os.path.join(self._pwm_path, "period")
+        # The kernel rejects a period shorter than the current duty_cycle; drop the duty first in that case.
+        duty_path = os.path.join(self._pwm_path, "duty_cycle")
+        current_duty_ns = self._last_duty_ns
+        if current_duty_ns is None and os.path.exists(duty_path):
+            try:
+                current_duty_ns = int(_read_text(duty_path))
+            except (OSError, ValueError):
+                current_duty_ns = None
+        self._reset_cache()
+        if current_duty_ns is not None and current_duty_ns > period_ns:
+            _write_text(duty_path, "0")
         _write_text(period_path, str(period_ns))
+        self._period_ns = period_ns
+        # The same duty_cycle in ns is a different percentage now.
+        self._last_duty_ns = None
 
     def set_duty_percent(self, duty_percent: int) -> None:
         duty_percent = int(duty_percent)
         if duty_percent < 0 or duty_percent > 100:
             raise ValueError("duty_percent must be 0..100")
 
-        self.ensure_exported()
-        period_ns = int(_read_text(os.path.join(self._pwm_path, "period")))
+        period_ns = self._period_ns
+        if period_ns is None:
+            self.ensure_exported()
+            period_ns = int(_read_text(os.path.join(self._pwm_path, "period")))
+            self._period_ns = period_ns
+
         duty_ns = int(period_ns * duty_percent / 100.0)
-        duty_path = os.path.join(self._pwm_path, "duty_cycle")
-        _write_text(duty_path, str(duty_ns))
+        if duty_ns == self._last_duty_ns:
+            self._writes_suppressed += 1
+            return
+
+        try:
+            if self._duty_fd is None:
+                self._duty_fd = os.open(os.path.join(self._pwm_path, "duty_cycle"), os.O_WRONLY | os.O_CLOEXEC)
+            os.pwrite(self._duty_fd, str(duty_ns).encode("ascii"), 0)
+        except OSError:
+            self._reset_cache()
+            raise
+        self._last_duty_ns = duty_ns
+        self._writes_issued += 1
 
     def enable(self) -> None:
         self.ensure_exported()
         _write_text(os.path.join(self._pwm_path, "enable"), "1")
 
     def disable(self) -> None:
+        self._reset_cache()
         if not os.path.isdir(self._pwm_path):
             return
         _write_text(os.path.join(self._pwm_path, "enable"), "0")
 
+    def write_stats(self) -> Dict[str, int]:
+        return {"writes_issued": self._writes_issued, "writes_suppressed": self._writes_suppressed}
+
+    def _reset_cache(self) -> None:
+        if self._duty_fd is not None:
+            try:
+                os.close(self._duty_fd)
+            except OSError:
+                pass
+        self._duty_fd = None
+        self._period_ns = None
+        self._last_duty_ns = None
+
 
 def _write_text(path: str, value: str) -> None:
     with open(path, "w", encoding="utf-8") as f:
@@ -52,4 +106,4 @@ def _write_text(path: str, value: str) -> None:
 
 def _read_text(path: str) -> str:
     with open(path, "r", encoding="utf-8") as f:
-        return (f.read() or "").strip()
\ No newline at end of file
+        return (f.read() or "").strip()
@@ -0,0 +1,207 @@
+# app/hardware/sensors/sensor_discovery.py
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+THERMAL_ROOT = "/sys/class/thermal"
+HWMON_ROOT = "/sys/class/hwmon"
+
+_TEMP_INPUT = re.compile(r"^temp(\d+)_input$")
+
+
+@dataclass(frozen=True)
+class DiscoveredSensor:
+    # Stable identity: driver name + label, e.g. "hwmon/nvme/Composite" or "thermal/cpu-thermal". Unlike the
+    # hwmonN / thermal_zoneN numbers it survives reboots and driver rebinds.
+    key: str
+    # Suggested sensor name, unique within one inventory.
+    name: str
+    type: str
+    path: str
+    driver: str
+    label: str
+
+
+@dataclass(frozen=True)
+class _Device:
+    # One parsed hwmonN / thermal_zoneN directory. The inode is part of the check because hwmonN is a symlink
+    # that can point at another device after a rebind.
+    stamp: Tuple[int, int]
+    driver: str
+    device: str
+    # (label, attribute path) per temperature input.
+    inputs: Tuple[Tuple[str, str], ...]
+
+
+class SensorScanner:
+    # Walks /sys/class/thermal/thermal_zone* and /sys/class/hwmon/hwmon*/temp*_input and keeps an inventory
+    # indexed by stable identity. A rescan only parses device directories whose mtime or inode changed (an
+    # attribute was added or removed, or the device is new); the others are taken from the previous scan.
+    # Sysfs labels and driver names do not change while a device exists, so that check is sufficient.
+    # The roots can point at a fake sysfs tree.
+    def __init__(self, thermal_root: str = THERMAL_ROOT, hwmon_root: str = HWMON_ROOT) -> None:
+        self._roots = {"thermal_zone": thermal_root, "hwmon": hwmon_root}
+        self._lock = threading.Lock()
+        self._devices: Dict[str, _Device] = {}
+        self._inventory: Dict[str, DiscoveredSensor] = {}
+        self._by_path: Dict[str, DiscoveredSensor] = {}
+        self._stats: Dict[str, float] = {"scans": 0, "devices_parsed": 0, "devices_reused": 0, "last_scan_ms": 0.0}
+
+    def scan(self) -> List[DiscoveredSensor]:
+        with self._lock:
+            t0 = time.perf_counter()
+            parsed = reused = 0
+            devices: Dict[str, _Device] = {}
+            found: List[Tuple[str, str, str, str, str]] = []
+            for sensor_type, root in self._roots.items():
+                prefix = "thermal_zone" if sensor_type == "thermal_zone" else "hwmon"
+                for dir_path in _list_dirs(root, prefix):
+                    try:
+                        st = os.stat(dir_path)
+                    except OSError:
+                        continue
+                    stamp = (st.st_ino, st.st_mtime_ns)
+                    device = self._devices.get(dir_path)
+                    if device is None or device.stamp != stamp:
+                        device = _parse_thermal_zone(dir_path, stamp) if sensor_type == "thermal_zone" \
+                            else _parse_hwmon(dir_path, stamp)
+                        parsed += 1
+                    else:
+                        reused += 1
+                    if device is None:
+                        continue
+                    devices[dir_path] = device
+                    for label, path in device.inputs:
+                        found.append((sensor_type, device.driver, device.device, label, path))
+
+            if parsed or devices.keys() != self._devices.keys():
+                self._inventory = _index(found)
+                self._by_path = {s.path: s for s in self._inventory.values()}
+            self._devices = devices
+            inventory = self._inventory
+            self._stats = {
+                "scans": self._stats["scans"] + 1,
+                "devices_parsed": parsed,
+                "devices_reused": reused,
+                "last_scan_ms": round((time.perf_counter() - t0) * 1000.0, 3),
+            }
+            return list(inventory.values())
+
+    def get(self, key: str) -> Optional[DiscoveredSensor]:
+        return self._inventory.get(key)
+
+    def find_path(self, path: str) -> Optional[DiscoveredSensor]:
+        return self._by_path.get(path)
+
+    def inventory(self) -> List[DiscoveredSensor]:
+        return list(self._inventory.values())
+
+    def stats(self) -> Dict[str, float]:
+        return dict(self._stats)
+
+
+# Shared by the API and the control plane, so that rescans are incremental.
+SCANNER = SensorScanner()
+
+
+def _list_dirs(root: str, prefix: str) -> List[str]:
+    try:
+        entries = [e for e in os.scandir(root) if e.name.startswith(prefix) and e.name[len(prefix):].isdigit()]
+    except OSError:
+        return []
+    # Numeric order, so that hwmon10 comes after hwmon9 and collisions are resolved the same way every scan.
+    entries.sort(key=lambda e: int(e.name[len(prefix):]))
+    # Class entries are symlinks into /sys/devices; is_dir() follows them.
+    return [e.path for e in entries if e.is_dir()]
+
+
+def _parse_thermal_zone(dir_path: str, stamp: Tuple[int, int]) -> Optional[_Device]:
+    path = os.path.join(dir_path, "temp")
+    if not os.path.exists(path):
+        return None
+    driver = _read_text(os.path.join(dir_path, "type")) or os.path.basename(dir_path)
+    return _Device(stamp=stamp, driver=driver, device="", inputs=((driver, path),))
+
+
+def _parse_hwmon(dir_path: str, stamp: Tuple[int, int]) -> Optional[_Device]:
+    inputs: List[Tuple[int, str, str]] = []
+    labels: Dict[int, str] = {}
+    try:
+        entries = list(os.scandir(dir_path))
+    except OSError:
+        return None
+    for e in entries:
+        m = _TEMP_INPUT.match(e.name)
+        if m:
+            inputs.append((int(m.group(1)), e.name, e.path))
+        elif e.name.startswith("temp") and e.name.endswith("_label"):
+            index = e.name[4:-6]
+            if index.isdigit():
+                labels[int(index)] = _read_text(e.path)
+    if not inputs:
+        return None
+    inputs.sort()
+    driver = _read_text(os.path.join(dir_path, "name")) or "hwmon"
+    # The parent device (e.g. "0000:01:00.0") tells apart two devices of the same driver.
+    try:
+        device = os.path.basename(os.readlink(os.path.join(dir_path, "device")))
+    except OSError:
+        device = ""
+    return _Device(
+        stamp=stamp,
+        driver=driver,
+        device=device,
+        inputs=tuple((labels.get(i) or f"temp{i}", path) for i, _, path in inputs),
+    )
+
+
+def _index(found: List[Tuple[str, str, str, str, str]]) -> Dict[str, DiscoveredSensor]:
+    # Key by driver + label. Only when two devices of the same driver report the same label, the parent
+    # device is added to the key (and a counter as the last resort).
+    counts: Dict[str, int] = {}
+    for sensor_type, driver, _, label, _ in found:
+        base = _key(sensor_type, driver, label)
+        counts[base] = counts.get(base, 0) + 1
+
+    inventory: Dict[str, DiscoveredSensor] = {}
+    names: Dict[str, int] = {}
+    for sensor_type, driver, device, label, path in found:
+        key = _key(sensor_type, driver, label)
+        if counts[key] > 1 and device:
+            key = _key(sensor_type, f"{driver}@{device}", label)
+        n = 2
+        unique = key
+        while unique in inventory:
+            unique = f"{key}#{n}"
+            n += 1
+
+        name = _slug(driver if sensor_type == "thermal_zone" else f"{driver}-{label}")
+        if name in names:
+            names[name] += 1
+            name = f"{name}-{names[name]}"
+        else:
+            names[name] = 1
+        inventory[unique] = DiscoveredSensor(key=unique, name=name, type=sensor_type, path=path, driver=driver,
+                                             label=label)
+    return inventory
+
+
+def _key(sensor_type: str, driver: str, label: str) -> str:
+    if sensor_type == "thermal_zone":
+        return f"thermal/{driver}"
+    return f"hwmon/{driver}/{label}"
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "sensor"
+
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
@@ -1,8 +1,16 @@
 # app/hardware/sensors/sensor_reader_base.py
 from abc import ABC, abstractmethod
+from typing import Iterable
 
 
 class SensorReaderBase(ABC):
     @abstractmethod
     def read_celsius(self, path: str) -> float:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def retain(self, paths: Iterable[str]) -> None:
+        # Readers that keep per-path resources release everything not listed here.
+        pass
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,88 @@
+# app/hardware/sensors/sysfs_attribute_cache.py
+import errno
+import os
+import threading
+from typing import Dict, Iterable
+
+# The device behind a held-open attribute went away (e.g. a hwmon driver was rebound); reopening the path fixes it.
+_REOPEN_ERRNOS = (errno.ENODEV, errno.ESTALE, errno.EBADF)
+
+
+class _Attribute:
+    __slots__ = ("fd", "buf", "view")
+
+    def __init__(self, fd: int, size: int) -> None:
+        self.fd = fd
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+
+
+class SysfsAttributeCache:
+    # Keeps one open descriptor and one read buffer per sysfs attribute, so a read is a single pread().
+    # Each path has its own buffer; concurrent reads of different paths are safe.
+    def __init__(self, buffer_size: int = 32) -> None:
+        self._buffer_size = int(buffer_size)
+        self._lock = threading.Lock()
+        self._attrs: Dict[str, _Attribute] = {}
+
+    def read_int(self, path: str) -> int:
+        attr = self._attrs.get(path)
+        if attr is None:
+            attr = self._open(path)
+        try:
+            n = os.preadv(attr.fd, [attr.view], 0)
+        except OSError as e:
+            if e.errno not in _REOPEN_ERRNOS:
+                raise
+            self.close(path)
+            attr = self._open(path)
+            n = os.preadv(attr.fd, [attr.view], 0)
+        return _parse_int(attr.buf, n)
+
+    def retain(self, paths: Iterable[str]) -> None:
+        keep = set(paths)
+        for path in [p for p in list(self._attrs) if p not in keep]:
+            self.close(path)
+
+    def close(self, path: str) -> None:
+        with self._lock:
+            attr = self._attrs.pop(path, None)
+        if attr is not None:
+            try:
+                os.close(attr.fd)
+            except OSError:
+                pass
+
+    def close_all(self) -> None:
+        for path in list(self._attrs):
+            self.close(path)
+
+    def _open(self, path: str) -> _Attribute:
+        with self._lock:
+            attr = self._attrs.get(path)
+            if attr is None:
+                attr = _Attribute(os.open(path, os.O_RDONLY | os.O_CLOEXEC), self._buffer_size)
+                self._attrs[path] = attr
+            return attr
+
+
+def _parse_int(buf: bytearray, n: int) -> int:
+    # Parses an ASCII integer such as b"48312\n" without decoding to str.
+    value = 0
+    negative = False
+    digits = 0
+    for i in range(n):
+        b = buf[i]
+        if 48 <= b <= 57:
+            value = value * 10 + (b - 48)
+            digits += 1
+        elif b == 45 and digits == 0 and not negative:
+            negative = True
+        elif b in (9, 10, 13, 32, 0):
+            if digits:
+                break
+        else:
+            raise ValueError(f"invalid integer in sysfs attribute: {bytes(buf[:n])!r}")
+    if not digits:
+        raise ValueError("empty sysfs attribute")
+    return -value if negative else value
@@ -1,15 +1,20 @@
 # app/hardware/sensors/thermal_zone_reader.py
+from typing import Iterable
+
 from app.hardware.sensors.sensor_reader_base import SensorReaderBase
+from app.hardware.sensors.sysfs_attribute_cache import SysfsAttributeCache
 
 
 class ThermalZoneReader(SensorReaderBase):
+    def __init__(self) -> None:
+        self._attrs = SysfsAttributeCache()
+
     def read_celsius(self, path: str) -> float:
         # thermal_zone temp is typically reported as millidegrees Celsius.
-        raw = _read_text(path)
-        v = int(raw)
-        return float(v) / 1000.0
+        return float(self._attrs.read_int(path)) / 1000.0
 
+    def retain(self, paths: Iterable[str]) -> None:
+        self._attrs.retain(paths)
 
-def _read_text(path: str) -> str:
-    with open(path, "r", encoding="utf-8") as f:
-        return (f.read() or "").strip()
\ No newline at end of file
+    def close(self) -> None:
+        self._attrs.close_all()
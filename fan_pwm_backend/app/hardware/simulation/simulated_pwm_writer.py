@@ -0,0 +1,51 @@
+# app/hardware/simulation/simulated_pwm_writer.py
+from typing import Dict, Optional
+
+from app.hardware.pwm.pwm_writer_base import PwmWriterBase
+from app.hardware.simulation.thermal_plant import ThermalPlant
+
+
+class SimulatedPwmWriter(PwmWriterBase):
+    # One fan of a ThermalPlant, identified by chip and channel like a sysfs output. Suppresses repeated
+    # duty writes the same way SysfsPwmWriter does, so write stats are comparable.
+    def __init__(self, plant: ThermalPlant, pwm_chip: str, pwm_channel: int) -> None:
+        self._plant = plant
+        self._key = (pwm_chip, int(pwm_channel))
+        self._exported = False
+        self._last_duty: Optional[int] = None
+
+        self._writes_issued = 0
+        self._writes_suppressed = 0
+
+    def ensure_exported(self) -> None:
+        if not self._exported:
+            self._plant.set_fan(self._key)
+            self._exported = True
+
+    def set_frequency_hz(self, hz: int) -> None:
+        if hz <= 0:
+            raise ValueError("hz must be > 0")
+        self.ensure_exported()
+        self._last_duty = None
+
+    def set_duty_percent(self, duty_percent: int) -> None:
+        duty_percent = max(0, min(100, int(duty_percent)))
+        if duty_percent == self._last_duty:
+            self._writes_suppressed += 1
+            return
+        self.ensure_exported()
+        self._plant.set_fan(self._key, duty_percent=duty_percent)
+        self._last_duty = duty_percent
+        self._writes_issued += 1
+
+    def enable(self) -> None:
+        self.ensure_exported()
+        self._plant.set_fan(self._key, enabled=True)
+
+    def disable(self) -> None:
+        self._last_duty = None
+        if self._exported:
+            self._plant.set_fan(self._key, enabled=False)
+
+    def write_stats(self) -> Dict[str, int]:
+        return {"writes_issued": self._writes_issued, "writes_suppressed": self._writes_suppressed}
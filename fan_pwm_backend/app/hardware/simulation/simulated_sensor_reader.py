@@ -0,0 +1,12 @@
+# app/hardware/simulation/simulated_sensor_reader.py
+from app.hardware.sensors.sensor_reader_base import SensorReaderBase
+from app.hardware.simulation.thermal_plant import ThermalPlant
+
+
+class SimulatedSensorReader(SensorReaderBase):
+    # Reads the zone temperatures of a ThermalPlant; paths are ThermalPlant.sensor_paths.
+    def __init__(self, plant: ThermalPlant) -> None:
+        self._plant = plant
+
+    def read_celsius(self, path: str) -> float:
+        return self._plant.read_celsius(path)
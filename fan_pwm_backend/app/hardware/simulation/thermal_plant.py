@@ -0,0 +1,148 @@
+# app/hardware/simulation/thermal_plant.py
+import errno
+import math
+import os
+import random
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.clock import Clock
+
+
+@dataclass(frozen=True)
+class PlantConfig:
+    ambient_c: float = 25.0
+    # Lumped SoC + heatsink: heat capacity and thermal conductance to ambient without / with full airflow.
+    heat_capacity_j_per_k: float = 60.0
+    passive_w_per_k: float = 0.08
+    fan_w_per_k: float = 0.5
+    # Heat load: a daily cycle between base and base + daily swing, plus random bursts.
+    base_load_w: float = 2.5
+    daily_swing_w: float = 1.5
+    burst_load_w: float = 4.0
+    burst_probability: float = 0.1
+    # The load is constant within a step; a new burst is drawn for every step.
+    load_step_s: float = 60.0
+    # A stopped fan needs start_duty to spin up (what kickstart is for); a spinning fan stops below stop_duty.
+    start_duty_percent: int = 40
+    stop_duty_percent: int = 10
+    # Gaussian read noise, standard deviation in degrees.
+    noise_c: float = 0.2
+
+
+class _Fan:
+    __slots__ = ("duty_percent", "enabled", "spinning")
+
+    def __init__(self) -> None:
+        self.duty_percent = 0
+        self.enabled = False
+        self.spinning = False
+
+
+class ThermalPlant:
+    # First-order thermal model of one or more heat sources (thermal zones) cooled by all simulated fans:
+    #   C * dT/dt = P(t) - (G_passive + G_fan * airflow) * (T - T_ambient)
+    # Load and airflow are constant between two events (load step, duty write), so the state is advanced with
+    # the exact solution of that equation instead of numeric integration; reads are O(1) regardless of how
+    # much simulated time passed. Time comes from the clock, so the plant runs in real or simulated time.
+    def __init__(self, clock: Clock, root: str, zones: int = 1, config: Optional[PlantConfig] = None,
+                 seed: int = 0) -> None:
+        self._clock = clock
+        self._config = config or PlantConfig()
+        self._lock = threading.Lock()
+        self._load_rng = random.Random(seed)
+        self._noise_rng = random.Random(seed + 1)
+
+        self.root = root
+        self.sensor_paths: List[str] = [os.path.join(root, f"thermal_zone{i}", "temp") for i in range(max(1, int(zones)))]
+        # Each further zone gets a smaller share of the load, so the zones do not read the same temperature.
+        self._shares = [1.0 / (1.0 + 0.15 * i) for i in range(len(self.sensor_paths))]
+        self._zone_index = {path: i for i, path in enumerate(self.sensor_paths)}
+        self._temps_c = [self._config.ambient_c + 10.0] * len(self.sensor_paths)
+        self._fans: Dict[Tuple[str, int], _Fan] = {}
+
+        self._t = clock.monotonic()
+        self._step = -1
+        self._load_w = 0.0
+        self._stall_writes = 0
+
+    def create_nodes(self) -> None:
+        # Placeholder files at the sensor paths, so that the sensor API (which checks that a path exists)
+        # accepts them. Reads never touch these files.
+        with self._lock:
+            temps = list(self._temps_c)
+        for path, temp_c in zip(self.sensor_paths, temps):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"{int(temp_c * 1000)}\n")
+
+    def read_celsius(self, path: str) -> float:
+        zone = self._zone_index.get(path)
+        if zone is None:
+            raise FileNotFoundError(errno.ENOENT, "No such simulated sensor", path)
+        with self._lock:
+            self._advance()
+            temp_c = self._temps_c[zone] + self._noise_rng.gauss(0.0, self._config.noise_c)
+        # Millidegree resolution, like the kernel reports it.
+        return round(temp_c * 1000.0) / 1000.0
+
+    def set_fan(self, key: Tuple[str, int], duty_percent: Optional[int] = None, enabled: Optional[bool] = None) -> None:
+        cfg = self._config
+        with self._lock:
+            # Everything up to now still ran with the previous airflow.
+            self._advance()
+            fan = self._fans.setdefault(key, _Fan())
+            if duty_percent is not None:
+                fan.duty_percent = max(0, min(100, int(duty_percent)))
+            if enabled is not None:
+                fan.enabled = bool(enabled)
+
+            duty = fan.duty_percent if fan.enabled else 0
+            if duty < cfg.stop_duty_percent or duty <= 0:
+                fan.spinning = False
+            elif not fan.spinning and duty >= cfg.start_duty_percent:
+                fan.spinning = True
+            if duty > 0 and not fan.spinning:
+                self._stall_writes += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._advance()
+            return {
+                "temps_c": [round(t, 2) for t in self._temps_c],
+                "load_w": round(self._load_w, 2),
+                "airflow": round(self._airflow(), 3),
+                "stalled_fans": sum(1 for f in self._fans.values() if f.enabled and f.duty_percent > 0 and not f.spinning),
+                "stall_writes": self._stall_writes,
+            }
+
+    def _airflow(self) -> float:
+        return sum(f.duty_percent / 100.0 for f in self._fans.values() if f.enabled and f.spinning)
+
+    def _load_for_step(self, step: int) -> float:
+        cfg = self._config
+        t = step * cfg.load_step_s
+        daily = 0.5 - 0.5 * math.cos(2.0 * math.pi * t / 86400.0)
+        burst = cfg.burst_load_w if self._load_rng.random() < cfg.burst_probability else 0.0
+        return cfg.base_load_w + cfg.daily_swing_w * daily + burst
+
+    def _advance(self) -> None:
+        cfg = self._config
+        now = self._clock.monotonic()
+        conductance = cfg.passive_w_per_k + cfg.fan_w_per_k * self._airflow()
+        if self._step < 0:
+            self._step = int(self._t // cfg.load_step_s)
+            self._load_w = self._load_for_step(self._step)
+        while self._t < now:
+            step_end = (self._step + 1) * cfg.load_step_s
+            if self._t >= step_end:
+                self._step += 1
+                self._load_w = self._load_for_step(self._step)
+                continue
+            t_next = min(now, step_end)
+            decay = math.exp(-conductance * (t_next - self._t) / cfg.heat_capacity_j_per_k)
+            for i, share in enumerate(self._shares):
+                steady_c = cfg.ambient_c + self._load_w * share / conductance
+                self._temps_c[i] = steady_c + (self._temps_c[i] - steady_c) * decay
+            self._t = t_next
@@ -4,9 +4,15 @@ import logging
 
 from fastapi import FastAPI
 
+from app.api.routers.config_router import router as config_router
 from app.api.routers.control_router import router as control_router
 from app.api.routers.curves_router import router as curves_router
+from app.api.routers.events_router import router as events_router
+from app.api.routers.fans_router import router as fans_router
 from app.api.routers.health_router import router as health_router
+from app.api.routers.history_router import router as history_router
+from app.api.routers.metrics_router import http_metrics_middleware, router as metrics_router
+from app.api.routers.replay_router import router as replay_router
 from app.api.routers.sensors_router import router as sensors_router
 from app.api.routers.settings_router import router as settings_router
 from app.api.routers.setup_router import router as setup_router
@@ -19,11 +25,12 @@ from app.services.control_loop_service import ControlLoopService
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Raspberry pi fan conrol", version="1.0.0")
+app.middleware("http")(http_metrics_middleware)
 
 _config = AppConfig.from_env()
 configure_logging(_config.log_level)
 
-_db = Database(_config.data_dir)
+_db = Database(_config.data_dir, settings_defaults={"pwm_frequency_hz": str(_config.pwm_frequency_hz)})
 _control_loop: ControlLoopService | None = None
 _control_task: asyncio.Task | None = None
 
@@ -41,20 +48,33 @@ async def on_startup() -> None:
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
     global _control_loop, _control_task
+    stopped = True
     if _control_loop is not None:
         _control_loop.stop()
+        # The database stays open until the loop thread has exited; its exit path still writes to it.
+        stopped = await asyncio.to_thread(_control_loop.join, 5)
     if _control_task is not None:
         try:
-            await asyncio.wait_for(_control_task, timeout=5)
+            await asyncio.wait_for(_control_task, timeout=1)
         except Exception:
             pass
+    if stopped:
+        _db.close()
+    else:
+        logger.warning("Control loop did not stop within 5s; database left open")
     logger.info("Shutdown complete")
 
 
 app.include_router(health_router)
 app.include_router(status_router)
+app.include_router(history_router)
+app.include_router(metrics_router)
+app.include_router(events_router)
 app.include_router(setup_router)
 app.include_router(sensors_router)
 app.include_router(curves_router)
+app.include_router(fans_router)
 app.include_router(settings_router)
-app.include_router(control_router)
\ No newline at end of file
+app.include_router(config_router)
+app.include_router(control_router)
+app.include_router(replay_router)
\ No newline at end of file
@@ -0,0 +1,141 @@
+# app/services/config_bundle_service.py
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.database.database import Database
+from app.database.schemas.settings import DEFAULTS
+
+_FAN_FIELDS = ("name", "pwm_chip", "pwm_channel", "frequency_hz", "kickstart_enabled", "kickstart_duty_percent",
+               "kickstart_ms", "enabled")
+_SENSOR_FIELDS = ("name", "type", "path", "source_key", "enabled")
+
+
+class ConfigBundleService:
+    # The whole configuration as one document: settings, fans, and sensors with their curves and points.
+    # Everything is referenced by name (curves name their fan), so a bundle exported on one node can be
+    # applied to another. A bundle is applied in a single transaction with one executemany per table and
+    # step: it is stored completely or not at all, with one commit and one round of change notifications.
+    #
+    # Sections that are left out (null) are not touched. Without replace, listed items are created or
+    # updated and everything else is kept; with replace, fans, sensors and curves missing from a given
+    # section are deleted and settings missing from the bundle return to their defaults.
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    def export_bundle(self) -> Dict[str, Any]:
+        db = self._db
+        with db.read_snapshot() as conn:
+            settings = db.settings.get_model(conn=conn)
+            fans = db.fans.list(conn=conn)
+            sensors = db.sensors.list(conn=conn)
+            curves = db.curves.list_all(conn=conn)
+            points = db.curve_points.list_all(conn=conn)
+
+        fan_names = {int(f["id"]): str(f["name"]) for f in fans}
+        points_by_curve: Dict[int, List[Dict[str, Any]]] = {}
+        for p in points:
+            points_by_curve.setdefault(int(p["curve_id"]), []).append(
+                {"temp_c": p["temp_c"], "duty_percent": p["duty_percent"]})
+        curves_by_sensor: Dict[int, List[Dict[str, Any]]] = {}
+        for cu in curves:
+            curves_by_sensor.setdefault(int(cu["sensor_id"]), []).append({
+                "name": cu["name"],
+                "fan": fan_names.get(cu["fan_id"]) if cu["fan_id"] is not None else None,
+                "active": cu["is_active"],
+                "points": points_by_curve.get(int(cu["id"]), []),
+            })
+
+        return {
+            "settings": settings.model_dump(),
+            "fans": [{k: f[k] for k in _FAN_FIELDS} for f in fans],
+            "sensors": [
+                {**{k: s[k] for k in _SENSOR_FIELDS}, "curves": curves_by_sensor.get(int(s["id"]), [])}
+                for s in sensors
+            ],
+        }
+
+    def apply_bundle(self, bundle: Dict[str, Any], replace: bool = False) -> Dict[str, Any]:
+        fans: Optional[List[Dict[str, Any]]] = bundle.get("fans")
+        sensors: Optional[List[Dict[str, Any]]] = bundle.get("sensors")
+        settings: Optional[Dict[str, Any]] = bundle.get("settings")
+        _check_unique("fan", [f.get("name") for f in fans or []])
+        _check_unique("sensor", [s.get("name") for s in sensors or []])
+        for s in sensors or []:
+            _check_unique(f"curve of sensor {s.get('name')}", [cu.get("name") for cu in s.get("curves") or []])
+
+        db = self._db
+        summary: Dict[str, Any] = {"fans": 0, "sensors": 0, "curves": 0, "points": 0, "settings": 0,
+                                   "removed": {"fans": 0, "sensors": 0, "curves": 0}}
+        with db.transaction() as c:
+            if fans is not None:
+                if replace:
+                    keep = {_name(f) for f in fans}
+                    summary["removed"]["fans"] = db.fans.delete_many(
+                        [int(f["id"]) for f in db.fans.list(conn=c) if f["name"] not in keep], conn=c)
+                fan_ids = db.fans.upsert_many(fans, conn=c)
+                summary["fans"] = len(fans)
+            else:
+                fan_ids = {str(f["name"]): int(f["id"]) for f in db.fans.list(conn=c)}
+
+            if sensors is not None:
+                if replace:
+                    keep = {_name(s) for s in sensors}
+                    summary["removed"]["sensors"] = db.sensors.delete_many(
+                        [int(s["id"]) for s in db.sensors.list(conn=c) if s["name"] not in keep], conn=c)
+                sensor_ids = db.sensors.upsert_many(sensors, conn=c)
+                summary["sensors"] = len(sensors)
+
+                curves, points = self._resolve_curves(sensors, sensor_ids, fan_ids)
+                if replace:
+                    # Only the curves of sensors that list their curves.
+                    listed = {sensor_ids[_name(s)] for s in sensors if s.get("curves") is not None}
+                    keep_curves = {(cu["sensor_id"], cu["name"]) for cu in curves}
+                    summary["removed"]["curves"] = db.curves.delete_many(
+                        [int(cu["id"]) for cu in db.curves.list_all(conn=c)
+                         if int(cu["sensor_id"]) in listed and (int(cu["sensor_id"]), cu["name"]) not in keep_curves],
+                        conn=c)
+                curve_ids = db.curves.upsert_many(curves, conn=c)
+                summary["curves"] = len(curves)
+                summary["points"] = db.curve_points.replace_many(
+                    {curve_ids[key]: pts for key, pts in points.items()}, conn=c)
+
+            if settings is not None or replace:
+                payload = {**(DEFAULTS if replace else {}), **(settings or {})}
+                db.settings.update_from_payload(payload, conn=c)
+                summary["settings"] = len(payload)
+        return summary
+
+    def _resolve_curves(self, sensors: List[Dict[str, Any]], sensor_ids: Dict[str, int], fan_ids: Dict[str, int]
+                        ) -> Tuple[List[Dict[str, Any]], Dict[Tuple[int, str], List[Tuple[float, int]]]]:
+        # Curve rows for Curves.upsert_many and the new points per (sensor_id, curve name). Curves without a
+        # points list keep their points.
+        curves: List[Dict[str, Any]] = []
+        points: Dict[Tuple[int, str], List[Tuple[float, int]]] = {}
+        for s in sensors:
+            sensor_id = sensor_ids[_name(s)]
+            for cu in s.get("curves") or []:
+                fan = cu.get("fan")
+                if fan is not None and fan not in fan_ids:
+                    raise ValueError(f"Curve {cu.get('name')} of sensor {_name(s)} refers to unknown fan {fan}")
+                name = _name(cu)
+                curves.append({
+                    "sensor_id": sensor_id,
+                    "name": name,
+                    "fan_id": None if fan is None else fan_ids[fan],
+                    "is_active": bool(cu.get("active")),
+                })
+                if cu.get("points") is not None:
+                    points[(sensor_id, name)] = [(float(p["temp_c"]), int(p["duty_percent"])) for p in cu["points"]]
+        return curves, points
+
+
+def _name(item: Dict[str, Any]) -> str:
+    return (item.get("name") or "").strip()
+
+
+def _check_unique(kind: str, names: List[Any]) -> None:
+    seen = set()
+    for name in names:
+        name = (name or "").strip()
+        if name in seen:
+            raise ValueError(f"Duplicate {kind} name: {name}")
+        seen.add(name)
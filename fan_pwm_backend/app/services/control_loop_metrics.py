@@ -0,0 +1,98 @@
+# app/services/control_loop_metrics.py
+from typing import Dict, Iterable, List, Tuple
+
+from app.services.metrics import REGISTRY, Counter, Histogram, MetricsRegistry, Sample
+from app.services.runtime_state import RuntimeState
+from app.services.tick_scheduler import TickScheduler
+
+TICK_PHASES = ("settings", "sensors", "curves", "safety", "pwm", "events")
+
+
+class ControlLoopMetrics:
+    # Metric handles used by the control loop. All children are resolved up front (per sensor when the
+    # plan changes), so the tick only calls observe_ns()/inc() on plain objects. Values owned by other
+    # services (duty, override, PWM and event counters) are collected at scrape time instead.
+    def __init__(self, scheduler: TickScheduler, registry: MetricsRegistry = REGISTRY) -> None:
+        phases = registry.histogram("fan_tick_phase_duration_seconds", "Control loop tick time per phase.", ("phase",))
+        self.settings: Histogram = phases.labels("settings")
+        self.sensors: Histogram = phases.labels("sensors")
+        self.curves: Histogram = phases.labels("curves")
+        self.safety: Histogram = phases.labels("safety")
+        self.pwm: Histogram = phases.labels("pwm")
+        self.events: Histogram = phases.labels("events")
+        self.tick: Histogram = registry.histogram("fan_tick_duration_seconds", "Control loop tick duration.").labels()
+        self.tick_failures: Counter = registry.counter("fan_tick_failures_total", "Control loop ticks that raised.").labels()
+
+        self._read_duration = registry.histogram("fan_sensor_read_duration_seconds", "Sensor read latency.", ("sensor",))
+        self._read_failures = registry.counter("fan_sensor_read_failures_total", "Failed sensor reads.", ("sensor",))
+        self._read_timeouts = registry.counter("fan_sensor_read_timeouts_total",
+                                               "Sensor reads that missed the tick deadline.", ("sensor",))
+        self._sensor_names: Dict[int, str] = {}
+        self._per_sensor: Dict[int, Tuple[Histogram, Counter, Counter]] = {}
+
+        self._scheduler = scheduler
+        registry.collector("fan_ticks_total", "Control loop ticks run.", "counter", self._collect_ticks)
+        registry.collector("fan_ticks_missed_total", "Control loop ticks skipped because a tick overran.", "counter",
+                           self._collect_missed)
+        registry.collector("fan_duty_percent", "Fan duty cycle.", "gauge", _collect_duty)
+        registry.collector("fan_override_active", "1 while a manual duty override is active.", "gauge", _collect_override)
+        registry.collector("fan_pwm_writes_total", "PWM duty writes by outcome.", "counter", _collect_pwm_writes)
+        registry.collector("fan_kickstarts_total", "Fan kickstarts.", "counter", _collect_kickstarts)
+        registry.collector("fan_events_total", "Control loop events by sink outcome.", "counter", _collect_events)
+
+    def bind_sensors(self, sensors: Iterable[Tuple[int, str]]) -> None:
+        # Called on plan changes with (sensor_id, name) pairs.
+        current = dict(sensors)
+        for sensor_id, name in list(self._sensor_names.items()):
+            if current.get(sensor_id) != name:
+                self._read_duration.remove(name)
+                self._read_failures.remove(name)
+                self._read_timeouts.remove(name)
+                del self._sensor_names[sensor_id]
+                del self._per_sensor[sensor_id]
+        for sensor_id, name in current.items():
+            if sensor_id not in self._per_sensor:
+                self._sensor_names[sensor_id] = name
+                self._per_sensor[sensor_id] = (self._read_duration.labels(name), self._read_failures.labels(name),
+                                               self._read_timeouts.labels(name))
+
+    def sensor(self, sensor_id: int) -> Tuple[Histogram, Counter, Counter]:
+        # (read duration, failures, timeouts) of a bound sensor.
+        return self._per_sensor[sensor_id]
+
+    def _collect_ticks(self) -> Iterable[Sample]:
+        return [("fan_ticks_total", {}, self._scheduler.ticks)]
+
+    def _collect_missed(self) -> Iterable[Sample]:
+        return [("fan_ticks_missed_total", {}, self._scheduler.missed)]
+
+
+def _collect_duty() -> Iterable[Sample]:
+    snap = RuntimeState.snapshot()
+    out: List[Sample] = []
+    for fan, duties in snap["fans"].items():
+        out.append(("fan_duty_percent", {"fan": fan, "kind": "current"}, duties.get("current_duty_percent")))
+        out.append(("fan_duty_percent", {"fan": fan, "kind": "target"}, duties.get("target_duty_percent")))
+    return out
+
+
+def _collect_override() -> Iterable[Sample]:
+    return [("fan_override_active", {}, 1 if RuntimeState.override_snapshot()["mode"] == "override" else 0)]
+
+
+def _collect_pwm_writes() -> Iterable[Sample]:
+    pwm = RuntimeState.snapshot()["stats"].get("pwm", {})
+    return [
+        ("fan_pwm_writes_total", {"outcome": "issued"}, pwm.get("writes_issued", 0)),
+        ("fan_pwm_writes_total", {"outcome": "suppressed"}, pwm.get("writes_suppressed", 0)),
+    ]
+
+
+def _collect_kickstarts() -> Iterable[Sample]:
+    kickstart = RuntimeState.snapshot()["stats"].get("kickstart", {})
+    return [("fan_kickstarts_total", {"fan": fan}, stats.get("count", 0)) for fan, stats in kickstart.items()]
+
+
+def _collect_events() -> Iterable[Sample]:
+    events = RuntimeState.snapshot()["stats"].get("events", {})
+    return [("fan_events_total", {"outcome": k}, events.get(k, 0)) for k in ("written", "dropped", "failed")]
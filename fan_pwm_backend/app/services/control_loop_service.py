@@ -2,227 +2,401 @@
 import asyncio
 import logging
 import os
+import threading
 import time
-from collections import deque
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Optional, Tuple
 
+from app.core.clock import SYSTEM_CLOCK, Clock
 from app.core.config import AppConfig
 from app.database.database import Database
+from app.hardware.sensors.sensor_reader_base import SensorReaderBase
 from app.hardware.sensors.thermal_zone_reader import ThermalZoneReader
 from app.hardware.sensors.hwmon_reader import HwmonReader
+from app.hardware.sensors.sensor_discovery import SCANNER
+from app.hardware.simulation.simulated_pwm_writer import SimulatedPwmWriter
+from app.hardware.simulation.simulated_sensor_reader import SimulatedSensorReader
+from app.hardware.simulation.thermal_plant import ThermalPlant
+from app.services.control_plane_cache import ControlPlaneCache, ControlPlaneSnapshot, FanPlan
+from app.services.control_loop_metrics import ControlLoopMetrics
 from app.services.curve_engine import CurveEngine
+from app.services.event_retention import EventRetention
+from app.services.event_sink import EventSink
 from app.services.pwm_service import PwmService
 from app.services.safety_service import SafetyService
+from app.services.sensor_sampler import PathReading, SensorSampler
+from app.services.status_broadcaster import StatusBroadcaster
+from app.services.temperature_filters import FilterConfig, SensorFilterBank
+from app.services.telemetry_history import TelemetryHistory
+from app.services.tick_scheduler import TickScheduler
 from app.services.runtime_state import RuntimeState
 
 logger = logging.getLogger(__name__)
 
 
 class ControlLoopService:
-    def __init__(self, db: Database, config: AppConfig) -> None:
+    def __init__(self, db: Database, config: AppConfig, clock: Optional[Clock] = None) -> None:
+        # clock: time base of ticks, filters, kickstart windows and timestamps. A VirtualClock together with
+        # the simulated backend runs the loop faster than real time (soak tests, benchmarks).
         self._db = db
         self._config = config
+        self._clock = clock or SYSTEM_CLOCK
         RuntimeState.bind_db(db)
-
-        self._stop = False
-
-        self._thermal_reader = ThermalZoneReader()
-        self._hwmon_reader = HwmonReader()
+        RuntimeState.bind_clock(self._clock)
+
+        self._stop = threading.Event()
+        # Set on settings changes (and on stop) to end the current sleep early.
+        self._wake = threading.Event()
+        self._scheduler = TickScheduler(self._clock)
+        self._metrics = ControlLoopMetrics(self._scheduler)
+
+        # Simulated backend: every sensor reads and every fan cools the same thermal model.
+        self._plant: Optional[ThermalPlant] = None
+        self._readers: Dict[str, SensorReaderBase]
+        if config.hardware_backend == "simulated":
+            self._plant = ThermalPlant(self._clock, root=os.path.join(config.data_dir, "simulation"),
+                                       zones=config.simulation_sensors)
+            self._readers = {"thermal_zone": SimulatedSensorReader(self._plant),
+                             "hwmon": SimulatedSensorReader(self._plant)}
+        else:
+            self._readers = {"thermal_zone": ThermalZoneReader(), "hwmon": HwmonReader()}
+        self._sampler = SensorSampler(self._readers)
         self._curve_engine = CurveEngine()
         self._safety = SafetyService()
+        self._events = EventSink(db.events, clock=self._clock)
+        self._event_retention = EventRetention(db.events, db.settings, clock=self._clock)
+
+        # Simulated sensors are never discovered, so there is nothing to resolve against the host's sysfs.
+        self._control_plane = ControlPlaneCache(db=db, curve_engine=self._curve_engine,
+                                                scanner=None if self._plant is not None else SCANNER)
+        RuntimeState.bind_control_plane(self._control_plane)
 
-        self._pwm = PwmService(pwm_chip=config.pwm_chip, pwm_channel=config.pwm_channel)
-        self._pwm_initialized = False
+        # One output per enabled fan, in the order of ControlPlaneSnapshot.fans.
+        self._fans: List[_FanOutput] = []
 
-        self._temp_history: Dict[int, deque[Tuple[float, float]]] = {}
-        self._last_temp_used: Dict[int, float] = {}
+        self._filters = SensorFilterBank()
+        self._history = TelemetryHistory(capacity=config.history_capacity)
+        RuntimeState.bind_history(self._history)
+        self._broadcaster = StatusBroadcaster()
+        RuntimeState.bind_broadcaster(self._broadcaster)
+        self._plan_version: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
 
     def stop(self) -> None:
-        self._stop = True
+        self._stop.set()
+        self._wake.set()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        # Blocks until the loop thread has exited (it flushes events and disables the fans on its way out).
+        # Returns False if it is still running after timeout.
+        thread = self._thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
 
     async def run(self) -> None:
-        self._ensure_seeded()
+        # Ticks run on a dedicated thread so that blocking sysfs and SQLite calls never stall the event loop
+        # serving the API (and API bursts never delay a tick). The two sides only share RuntimeState.
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
 
-        while not self._stop:
-            started = time.time()
+        def _target() -> None:
             try:
-                await self._tick()
-            except Exception:
-                logger.exception("Control loop tick failed")
-                self._db.events.create(level="ERROR", message="control_loop_tick_failed", context=None)
-                RuntimeState.add_error("control_loop_tick_failed")
-
-            interval_s = _read_float(self._db.settings.get("loop_interval_s", "1.0"), 1.0)
-            elapsed = time.time() - started
-            sleep_s = max(0.05, interval_s - elapsed)
-            await asyncio.sleep(sleep_s)
-
-        try:
-            self._pwm.disable()
-        except Exception:
-            pass
-
-    async def _tick(self) -> None:
-        settings = self._db.settings.get_all()
+                self._run_forever()
+            finally:
+                loop.call_soon_threadsafe(lambda: finished.done() or finished.set_result(None))
 
-        unit_display = (settings.get("unit_display", "C") or "C").upper()
-        loop_interval_s = _read_float(settings.get("loop_interval_s", "1.0"), 1.0)
-        smoothing_window_s = _read_float(settings.get("smoothing_window_s", "15.0"), 15.0)
-        hysteresis_c = _read_float(settings.get("hysteresis_c", "1.0"), 1.0)
+        self._thread = threading.Thread(target=_target, name="control-loop", daemon=True)
+        self._thread.start()
+        await finished
 
-        kickstart_enabled = _read_bool(settings.get("kickstart_enabled", "1"), True)
-        kickstart_duty = _read_int(settings.get("kickstart_duty_percent", "100"), 100)
-        kickstart_ms = _read_int(settings.get("kickstart_ms", "300"), 300)
+    def _run_forever(self) -> None:
+        self._configure_thread()
+        self._ensure_seeded()
+        self._events.start()
+        self._event_retention.start()
 
-        hard_limit_c = _read_float(settings.get("hard_limit_c", "80.0"), 80.0)
-        hard_limit_margin_c = _read_float(settings.get("hard_limit_margin_c", "5.0"), 5.0)
+        self._db.add_change_listener(self._on_db_change)
 
-        pwm_frequency_hz = _read_int(settings.get("pwm_frequency_hz", str(self._config.pwm_frequency_hz)), self._config.pwm_frequency_hz)
+        while not self._stop.is_set():
+            self._scheduler.wait(self._wake)
+            if self._stop.is_set():
+                break
+            self._scheduler.begin_tick()
+            try:
+                self._tick()
+            except Exception:
+                logger.exception("Control loop tick failed")
+                self._events.emit(level="ERROR", message="control_loop_tick_failed", context=None)
+                RuntimeState.add_error("control_loop_tick_failed")
+                self._metrics.tick_failures.inc()
+
+            self._scheduler.end_tick(self._control_plane.get().settings.loop_interval_s)
+            RuntimeState.set_stats("scheduler", self._scheduler.summary())
+            RuntimeState.set_timing(self._scheduler.histograms())
+
+        self._db.remove_change_listener(self._on_db_change)
+        for fan in self._fans:
+            fan.pwm.disable()
+        self._sampler.close()
+        for reader in self._readers.values():
+            reader.close()
+        self._event_retention.stop()
+        self._events.stop()
+
+    def _configure_thread(self) -> None:
+        # Both calls act on the calling thread only (pid 0) and are best effort.
+        cpu = self._config.control_loop_cpu
+        if cpu is not None:
+            try:
+                os.sched_setaffinity(0, {int(cpu)})
+                logger.info("Control loop pinned to CPU %s", cpu)
+            except (AttributeError, OSError, ValueError) as e:
+                logger.warning("Could not pin control loop to CPU %s: %s", cpu, e)
 
-        # Override mode
+        priority = self._config.control_loop_rt_priority
+        if priority > 0:
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(int(priority)))
+                logger.info("Control loop running with SCHED_FIFO priority %s", priority)
+            except (AttributeError, OSError, ValueError) as e:
+                logger.warning("Could not raise control loop priority: %s", e)
+
+    def _tick(self) -> None:
+        metrics = self._metrics
+        t0 = time.perf_counter_ns()
+        plan = self._control_plane.get()
+        settings = plan.settings
+        if plan.version != self._plan_version:
+            self._on_plan_changed(plan)
+        t1 = time.perf_counter_ns()
+        metrics.settings.observe_ns(t1 - t0)
+
+        fans = self._fans
+        targets = [0] * len(fans)
+
+        # Override mode: the same duty on every fan
         override = RuntimeState.get_effective_override()
         if override is not None:
             target = int(override)
-            safety_decision = self._safety.apply(target, max_temp_c=None, hard_limit_c=hard_limit_c, margin_c=0.0)
-            await self._apply_pwm(safety_decision.duty_percent, pwm_frequency_hz, kickstart_enabled, kickstart_duty, kickstart_ms)
-            RuntimeState.set_target_duty(target)
-            return
-
-        # Auto mode: read enabled sensors
-        sensors = [s for s in self._db.sensors.list() if s.get("enabled")]
-        temps_c: Dict[str, float] = {}
-        max_temp: Optional[float] = None
-
-        # Compute per-sensor duty (only if sensor has an active curve)
-        duties: list[int] = []
-        for s in sensors:
-            sensor_id = int(s["id"])
-            sensor_name = str(s["name"])
-            sensor_type = str(s["type"])
-            sensor_path = str(s["path"])
-
-            temp_c = self._read_sensor_temp(sensor_id, sensor_type, sensor_path, smoothing_window_s, loop_interval_s, hysteresis_c)
-            if temp_c is not None:
-                temps_c[sensor_name] = temp_c
-                max_temp = temp_c if max_temp is None else max(max_temp, temp_c)
-
-            active_curve = self._get_active_curve(sensor_id)
-            if active_curve is None:
-                continue
-
-            points = self._db.curve_points.list(curve_id=int(active_curve["id"]))
-            point_pairs = [(float(p["temp_c"]), int(p["duty_percent"])) for p in points]
-
-            if temp_c is None:
-                continue
-
-            res = self._curve_engine.evaluate(point_pairs, temp_c)
-            duties.append(res.duty_percent)
+            targets = [target] * len(fans)
+            safety_decision = self._safety.apply(target, max_temp_c=None, hard_limit_c=settings.hard_limit_c, margin_c=0.0)
+            decisions = [safety_decision] * len(fans)
+            t2 = t3 = time.perf_counter_ns()
+            metrics.safety.observe_ns(t3 - t1)
+            temps_c: Dict[str, float] = {}
+        else:
+            # Auto mode: read enabled sensors
+            temps_c = {}
+            max_temp: Optional[float] = None
+
+            # One sampling pass for all fans: every sensor is read and filtered once per tick
+            readings = self._sampler.sample(((s.type, s.path) for s in plan.sensors), settings.sensor_timeout_ms / 1000.0)
+            t2 = time.perf_counter_ns()
+            metrics.sensors.observe_ns(t2 - t1)
+
+            now = self._clock.monotonic()
+            stale_sensors: list[str] = []
+            for s in plan.sensors:
+                reading = readings[s.path]
+                read_duration, read_failures, read_timeouts = metrics.sensor(s.id)
+                if reading.stale:
+                    stale_sensors.append(s.name)
+                    read_timeouts.inc()
+                else:
+                    read_duration.observe_ns(reading.latency_ns)
+                    if reading.value_c is None:
+                        read_failures.inc()
 
-        RuntimeState.set_temps(temps_c)
+                temp_c = self._filter_reading(s.id, s.path, reading, now)
+                if temp_c is None:
+                    continue
+                temps_c[s.name] = temp_c
+                max_temp = temp_c if max_temp is None else max(max_temp, temp_c)
 
-        target = max(duties) if duties else 0
+                # Each active curve is evaluated once and raises the target of the fan it is mapped to
+                for sc in s.curves:
+                    duty = sc.curve.evaluate(temp_c)
+                    if duty > targets[sc.fan_index]:
+                        targets[sc.fan_index] = duty
+
+            t3 = time.perf_counter_ns()
+            metrics.curves.observe_ns(t3 - t2)
+
+            decisions = [self._safety.apply(target, max_temp_c=max_temp, hard_limit_c=settings.hard_limit_c,
+                                            margin_c=settings.hard_limit_margin_c) for target in targets]
+            if not fans:
+                # Nothing to drive, but still report the safety state.
+                decisions = [self._safety.apply(0, max_temp_c=max_temp, hard_limit_c=settings.hard_limit_c,
+                                                margin_c=settings.hard_limit_margin_c)]
+            t4 = time.perf_counter_ns()
+            metrics.safety.observe_ns(t4 - t3)
+            t3 = t4
+
+            RuntimeState.set_temps(temps_c, stale_sensors=stale_sensors)
+            RuntimeState.set_stats("sensors", {"read_timeouts": self._sampler.timeouts})
+
+        applied = [self._apply_pwm(fan, decision.duty_percent) for fan, decision in zip(fans, decisions)]
+        t5 = time.perf_counter_ns()
+        metrics.pwm.observe_ns(t5 - t3)
+
+        self._publish(temps_c, targets, applied, next((d.reason for d in decisions if d.reason), None))
+        t6 = time.perf_counter_ns()
+        metrics.events.observe_ns(t6 - t5)
+        metrics.tick.observe_ns(t6 - t0)
+
+    def _publish(self, temps_c: Dict[str, float], targets: List[int], applied: List[Optional[int]],
+                 reason: Optional[str]) -> None:
+        # Status and history report the highest duty across fans; per-fan values are listed under "fans".
+        target = max(targets, default=0)
+        written = [d for d in applied if d is not None]
+        current = max(written) if written else None
         RuntimeState.set_target_duty(target)
-
-        safety_decision = self._safety.apply(target, max_temp_c=max_temp, hard_limit_c=hard_limit_c, margin_c=hard_limit_margin_c)
-        await self._apply_pwm(safety_decision.duty_percent, pwm_frequency_hz, kickstart_enabled, kickstart_duty, kickstart_ms)
-
-    async def _apply_pwm(self, duty_percent: int, pwm_frequency_hz: int,
-                        kickstart_enabled: bool, kickstart_duty: int, kickstart_ms: int) -> None:
+        if current is not None:
+            RuntimeState.set_current_duty(current)
+        RuntimeState.set_fans({
+            fan.plan.name: {"target_duty_percent": t, "current_duty_percent": a}
+            for fan, t, a in zip(self._fans, targets, applied)
+        })
+
+        write_stats: Dict[str, int] = {}
+        for fan in self._fans:
+            for k, v in fan.pwm.write_stats().items():
+                write_stats[k] = write_stats.get(k, 0) + v
+        RuntimeState.set_stats("pwm", write_stats)
+        RuntimeState.set_stats("kickstart", {fan.plan.name: fan.pwm.kickstart_stats() for fan in self._fans})
+
+        if self._plant is not None:
+            RuntimeState.set_stats("simulation", self._plant.stats())
+
+        self._history.record(self._clock.time(), temps_c, target, current, reason)
+        RuntimeState.set_stats("events", self._events.stats())
+        RuntimeState.set_stats("event_retention", self._event_retention.stats())
+        self._broadcaster.publish(RuntimeState.publish().live)
+
+    def _apply_pwm(self, fan: "_FanOutput", duty_percent: int) -> Optional[int]:
+        # Returns the duty that was written, or None if nothing could be written.
+        plan = fan.plan
         try:
-            if not self._pwm_initialized:
-                self._pwm.try_init(frequency_hz=pwm_frequency_hz)
-                self._pwm_initialized = True
-
-            self._pwm.set_duty(
+            if not fan.initialized:
+                fan.pwm.try_init(frequency_hz=plan.frequency_hz)
+                fan.initialized = True
+                fan.frequency_hz = plan.frequency_hz
+            elif plan.frequency_hz != fan.frequency_hz:
+                fan.pwm.set_frequency(plan.frequency_hz)
+                fan.frequency_hz = plan.frequency_hz
+
+            fan.pwm.set_duty(
                 duty_percent=duty_percent,
-                kickstart_enabled=kickstart_enabled,
-                kickstart_duty=kickstart_duty,
-                kickstart_ms=kickstart_ms,
+                kickstart_enabled=plan.kickstart_enabled,
+                kickstart_duty=plan.kickstart_duty_percent,
+                kickstart_ms=plan.kickstart_ms,
             )
-            RuntimeState.set_current_duty(duty_percent)
+            return duty_percent
         except Exception as e:
             # Fail-safe: attempt 100% if possible; otherwise keep running and report.
-            logger.exception("PWM write failed")
-            self._db.events.create(level="ERROR", message="pwm_write_failed", context=str(e))
-            RuntimeState.add_error("pwm_write_failed", {"error": str(e)})
+            logger.exception("PWM write failed (fan %s)", plan.name)
+            self._events.emit(level="ERROR", message="pwm_write_failed", context=f"{plan.name}:{e}")
+            RuntimeState.add_error("pwm_write_failed", {"fan": plan.name, "error": str(e)})
 
             try:
-                if self._pwm_initialized:
-                    self._pwm.set_duty(
+                if fan.initialized:
+                    fan.pwm.set_duty(
                         duty_percent=100,
                         kickstart_enabled=False,
                         kickstart_duty=100,
                         kickstart_ms=0,
                     )
-                    RuntimeState.set_current_duty(100)
+                    fan.initialized = False
+                    return 100
             except Exception:
                 pass
 
-            self._pwm_initialized = False
-
-    def _read_sensor_temp(self, sensor_id: int, sensor_type: str, sensor_path: str,
-                         smoothing_window_s: float, loop_interval_s: float, hysteresis_c: float) -> Optional[float]:
-        try:
-            if not os.path.exists(sensor_path):
-                raise ValueError("sensor_path_missing")
-
-            if sensor_type == "thermal_zone":
-                raw = self._thermal_reader.read_celsius(sensor_path)
-            elif sensor_type == "hwmon":
-                raw = self._hwmon_reader.read_celsius(sensor_path)
-            else:
-                raise ValueError("unknown_sensor_type")
-
-            raw = round(float(raw), 1)
-
-            # History (moving average)
-            if smoothing_window_s > 0:
-                dq = self._temp_history.get(sensor_id)
-                if dq is None:
-                    dq = deque()
-                    self._temp_history[sensor_id] = dq
-
-                now = time.time()
-                dq.append((now, raw))
-
-                cutoff = now - float(smoothing_window_s)
-                while dq and dq[0][0] < cutoff:
-                    dq.popleft()
-
-                avg = sum(v for _, v in dq) / max(1, len(dq))
-                temp_c = round(float(avg), 1)
-            else:
-                temp_c = raw
-
-            # Hysteresis (freeze temp within hysteresis band)
-            if hysteresis_c > 0:
-                last = self._last_temp_used.get(sensor_id)
-                if last is None:
-                    self._last_temp_used[sensor_id] = temp_c
-                else:
-                    if abs(temp_c - last) < float(hysteresis_c):
-                        temp_c = last
-                    else:
-                        self._last_temp_used[sensor_id] = temp_c
-
-            return temp_c
-        except Exception as e:
-            self._db.events.create(level="ERROR", message="sensor_read_failed", context=f"{sensor_id}:{sensor_path}:{e}")
-            RuntimeState.add_error("sensor_read_failed", {"sensor_id": sensor_id, "path": sensor_path, "error": str(e)})
+            fan.initialized = False
             return None
 
-    def _get_active_curve(self, sensor_id: int) -> Optional[dict]:
-        curves = self._db.curves.list(sensor_id=sensor_id)
-        for c in curves:
-            if c.get("is_active"):
-                return c
+    def _on_db_change(self, table: str) -> None:
+        # Runs on the writing thread after commit. New settings (interval, limits, PWM frequency) apply on
+        # the next tick, which starts immediately instead of after the current sleep.
+        if table == "app_settings":
+            self._wake.set()
+
+    def _on_plan_changed(self, plan: ControlPlaneSnapshot) -> None:
+        # Release file descriptors of sensors that were removed, disabled or moved to another path.
+        for sensor_type, reader in self._readers.items():
+            reader.retain(s.path for s in plan.sensors if s.type == sensor_type)
+
+        # Filter state of removed or disabled sensors is dropped; new filter settings restart all chains.
+        settings = plan.settings
+        self._filters.configure(FilterConfig(
+            smoothing_filter=settings.smoothing_filter,
+            smoothing_window_s=settings.smoothing_window_s,
+            hysteresis_c=settings.hysteresis_c,
+            spike_threshold_c=settings.spike_threshold_c,
+        ))
+        self._events.rollup_window_s = settings.events_rollup_window_s
+        self._filters.retain(s.id for s in plan.sensors)
+        self._sampler.retain(s.path for s in plan.sensors)
+        self._history.retain([s.name for s in plan.sensors])
+        self._metrics.bind_sensors((s.id, s.name) for s in plan.sensors)
+        self._sync_fans(plan.fans)
+        self._plan_version = plan.version
+
+    def _sync_fans(self, plans: Tuple[FanPlan, ...]) -> None:
+        # Keeps the PWM state of fans whose chip/channel did not change; removed or moved outputs are disabled.
+        current = {fan.plan.id: fan for fan in self._fans}
+        outputs: List[_FanOutput] = []
+        for plan in plans:
+            fan = current.pop(plan.id, None)
+            if fan is not None and (fan.plan.pwm_chip, fan.plan.pwm_channel) != (plan.pwm_chip, plan.pwm_channel):
+                fan.pwm.disable()
+                fan = None
+            if fan is None:
+                fan = _FanOutput(plan, self._make_pwm(plan))
+            else:
+                fan.plan = plan
+            outputs.append(fan)
+        for fan in current.values():
+            fan.pwm.disable()
+        self._fans = outputs
+
+    def _make_pwm(self, plan: FanPlan) -> PwmService:
+        if self._plant is not None:
+            writer = SimulatedPwmWriter(self._plant, pwm_chip=plan.pwm_chip, pwm_channel=plan.pwm_channel)
+            return PwmService(pwm_chip=plan.pwm_chip, pwm_channel=plan.pwm_channel, writer=writer, clock=self._clock)
+        return PwmService(pwm_chip=plan.pwm_chip, pwm_channel=plan.pwm_channel, clock=self._clock)
+
+    def _filter_reading(self, sensor_id: int, sensor_path: str, reading: PathReading, now: float) -> Optional[float]:
+        if reading.value_c is not None:
+            return self._filters.push(sensor_id, now, reading.value_c)
+
+        if reading.stale:
+            # The read is still running: keep using the last good value instead of blocking the tick.
+            last = self._filters.last(sensor_id)
+            if last is not None:
+                return last
+            error = "sensor_read_timeout"
+        else:
+            error = reading.error or "sensor_read_failed"
+
+        self._events.emit(level="ERROR", message="sensor_read_failed", context=f"{sensor_id}:{sensor_path}:{error}")
+        RuntimeState.add_error("sensor_read_failed", {"sensor_id": sensor_id, "path": sensor_path, "error": error})
         return None
 
     def _ensure_seeded(self) -> None:
         # Ensure we have at least one default sensor and a default curve if none exist.
         try:
-            if not self._db.sensors.list():
+            if not self._db.fans.list():
+                # The fan configured through the environment becomes the first (default) fan.
+                self._db.fans.create(name="default", pwm_chip=self._config.pwm_chip, pwm_channel=self._config.pwm_channel)
+
+            if self._plant is not None:
+                self._plant.create_nodes()
+                if not self._db.sensors.list():
+                    for i, path in enumerate(self._plant.sensor_paths):
+                        self._db.sensors.create(name="cpu" if i == 0 else f"zone{i}", sensor_type="thermal_zone",
+                                                path=path, enabled=True)
+            elif not self._db.sensors.list():
                 cpu_path = "/sys/class/thermal/thermal_zone0/temp"
                 if os.path.exists(cpu_path):
                     self._db.sensors.create(name="cpu", sensor_type="thermal_zone", path=cpu_path, enabled=True)
@@ -246,26 +420,11 @@ class ControlLoopService:
             logger.exception("Failed to seed defaults")
 
 
-def _read_int(raw: Optional[str], default: int) -> int:
-    try:
-        return int(str(raw).strip())
-    except Exception:
-        return int(default)
-
-
-def _read_float(raw: Optional[str], default: float) -> float:
-    try:
-        return float(str(raw).strip())
-    except Exception:
-        return float(default)
-
+class _FanOutput:
+    __slots__ = ("plan", "pwm", "initialized", "frequency_hz")
 
-def _read_bool(raw: Optional[str], default: bool) -> bool:
-    if raw is None:
-        return bool(default)
-    s = str(raw).strip().lower()
-    if s in ("1", "true", "yes", "on"):
-        return True
-    if s in ("0", "false", "no", "off"):
-        return False
-    return bool(default)
\ No newline at end of file
+    def __init__(self, plan: FanPlan, pwm: PwmService) -> None:
+        self.plan = plan
+        self.pwm = pwm
+        self.initialized = False
+        self.frequency_hz: Optional[int] = None
@@ -0,0 +1,223 @@
+# app/services/control_plane_cache.py
+import itertools
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.database.database import Database
+from app.domain.models.settings import SettingsModel
+from app.hardware.sensors.sensor_discovery import SensorScanner
+from app.services.curve_engine import CompiledCurve, CurveEngine
+
+logger = logging.getLogger(__name__)
+
+# Writes to these tables change what the control loop does. Events are ignored.
+_CONTROL_TABLES = ("sensors", "fans", "curves", "curve_points", "app_settings")
+
+
+@dataclass(frozen=True)
+class FanPlan:
+    id: int
+    name: str
+    pwm_chip: str
+    pwm_channel: int
+    # Resolved against the global settings where the fan does not override them.
+    frequency_hz: int
+    kickstart_enabled: bool
+    kickstart_duty_percent: int
+    kickstart_ms: int
+
+
+@dataclass(frozen=True)
+class SensorCurve:
+    # Index into ControlPlaneSnapshot.fans of the fan this curve drives.
+    fan_index: int
+    curve_id: int
+    curve: CompiledCurve
+
+
+@dataclass(frozen=True)
+class SensorPlan:
+    id: int
+    name: str
+    type: str
+    path: str
+    # Active curves of the sensor, at most one per fan.
+    curves: Tuple[SensorCurve, ...]
+
+
+@dataclass(frozen=True)
+class ControlPlaneSnapshot:
+    version: int
+    settings: SettingsModel
+    # Enabled fans only, ordered by id. Curves without a fan drive the first one.
+    fans: Tuple[FanPlan, ...]
+    # Enabled sensors only, in the same order as Sensors.list().
+    sensors: Tuple[SensorPlan, ...]
+
+
+class ControlPlaneCache:
+    # Holds an immutable snapshot of everything the control loop needs from the database.
+    # Writers only bump the version; the snapshot is rebuilt on the next get() after a change.
+    # Readers never take a lock while the snapshot is current.
+    # scanner resolves sensors registered from discovery (source_key) to their current path on every rebuild.
+    def __init__(self, db: Database, curve_engine: CurveEngine, scanner: Optional[SensorScanner] = None) -> None:
+        self._db = db
+        self._curve_engine = curve_engine
+        self._scanner = scanner
+
+        self._version_counter = itertools.count(1)
+        self._version = next(self._version_counter)
+        self._version_lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._snapshot: Optional[ControlPlaneSnapshot] = None
+
+        db.add_change_listener(self._on_change)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def close(self) -> None:
+        self._db.remove_change_listener(self._on_change)
+
+    def invalidate(self) -> None:
+        with self._version_lock:
+            self._version = next(self._version_counter)
+
+    def get(self) -> ControlPlaneSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot
+
+        with self._rebuild_lock:
+            snapshot = self._snapshot
+            version = self._version
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+            # Capture the version before reading so that a write racing with the rebuild triggers another one.
+            snapshot = self._build(version)
+            self._snapshot = snapshot
+            return snapshot
+
+    def preview(self, settings: Optional[Dict[str, Any]] = None,
+                curve_points: Optional[Dict[int, List[Tuple[float, int]]]] = None) -> ControlPlaneSnapshot:
+        # What-if snapshot: the current configuration with some settings and the points of some active curves
+        # replaced. Nothing is stored and the live snapshot is not affected.
+        curve_points = {int(k): list(v) for k, v in (curve_points or {}).items()}
+        with self._rebuild_lock:
+            return self._build(0, settings_overrides=settings or {}, points_overrides=curve_points)
+
+    def _on_change(self, table: str) -> None:
+        if table in _CONTROL_TABLES:
+            self.invalidate()
+
+    def _build(self, version: int, settings_overrides: Optional[Dict[str, Any]] = None,
+               points_overrides: Optional[Dict[int, List[Tuple[float, int]]]] = None) -> ControlPlaneSnapshot:
+        with self._db.read_snapshot() as conn:
+            settings = self._db.settings.get_model(conn=conn)
+            sensors = self._db.sensors.list(conn=conn)
+            fans = self._db.fans.list(conn=conn)
+            active_curves = self._db.curves.list_active(conn=conn)
+            points = self._db.curve_points.list_for_active_curves(conn=conn)
+
+        if settings_overrides:
+            try:
+                settings = SettingsModel.model_validate({**settings.model_dump(), **settings_overrides})
+            except ValidationError as e:
+                raise ValueError("; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()))
+
+        paths = self._resolve_paths(sensors)
+        fan_plans = tuple(_fan_plan(f, settings) for f in fans if f.get("enabled"))
+        all_fan_ids = [int(f["id"]) for f in fans]
+        fan_index = {f.id: i for i, f in enumerate(fan_plans)}
+        # NULL fan_id (and curves of a fan that no longer exists) map to the first fan in the table.
+        default_fan_id = all_fan_ids[0] if all_fan_ids else None
+
+        curves_by_sensor: Dict[int, Dict[int, Dict]] = {}
+        for c in active_curves:
+            fan_id = int(c["fan_id"]) if c.get("fan_id") is not None else default_fan_id
+            if fan_id not in fan_index:
+                continue
+            # Keep one curve per sensor and fan; list_active is ordered so the result is deterministic.
+            curves_by_sensor.setdefault(int(c["sensor_id"]), {}).setdefault(fan_index[fan_id], c)
+
+        points_by_curve: Dict[int, List[Tuple[float, int]]] = {}
+        for p in points:
+            points_by_curve.setdefault(int(p["curve_id"]), []).append((float(p["temp_c"]), int(p["duty_percent"])))
+        if points_overrides:
+            active = {int(c["id"]) for by_fan in curves_by_sensor.values() for c in by_fan.values()}
+            for curve_id in points_overrides:
+                if curve_id not in active:
+                    raise ValueError(f"Curve {curve_id} is not an active curve")
+
+        plans = []
+        for s in sensors:
+            if not s.get("enabled"):
+                continue
+            sensor_id = int(s["id"])
+            sensor_curves = []
+            for index, curve in sorted(curves_by_sensor.get(sensor_id, {}).items()):
+                if points_overrides and int(curve["id"]) in points_overrides:
+                    # Not cached: the engine only holds curves as they are stored.
+                    compiled = CompiledCurve(points_overrides[int(curve["id"])])
+                else:
+                    compiled = self._curve_engine.compile(int(curve["id"]), float(curve["updated_at"]),
+                                                          points_by_curve.get(int(curve["id"]), ()))
+                for warning in compiled.warnings:
+                    logger.warning("Curve %s of sensor %s: %s", curve["id"], s["name"], warning)
+                sensor_curves.append(SensorCurve(fan_index=index, curve_id=int(curve["id"]), curve=compiled))
+            plans.append(SensorPlan(
+                id=sensor_id,
+                name=str(s["name"]),
+                type=str(s["type"]),
+                path=paths.get(sensor_id, str(s["path"])),
+                curves=tuple(sensor_curves),
+            ))
+        self._curve_engine.retain(c.curve_id for p in plans for c in p.curves)
+
+        return ControlPlaneSnapshot(
+            version=version,
+            settings=settings,
+            fans=fan_plans,
+            sensors=tuple(plans),
+        )
+
+    def _resolve_paths(self, sensors: List[Dict[str, Any]]) -> Dict[int, str]:
+        # The hwmonN / thermal_zoneN path stored at registration can belong to another device after a reboot,
+        # so sensors with a source_key are read at the path their key resolves to now. A key that is no longer
+        # found resolves to no path: the sensor then reads as failed instead of reading whatever took over its
+        # old number.
+        keyed = [s for s in sensors if s.get("enabled") and s.get("source_key")]
+        if not keyed or self._scanner is None:
+            return {}
+        self._scanner.scan()
+        paths: Dict[int, str] = {}
+        for s in keyed:
+            found = self._scanner.get(str(s["source_key"]))
+            if found is None:
+                logger.warning("Sensor %s: %s not found", s["name"], s["source_key"])
+            elif found.path != s["path"]:
+                logger.info("Sensor %s: %s moved to %s", s["name"], s["source_key"], found.path)
+            paths[int(s["id"])] = found.path if found is not None else ""
+        return paths
+
+
+def _fan_plan(fan: Dict, settings: SettingsModel) -> FanPlan:
+    def _or(value, default):
+        return default if value is None else value
+
+    return FanPlan(
+        id=int(fan["id"]),
+        name=str(fan["name"]),
+        pwm_chip=str(fan["pwm_chip"]),
+        pwm_channel=int(fan["pwm_channel"]),
+        frequency_hz=int(_or(fan["frequency_hz"], settings.pwm_frequency_hz)),
+        kickstart_enabled=bool(_or(fan["kickstart_enabled"], settings.kickstart_enabled)),
+        kickstart_duty_percent=int(_or(fan["kickstart_duty_percent"], settings.kickstart_duty_percent)),
+        kickstart_ms=int(_or(fan["kickstart_ms"], settings.kickstart_ms)),
+    )
+
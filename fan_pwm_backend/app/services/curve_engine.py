@@ -1,6 +1,12 @@
 # app/services/curve_engine.py
+from bisect import bisect_left
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; evaluate_many() falls back to pure Python.
+    np = None
 
 
 @dataclass(frozen=True)
@@ -9,36 +15,107 @@ class CurveEvaluationResult:
     warnings: List[str]
 
 
-class CurveEngine:
-    def evaluate(self, points: List[Tuple[float, int]], temp_c: float) -> CurveEvaluationResult:
-        warnings: List[str] = []
-        if not points:
-            return CurveEvaluationResult(duty_percent=0, warnings=["Curve has no points; using 0%"])
+class CompiledCurve:
+    # Immutable, pre-sorted form of a curve. Built once per (curve_id, updated_at) and evaluated every tick.
+    __slots__ = ("key", "temps", "duties", "widths", "rises", "warnings",
+                 "_np_temps", "_np_duties", "_np_widths", "_np_rises")
 
+    def __init__(self, points: Iterable[Tuple[float, int]], key: Optional[Tuple[int, float]] = None) -> None:
         pts = sorted([(float(t), int(d)) for t, d in points], key=lambda x: x[0])
-        for t, d in pts:
-            if d < 0 or d > 100:
-                warnings.append("Curve contains duty outside 0..100; values will be clamped")
+
+        warnings: List[str] = []
+        if not pts:
+            warnings.append("Curve has no points; using 0%")
+        if any(d < 0 or d > 100 for _, d in pts):
+            warnings.append("Curve contains duty outside 0..100; values will be clamped")
+
+        self.key = key
+        self.temps: Tuple[float, ...] = tuple(t for t, _ in pts)
+        self.duties: Tuple[int, ...] = tuple(d for _, d in pts)
+        # Segment i spans temps[i]..temps[i + 1]. The slope is kept as rise / width (instead of a single
+        # quotient) so interpolation rounds exactly like the original per-call evaluation did.
+        self.widths: Tuple[float, ...] = tuple(t1 - t0 for (t0, _), (t1, _) in zip(pts, pts[1:]))
+        self.rises: Tuple[float, ...] = tuple(float(d1) - float(d0) for (_, d0), (_, d1) in zip(pts, pts[1:]))
+        self.warnings: Tuple[str, ...] = tuple(warnings)
+
+        if np is not None and pts:
+            self._np_temps = np.asarray(self.temps, dtype=np.float64)
+            self._np_duties = np.asarray(self.duties, dtype=np.float64)
+            self._np_widths = np.asarray(self.widths, dtype=np.float64)
+            self._np_rises = np.asarray(self.rises, dtype=np.float64)
+        else:
+            self._np_temps = self._np_duties = self._np_widths = self._np_rises = None
+
+    def evaluate(self, temp_c: float) -> int:
+        temps = self.temps
+        if not temps:
+            return 0
 
         # Clamp outside range
-        if temp_c <= pts[0][0]:
-            return CurveEvaluationResult(duty_percent=_clamp_duty(pts[0][1]), warnings=warnings)
-        if temp_c >= pts[-1][0]:
-            return CurveEvaluationResult(duty_percent=_clamp_duty(pts[-1][1]), warnings=warnings)
+        if temp_c <= temps[0]:
+            return _clamp_duty(self.duties[0])
+        if temp_c >= temps[-1]:
+            return _clamp_duty(self.duties[-1])
+
+        # temps[i - 1] < temp_c <= temps[i]
+        i = bisect_left(temps, temp_c)
+        if temps[i] == temp_c:
+            return _clamp_duty(self.duties[i])
+        ratio = (temp_c - temps[i - 1]) / self.widths[i - 1]
+        duty = float(self.duties[i - 1]) + ratio * self.rises[i - 1]
+        return _clamp_duty(int(round(duty)))
 
-        # Linear interpolation between nearest points.
-        for i in range(1, len(pts)):
-            t0, d0 = pts[i - 1]
-            t1, d1 = pts[i]
-            if t0 <= temp_c <= t1:
-                if t1 == t0:
-                    return CurveEvaluationResult(duty_percent=_clamp_duty(d1), warnings=warnings)
-                ratio = (temp_c - t0) / (t1 - t0)
-                duty = float(d0) + ratio * (float(d1) - float(d0))
-                return CurveEvaluationResult(duty_percent=_clamp_duty(int(round(duty))), warnings=warnings)
+    def evaluate_many(self, temps_c: Sequence[float]):
+        # Returns a NumPy int array when NumPy is installed, otherwise a list of ints.
+        if np is None:
+            return [self.evaluate(float(t)) for t in temps_c]
 
-        return CurveEvaluationResult(duty_percent=_clamp_duty(pts[-1][1]), warnings=warnings)
+        t = np.asarray(temps_c, dtype=np.float64)
+        if self._np_temps is None:
+            return np.zeros(t.shape, dtype=np.int64)
+
+        ts, ds = self._np_temps, self._np_duties
+        n = len(ts)
+        if n == 1:
+            return np.full(t.shape, _clamp_duty(self.duties[0]), dtype=np.int64)
+
+        i = np.searchsorted(ts, t, side="left")
+        seg = np.clip(i, 1, n - 1) - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = (t - ts[seg]) / self._np_widths[seg]
+        duty = np.rint(ds[seg] + ratio * self._np_rises[seg])
+
+        hit = np.clip(i, 0, n - 1)
+        duty = np.where(ts[hit] == t, ds[hit], duty)
+        duty = np.where(t >= ts[-1], ds[-1], duty)
+        duty = np.where(t <= ts[0], ds[0], duty)
+        return np.clip(duty, 0, 100).astype(np.int64)
+
+
+class CurveEngine:
+    def __init__(self) -> None:
+        self._compiled: Dict[int, CompiledCurve] = {}
+
+    def compile(self, curve_id: int, updated_at: float, points: Iterable[Tuple[float, int]]) -> CompiledCurve:
+        # Reuses the compiled curve as long as the curve has not been modified.
+        key = (int(curve_id), float(updated_at))
+        compiled = self._compiled.get(key[0])
+        if compiled is not None and compiled.key == key:
+            return compiled
+        compiled = CompiledCurve(points, key=key)
+        self._compiled[key[0]] = compiled
+        return compiled
+
+    def retain(self, curve_ids: Iterable[int]) -> None:
+        # Drops compiled curves that are no longer in use.
+        keep = set(int(c) for c in curve_ids)
+        for curve_id in [c for c in self._compiled if c not in keep]:
+            del self._compiled[curve_id]
+
+    def evaluate(self, points: List[Tuple[float, int]], temp_c: float) -> CurveEvaluationResult:
+        compiled = CompiledCurve(points)
+        return CurveEvaluationResult(duty_percent=compiled.evaluate(temp_c), warnings=list(compiled.warnings))
 
 
 def _clamp_duty(d: int) -> int:
-    return max(0, min(100, int(d)))
\ No newline at end of file
+    return max(0, min(100, int(d)))
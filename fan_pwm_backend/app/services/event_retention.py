@@ -0,0 +1,152 @@
+# app/services/event_retention.py
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.clock import SYSTEM_CLOCK, Clock
+from app.database.schemas.events import Events
+from app.database.schemas.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class EventRetention:
+    # Enforces the events_max_age_days / events_max_rows settings from a background thread.
+    # Rows are deleted in batches of batch_size, each in its own short write transaction with a pause in
+    # between, so the control loop and the event sink never wait long for the writer. Freed pages are then
+    # returned to the file system with incremental vacuum, again in small steps.
+    # After a large prune (e.g. the first run on an old database) the full-text index is merged first: until
+    # then it keeps the entries of deleted rows. Routine passes leave that to FTS5's own automerge, so the
+    # index is not rewritten on the SD card every few minutes.
+    # Once after the first pass, a database created before retention existed is switched to incremental
+    # vacuum and a table created before search existed gets its full-text index; pruning first means neither
+    # the full VACUUM nor the index build touches rows that are about to go.
+    def __init__(self, events: Events, settings: Settings, interval_s: float = 300.0, batch_size: int = 500,
+                 pause_s: float = 0.01, vacuum_pages: int = 256, merge_pages: int = 16,
+                 merge_after_rows: int = 5000, clock: Clock = SYSTEM_CLOCK) -> None:
+        self._events = events
+        # Only the age cutoff follows the clock (events are stamped with it); batching and the interval are real time.
+        self._clock = clock
+        self._settings = settings
+        self._interval_s = max(0.01, float(interval_s))
+        self._batch_size = max(1, int(batch_size))
+        self._pause_s = max(0.0, float(pause_s))
+        self._vacuum_pages = max(1, int(vacuum_pages))
+        self._merge_pages = max(1, int(merge_pages))
+        self._merge_after_rows = max(1, int(merge_after_rows))
+
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.runs = 0
+        self.deleted = 0
+        self.vacuumed_pages = 0
+        self.last_run_ms: Optional[float] = None
+        # Longest single delete/vacuum step, i.e. the longest the writer was held by retention.
+        self.max_batch_ms = 0.0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="event-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        thread = self._thread
+        self._stopping = True
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout=timeout_s)
+        self._thread = None
+
+    def run_once(self) -> int:
+        # One full pass; returns the number of deleted rows.
+        started = time.perf_counter()
+        settings = self._settings.get_model()
+        deleted = 0
+
+        if settings.events_max_age_days > 0:
+            cutoff = self._clock.time() - settings.events_max_age_days * 86400.0
+            deleted += self._drain(lambda: self._events.delete_older_than(cutoff, self._batch_size))
+
+        if settings.events_max_rows > 0 and not self._stopping:
+            boundary = self._events.retention_boundary_id(settings.events_max_rows)
+            if boundary is not None:
+                deleted += self._drain(lambda: self._events.delete_up_to_id(boundary, self._batch_size))
+
+        if deleted >= self._merge_after_rows:
+            self._merge_search_index()
+        if deleted:
+            self._vacuum()
+
+        self.runs += 1
+        self.deleted += deleted
+        self.last_run_ms = round((time.perf_counter() - started) * 1000.0, 3)
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "vacuumed_pages": self.vacuumed_pages,
+            "last_run_ms": self.last_run_ms,
+            "max_batch_ms": round(self.max_batch_ms, 3),
+        }
+
+    def _drain(self, delete_batch: Callable[[], int]) -> int:
+        total = 0
+        while not self._stopping:
+            n = self._timed(delete_batch)
+            total += n
+            if n < self._batch_size:
+                break
+            time.sleep(self._pause_s)
+        return total
+
+    def _merge_search_index(self) -> None:
+        while not self._stopping and self._timed(lambda: self._events.merge_search_index(self._merge_pages)):
+            time.sleep(self._pause_s)
+
+    def _vacuum(self) -> None:
+        while not self._stopping:
+            released = self._timed(lambda: self._events.incremental_vacuum(self._vacuum_pages))
+            self.vacuumed_pages += released
+            if released < self._vacuum_pages:
+                break
+            time.sleep(self._pause_s)
+        self._timed(self._events.checkpoint)
+
+    def _timed(self, step: Callable[[], _T]) -> _T:
+        t0 = time.perf_counter()
+        try:
+            return step()
+        finally:
+            self.max_batch_ms = max(self.max_batch_ms, (time.perf_counter() - t0) * 1000.0)
+
+    def _upgrade(self) -> None:
+        t0 = time.perf_counter()
+        if not self._events.has_search():
+            if self._events.build_search_index():
+                logger.info("Built the events search index in %.1fs", time.perf_counter() - t0)
+            t0 = time.perf_counter()
+        if self._events.enable_incremental_vacuum():
+            self._events.checkpoint()
+            logger.info("Switched the database to incremental auto-vacuum in %.1fs", time.perf_counter() - t0)
+
+    def _run(self) -> None:
+        upgraded = False
+        while not self._stopping:
+            try:
+                self.run_once()
+                if not upgraded and not self._stopping:
+                    upgraded = True
+                    self._upgrade()
+            except Exception:
+                logger.exception("Event retention failed")
+            self._wake.wait(self._interval_s)
+            self._wake.clear()
@@ -0,0 +1,94 @@
+# app/services/event_sink.py
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from app.core.clock import SYSTEM_CLOCK, Clock
+from app.database.schemas.events import Events
+
+logger = logging.getLogger(__name__)
+
+
+class EventSink:
+    # Buffers events in memory and writes them in batches from a background thread, so the control loop
+    # never waits for SQLite. emit() is O(1) and lock-free; when the queue is full new events are dropped
+    # and counted.
+    def __init__(self, events: Events, capacity: int = 1000, flush_every: int = 100, flush_interval_s: float = 5.0,
+                 clock: Clock = SYSTEM_CLOCK) -> None:
+        self._events = events
+        # Timestamps events; the flush interval is always real time.
+        self._clock = clock
+        self._capacity = max(1, int(capacity))
+        self._flush_every = max(1, int(flush_every))
+        self._flush_interval_s = max(0.01, float(flush_interval_s))
+        # Repeats of an identical event within this window are stored as one counted row (0 = off).
+        self.rollup_window_s = 0.0
+
+        self._queue: Deque[Tuple[str, str, Optional[str], float]] = deque()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        # Flushes everything that is still queued.
+        thread = self._thread
+        self._stopping = True
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout=timeout_s)
+        self._thread = None
+        self.flush()
+
+    def emit(self, level: str, message: str, context: Optional[str] = None) -> None:
+        if len(self._queue) >= self._capacity:
+            self._dropped += 1
+            return
+        self._queue.append((level, message, context, self._clock.time()))
+        if len(self._queue) >= self._flush_every:
+            self._wake.set()
+
+    def flush(self) -> int:
+        batch = []
+        try:
+            while True:
+                batch.append(self._queue.popleft())
+        except IndexError:
+            pass
+        if not batch:
+            return 0
+
+        try:
+            written = self._events.create_many(batch, rollup_window_s=self.rollup_window_s)
+        except Exception:
+            # The batch is lost; retrying would let a broken database grow the queue without bound.
+            logger.exception("Failed to write %d events", len(batch))
+            self._failed += len(batch)
+            return 0
+        self._written += written
+        return written
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": len(self._queue),
+            "written": self._written,
+            "dropped": self._dropped,
+            "failed": self._failed,
+        }
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self._flush_interval_s)
+            self._wake.clear()
+            self.flush()
@@ -0,0 +1,189 @@
+# app/services/metrics.py
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Prometheus text exposition format 0.0.4.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket bounds in seconds, suited to tick phases and sysfs reads (50us .. 2.5s).
+DEFAULT_BUCKETS_S = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                     0.1, 0.25, 0.5, 1.0, 2.5)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, n: int = 1) -> None:
+        self.value += n
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram:
+    # Observations are taken in integer nanoseconds against precomputed bounds: observe_ns() does not
+    # allocate and takes no lock.
+    __slots__ = ("_bounds_s", "_bounds_ns", "_counts", "count", "sum_ns")
+
+    def __init__(self, buckets_s: Tuple[float, ...] = DEFAULT_BUCKETS_S) -> None:
+        self._bounds_s = tuple(buckets_s)
+        self._bounds_ns = tuple(int(b * 1e9) for b in buckets_s)
+        self._counts = array("q", [0]) * (len(buckets_s) + 1)
+        self.count = 0
+        self.sum_ns = 0
+
+    def observe_ns(self, value_ns: int) -> None:
+        self._counts[bisect_left(self._bounds_ns, value_ns)] += 1
+        self.count += 1
+        self.sum_ns += value_ns
+
+    def buckets(self) -> List[Tuple[str, int]]:
+        out = []
+        cumulative = 0
+        for bound, n in zip(self._bounds_s, self._counts):
+            cumulative += n
+            out.append((_format_value(bound), cumulative))
+        out.append(("+Inf", self.count))
+        return out
+
+
+class MetricFamily:
+    # One named metric with a fixed set of label names. Children are created on first use of a label
+    # combination; hot paths look a child up once and keep the reference.
+    def __init__(self, name: str, help_text: str, kind: str, label_names: Tuple[str, ...],
+                 factory: Callable[[], object]) -> None:
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.label_names = label_names
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    if len(key) != len(self.label_names):
+                        raise ValueError(f"{self.name} expects labels {self.label_names}")
+                    child = self._factory()
+                    self._children[key] = child
+        return child
+
+    def remove(self, *values: str) -> None:
+        with self._lock:
+            self._children.pop(tuple(str(v) for v in values), None)
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return list(self._children.items())
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._families: Dict[str, MetricFamily] = {}
+        # Collectors produce (kind, help, samples) at scrape time for values owned by other services.
+        self._collectors: List[Tuple[str, str, str, Callable[[], Iterable[Sample]]]] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> MetricFamily:
+        return self._register(name, help_text, "counter", label_names, Counter)
+
+    def gauge(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> MetricFamily:
+        return self._register(name, help_text, "gauge", label_names, Gauge)
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                  buckets_s: Tuple[float, ...] = DEFAULT_BUCKETS_S) -> MetricFamily:
+        return self._register(name, help_text, "histogram", label_names, lambda: Histogram(buckets_s))
+
+    def collector(self, name: str, help_text: str, kind: str, collect: Callable[[], Iterable[Sample]]) -> None:
+        with self._lock:
+            self._collectors = [c for c in self._collectors if c[0] != name]
+            self._collectors.append((name, help_text, kind, collect))
+
+    def render(self) -> str:
+        with self._lock:
+            families = list(self._families.values())
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for key, child in family.children():
+                labels = dict(zip(family.label_names, key))
+                if isinstance(child, Histogram):
+                    for le, n in child.buckets():
+                        lines.append(_sample_line(f"{family.name}_bucket", {**labels, "le": le}, n))
+                    lines.append(_sample_line(f"{family.name}_sum", labels, child.sum_ns / 1e9))
+                    lines.append(_sample_line(f"{family.name}_count", labels, child.count))
+                else:
+                    lines.append(_sample_line(family.name, labels, child.value))
+
+        for name, help_text, kind, collect in collectors:
+            try:
+                samples = list(collect())
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(_sample_line(sample_name, labels, value))
+
+        lines.append("")
+        return "\n".join(lines)
+
+    def _register(self, name: str, help_text: str, kind: str, label_names: Tuple[str, ...],
+                  factory: Callable[[], object]) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = MetricFamily(name, help_text, kind, tuple(label_names), factory)
+                self._families[name] = family
+            elif family.kind != kind or family.label_names != tuple(label_names):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return family
+
+
+def _sample_line(name: str, labels: Dict[str, str], value: Optional[float]) -> str:
+    if labels:
+        rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: Optional[float]) -> str:
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if value != value:
+        return "NaN"
+    return repr(float(value))
+
+
+# Process-wide registry served by GET /metrics.
+REGISTRY = MetricsRegistry()
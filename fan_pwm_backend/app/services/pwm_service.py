@@ -1,53 +1,123 @@
 # app/services/pwm_service.py
 import logging
-import time
+import threading
+from typing import Any, Dict, Optional
 
+from app.core.clock import SYSTEM_CLOCK, Clock, TimerHandle
+from app.hardware.pwm.pwm_writer_base import PwmWriterBase
 from app.hardware.pwm.sysfs_pwm_writer import SysfsPwmWriter
 
 logger = logging.getLogger(__name__)
 
 
 class PwmService:
-    def __init__(self, pwm_chip: str, pwm_channel: int) -> None:
-        self._writer = SysfsPwmWriter(pwm_chip=pwm_chip, pwm_channel=pwm_channel)
+    def __init__(self, pwm_chip: str, pwm_channel: int, writer: Optional[PwmWriterBase] = None,
+                 clock: Clock = SYSTEM_CLOCK) -> None:
+        self._writer = writer if writer is not None else SysfsPwmWriter(pwm_chip=pwm_chip, pwm_channel=pwm_channel)
+        self._clock = clock
+        # Guards the writer and the kickstart state: the kickstart timer finishes on its own thread.
+        self._lock = threading.Lock()
         self._last_set_duty: int = 0
-        self._kickstart_active_until: float | None = None
-        self._kickstart_target_duty: int | None = None
+
+        self._kickstart_timer: Optional[TimerHandle] = None
+        # Bumped for every kickstart, so that a timer that fires after being cancelled is ignored.
+        self._kickstart_seq = 0
+        self._kickstart_started: Optional[float] = None
+        self._kickstart_target_duty: Optional[int] = None
+        self._kickstart_count = 0
+        self._kickstart_last_requested_ms: Optional[int] = None
+        self._kickstart_last_actual_ms: Optional[float] = None
 
     def try_init(self, frequency_hz: int) -> None:
         # Initialize sysfs PWM. This can fail due to missing sysfs nodes or permissions.
-        self._writer.ensure_exported()
-        self._writer.set_frequency_hz(int(frequency_hz))
-        self._writer.set_duty_percent(0)
-        self._writer.enable()
+        with self._lock:
+            self._cancel_kickstart()
+            self._writer.ensure_exported()
+            self._writer.set_frequency_hz(int(frequency_hz))
+            self._writer.set_duty_percent(0)
+            self._writer.enable()
+            self._last_set_duty = 0
+
+    def set_frequency(self, frequency_hz: int) -> None:
+        # Re-programs the PWM period and rewrites the current duty so the percentage stays the same.
+        with self._lock:
+            self._writer.set_frequency_hz(int(frequency_hz))
+            self._writer.set_duty_percent(self._last_set_duty)
 
     def set_duty(self, duty_percent: int, kickstart_enabled: bool, kickstart_duty: int, kickstart_ms: int) -> None:
         duty_percent = max(0, min(100, int(duty_percent)))
 
-        now = time.time()
-        if self._kickstart_active_until is not None:
-            if now < self._kickstart_active_until:
+        with self._lock:
+            if self._kickstart_timer is not None:
+                # Kickstart in progress: the timer applies the most recent target when the window ends.
+                self._kickstart_target_duty = duty_percent
+                return
+
+            # Kickstart only when transitioning 0 -> >0
+            if kickstart_enabled and self._last_set_duty == 0 and duty_percent > 0 and kickstart_ms > 0:
+                self._writer.set_duty_percent(max(0, min(100, int(kickstart_duty))))
+                self._last_set_duty = max(0, min(100, int(kickstart_duty)))
+                self._kickstart_started = self._clock.monotonic()
+                self._kickstart_target_duty = duty_percent
+                self._kickstart_last_requested_ms = int(kickstart_ms)
+                self._kickstart_count += 1
+
+                # The window is timed independently of the control loop interval.
+                self._kickstart_seq += 1
+                seq = self._kickstart_seq
+                self._kickstart_timer = self._clock.call_later(float(kickstart_ms) / 1000.0,
+                                                               lambda: self._finish_kickstart(seq), name="pwm-kickstart")
                 return
-            # Kickstart window ended -> apply target
-            if self._kickstart_target_duty is not None:
-                self._writer.set_duty_percent(self._kickstart_target_duty)
-                self._last_set_duty = self._kickstart_target_duty
-            self._kickstart_active_until = None
+
+            self._writer.set_duty_percent(duty_percent)
+            self._last_set_duty = duty_percent
+
+    def _finish_kickstart(self, seq: int) -> None:
+        with self._lock:
+            if self._kickstart_timer is None or seq != self._kickstart_seq:
+                # Cancelled (disable/re-init) after the timer already fired.
+                return
+            target = self._kickstart_target_duty
+            started = self._kickstart_started
+            self._kickstart_timer = None
             self._kickstart_target_duty = None
-            return
+            self._kickstart_started = None
+
+            try:
+                if target is not None:
+                    self._writer.set_duty_percent(target)
+                    self._last_set_duty = target
+            except Exception:
+                # The next set_duty() call retries with the current target.
+                logger.exception("Failed to apply target duty after kickstart")
+            finally:
+                if started is not None:
+                    self._kickstart_last_actual_ms = round((self._clock.monotonic() - started) * 1000.0, 1)
+
+    def _cancel_kickstart(self) -> None:
+        if self._kickstart_timer is not None:
+            self._kickstart_timer.cancel()
+        self._kickstart_timer = None
+        self._kickstart_target_duty = None
+        self._kickstart_started = None
 
-        # Kickstart only when transitioning 0 -> >0
-        if kickstart_enabled and self._last_set_duty == 0 and duty_percent > 0 and kickstart_ms > 0:
-            self._writer.set_duty_percent(max(0, min(100, int(kickstart_duty))))
-            self._kickstart_active_until = now + (float(kickstart_ms) / 1000.0)
-            self._kickstart_target_duty = duty_percent
-            return
+    def kickstart_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active": self._kickstart_timer is not None,
+                "count": self._kickstart_count,
+                "last_requested_ms": self._kickstart_last_requested_ms,
+                "last_actual_ms": self._kickstart_last_actual_ms,
+            }
 
-        self._writer.set_duty_percent(duty_percent)
-        self._last_set_duty = duty_percent
+    def write_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return self._writer.write_stats()
 
     def disable(self) -> None:
-        try:
-            self._writer.disable()
-        except Exception:
-            logger.exception("Failed to disable PWM")
\ No newline at end of file
+        with self._lock:
+            self._cancel_kickstart()
+            try:
+                self._writer.disable()
+            except Exception:
+                logger.exception("Failed to disable PWM")
@@ -1,15 +1,48 @@
 # app/services/runtime_state.py
+import itertools
+import json
+import secrets
 import threading
-import time
+from dataclasses import dataclass
 from typing import Optional, Dict, Any
 
+from app.core.clock import SYSTEM_CLOCK, Clock
 from app.database.database import Database
+from app.services.control_plane_cache import ControlPlaneCache
+from app.services.status_broadcaster import StatusBroadcaster
+from app.services.telemetry_history import TelemetryHistory
+
+
+# Tells ETags of this process apart from those handed out before a restart (the sequence starts over).
+_ETAG_EPOCH = secrets.token_hex(4)
+
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+    # One published state. Never mutated after publish; readers share it without copying.
+    seq: int
+    data: Dict[str, Any]
+    # Compact subset pushed to stream subscribers.
+    live: Dict[str, Any]
+    # data serialized once, the way FastAPI would, and the matching ETag.
+    body: bytes
+    etag: str
 
 
 class RuntimeState:
+    # Writers (the control loop, override requests) update the fields below under _lock and publish a new
+    # StatusSnapshot. Readers take the current snapshot reference without locking. Fields are replaced, not
+    # mutated in place, so a snapshot can reference them without copying.
     _lock = threading.Lock()
+    _published: Optional[StatusSnapshot] = None
+    _seq = itertools.count(1)
 
     _db: Optional[Database] = None
+    _history: Optional[TelemetryHistory] = None
+    _broadcaster: Optional[StatusBroadcaster] = None
+    _control_plane: Optional[ControlPlaneCache] = None
+    # Time base of error timestamps and override timeouts; the control loop's clock.
+    _clock: Clock = SYSTEM_CLOCK
 
     _current_duty_percent: int = 0
     _target_duty_percent: int = 0
@@ -18,7 +51,14 @@ class RuntimeState:
     _override_until_ts: Optional[float] = None
 
     _last_temps_c: Dict[str, float] = {}
+    _stale_sensors: list[str] = []
+    # Per-fan duties by fan name.
+    _fans: Dict[str, Dict[str, Any]] = {}
     _last_errors: list[dict] = []
+    # Counters published by services, grouped by name (e.g. "pwm").
+    _stats: Dict[str, Dict[str, Any]] = {}
+    # Tick lateness/duration histograms of the control loop scheduler.
+    _timing: Dict[str, Any] = {}
 
     @classmethod
     def bind_db(cls, db: Database) -> None:
@@ -32,6 +72,47 @@ class RuntimeState:
                 raise RuntimeError("Database not bound")
             return cls._db
 
+    @classmethod
+    def bind_history(cls, history: TelemetryHistory) -> None:
+        with cls._lock:
+            cls._history = history
+
+    @classmethod
+    def history(cls) -> TelemetryHistory:
+        with cls._lock:
+            if cls._history is None:
+                raise RuntimeError("Telemetry history not bound")
+            return cls._history
+
+    @classmethod
+    def bind_broadcaster(cls, broadcaster: StatusBroadcaster) -> None:
+        with cls._lock:
+            cls._broadcaster = broadcaster
+
+    @classmethod
+    def broadcaster(cls) -> StatusBroadcaster:
+        with cls._lock:
+            if cls._broadcaster is None:
+                raise RuntimeError("Status stream not available")
+            return cls._broadcaster
+
+    @classmethod
+    def bind_control_plane(cls, control_plane: ControlPlaneCache) -> None:
+        with cls._lock:
+            cls._control_plane = control_plane
+
+    @classmethod
+    def control_plane(cls) -> ControlPlaneCache:
+        with cls._lock:
+            if cls._control_plane is None:
+                raise RuntimeError("Control loop not running")
+            return cls._control_plane
+
+    @classmethod
+    def bind_clock(cls, clock: Clock) -> None:
+        with cls._lock:
+            cls._clock = clock
+
     @classmethod
     def set_current_duty(cls, duty: int) -> None:
         with cls._lock:
@@ -43,15 +124,39 @@ class RuntimeState:
             cls._target_duty_percent = int(duty)
 
     @classmethod
-    def set_temps(cls, temps_c: Dict[str, float]) -> None:
+    def set_temps(cls, temps_c: Dict[str, float], stale_sensors: Optional[list[str]] = None) -> None:
+        # stale_sensors: sensors whose value was reused because their read missed the tick deadline.
         with cls._lock:
             cls._last_temps_c = dict(temps_c)
+            cls._stale_sensors = list(stale_sensors or [])
+
+    @classmethod
+    def set_fans(cls, fans: Dict[str, Dict[str, Any]]) -> None:
+        with cls._lock:
+            cls._fans = fans
+
+    @classmethod
+    def set_stats(cls, group: str, values: Dict[str, Any]) -> None:
+        with cls._lock:
+            cls._stats[group] = dict(values)
+
+    @classmethod
+    def set_timing(cls, timing: Dict[str, Any]) -> None:
+        with cls._lock:
+            cls._timing = timing
+
+    @classmethod
+    def timing_snapshot(cls) -> Dict[str, Any]:
+        with cls._lock:
+            return cls._timing
 
     @classmethod
     def add_error(cls, message: str, context: Optional[Dict[str, Any]] = None) -> None:
+        # Published right away: a tick that fails never reaches its own publish().
         with cls._lock:
-            cls._last_errors.insert(0, {"ts": time.time(), "message": message, "context": context or {}})
-            cls._last_errors = cls._last_errors[:50]
+            error = {"ts": cls._clock.time(), "message": message, "context": context or {}}
+            cls._last_errors = [error] + cls._last_errors[:49]
+            cls._publish_locked()
 
     @classmethod
     def set_override(cls, duty_percent: int, timeout_s: Optional[int]) -> None:
@@ -65,7 +170,8 @@ class RuntimeState:
             if timeout_s is None:
                 cls._override_until_ts = None
             else:
-                cls._override_until_ts = time.time() + float(timeout_s)
+                cls._override_until_ts = cls._clock.time() + float(timeout_s)
+            cls._publish_locked()
 
     @classmethod
     def clear_override(cls) -> None:
@@ -73,13 +179,14 @@ class RuntimeState:
             cls._mode = "auto"
             cls._override_duty_percent = None
             cls._override_until_ts = None
+            cls._publish_locked()
 
     @classmethod
     def get_effective_override(cls) -> Optional[int]:
         with cls._lock:
             if cls._mode != "override":
                 return None
-            if cls._override_until_ts is not None and time.time() >= cls._override_until_ts:
+            if cls._override_until_ts is not None and cls._clock.time() >= cls._override_until_ts:
                 cls._mode = "auto"
                 cls._override_duty_percent = None
                 cls._override_until_ts = None
@@ -96,16 +203,48 @@ class RuntimeState:
             }
 
     @classmethod
-    def snapshot(cls) -> dict:
+    def publish(cls) -> StatusSnapshot:
+        # Called by the control loop once per tick, after all of the tick's updates.
         with cls._lock:
-            return {
-                "mode": cls._mode,
-                "current_duty_percent": cls._current_duty_percent,
-                "target_duty_percent": cls._target_duty_percent,
-                "override": {
-                    "duty_percent": cls._override_duty_percent,
-                    "until_ts": cls._override_until_ts,
-                },
-                "temps_c": dict(cls._last_temps_c),
-                "last_errors": list(cls._last_errors),
-            }
\ No newline at end of file
+            return cls._publish_locked()
+
+    @classmethod
+    def status(cls) -> StatusSnapshot:
+        # Lock-free: a single reference read.
+        published = cls._published
+        if published is None:
+            published = cls.publish()
+        return published
+
+    @classmethod
+    def live_snapshot(cls) -> dict:
+        # Compact subset of snapshot() pushed to stream subscribers; only the most recent error is included.
+        return cls.status().live
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        # Shared by all readers: must not be modified.
+        return cls.status().data
+
+    @classmethod
+    def _publish_locked(cls) -> StatusSnapshot:
+        common = {
+            "mode": cls._mode,
+            "current_duty_percent": cls._current_duty_percent,
+            "target_duty_percent": cls._target_duty_percent,
+            "override": {
+                "duty_percent": cls._override_duty_percent,
+                "until_ts": cls._override_until_ts,
+            },
+            "fans": cls._fans,
+            "temps_c": cls._last_temps_c,
+            "stale_sensors": cls._stale_sensors,
+        }
+        data = {**common, "last_errors": cls._last_errors, "stats": dict(cls._stats)}
+        live = {**common, "last_error": cls._last_errors[0] if cls._last_errors else None}
+        seq = next(cls._seq)
+        # Same output as FastAPI's JSONResponse.
+        body = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        published = StatusSnapshot(seq=seq, data=data, live=live, body=body, etag=f'"{_ETAG_EPOCH}-{seq}"')
+        cls._published = published
+        return published
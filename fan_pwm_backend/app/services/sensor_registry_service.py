@@ -1,13 +1,15 @@
 # app/services/sensor_registry_service.py
 import os
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, List, Optional
 
 from app.database.database import Database
+from app.hardware.sensors.sensor_discovery import SCANNER, DiscoveredSensor, SensorScanner
 
 
 class SensorRegistryService:
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, scanner: Optional[SensorScanner] = None) -> None:
         self._db = db
+        self._scanner = scanner or SCANNER
 
     def auto_detect_default_sensors(self) -> List[Dict[str, Any]]:
         created: List[Dict[str, Any]] = []
@@ -20,4 +22,46 @@ class SensorRegistryService:
             except ValueError:
                 pass
 
-        return created
\ No newline at end of file
+        return created
+
+    def discover(self) -> Dict[str, Any]:
+        # Everything the scanner finds, with the sensor already registered for it (if any): by key, or by path
+        # for sensors that were added by hand.
+        found = self._scanner.scan()
+        sensors = self._db.sensors.list()
+        by_key = {s["source_key"]: s["id"] for s in sensors if s["source_key"]}
+        by_path = {s["path"]: s["id"] for s in sensors if not s["source_key"]}
+        return {
+            "sensors": [{**_to_dict(d), "sensor_id": by_key.get(d.key, by_path.get(d.path))} for d in found],
+            "stats": self._scanner.stats(),
+        }
+
+    def register_discovered(self, keys: Optional[Iterable[str]] = None, enabled: bool = True) -> List[Dict[str, Any]]:
+        # Registers discovered sensors (all, or the given keys) in one transaction. Each sensor is bound to its
+        # key, so the control plane follows it when the hwmonN numbering changes. Keys and paths that are
+        # already registered are skipped, and so are suggested names that are taken.
+        found = {d.key: d for d in self._scanner.scan()}
+        if keys is None:
+            selected = list(found.values())
+        else:
+            unknown = sorted(set(keys) - set(found))
+            if unknown:
+                raise ValueError(f"Unknown sensor key: {', '.join(unknown)}")
+            selected = [found[k] for k in dict.fromkeys(keys)]
+
+        with self._db.transaction() as c:
+            existing = self._db.sensors.list(conn=c)
+            keys = {s["source_key"] for s in existing if s["source_key"]}
+            paths = {s["path"] for s in existing if not s["source_key"]}
+            names = {s["name"] for s in existing}
+            new = [d for d in selected if d.key not in keys and d.path not in paths and d.name not in names]
+            if not new:
+                return []
+            ids = self._db.sensors.upsert_many(
+                [{"name": d.name, "type": d.type, "path": d.path, "source_key": d.key, "enabled": enabled} for d in new],
+                conn=c)
+            return [{**_to_dict(d), "sensor_id": ids[d.name]} for d in new]
+
+
+def _to_dict(d: DiscoveredSensor) -> Dict[str, Any]:
+    return {"key": d.key, "name": d.name, "type": d.type, "path": d.path, "driver": d.driver, "label": d.label}
@@ -0,0 +1,82 @@
+# app/services/sensor_sampler.py
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.hardware.sensors.sensor_reader_base import SensorReaderBase
+
+
+@dataclass(frozen=True)
+class PathReading:
+    # value_c is None when the read failed (error is set) or did not finish before the deadline (stale).
+    value_c: Optional[float]
+    error: Optional[str] = None
+    stale: bool = False
+    # Time the read itself took (0 for stale readings).
+    latency_ns: int = 0
+
+
+class SensorSampler:
+    # Reads all sensor paths of a tick concurrently on a small thread pool. A path shared by several sensors
+    # is read once. A read that misses the deadline keeps running in the background and is picked up by a
+    # later tick instead of being submitted again, so a hanging sensor occupies at most one worker.
+    def __init__(self, readers: Dict[str, SensorReaderBase], max_workers: int = 4) -> None:
+        self._readers = readers
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="sensor-read")
+        self._pending: Dict[str, Future] = {}
+        self._timeouts = 0
+
+    @property
+    def timeouts(self) -> int:
+        return self._timeouts
+
+    def sample(self, sensors: Iterable[Tuple[str, str]], timeout_s: float) -> Dict[str, PathReading]:
+        # sensors: (sensor_type, path) pairs. Returns one reading per distinct path.
+        by_path: Dict[str, str] = {}
+        for sensor_type, path in sensors:
+            by_path.setdefault(path, sensor_type)
+
+        if timeout_s <= 0:
+            return {path: self._read(sensor_type, path) for path, sensor_type in by_path.items()}
+
+        futures: Dict[str, Future] = {}
+        for path, sensor_type in by_path.items():
+            fut = self._pending.get(path)
+            if fut is None:
+                fut = self._pool.submit(self._read, sensor_type, path)
+                self._pending[path] = fut
+            futures[path] = fut
+
+        wait(list(futures.values()), timeout=timeout_s)
+
+        out: Dict[str, PathReading] = {}
+        for path, fut in futures.items():
+            if fut.done():
+                del self._pending[path]
+                out[path] = fut.result()
+            else:
+                self._timeouts += 1
+                out[path] = PathReading(value_c=None, stale=True)
+        return out
+
+    def retain(self, paths: Iterable[str]) -> None:
+        # Forget in-flight reads of paths that are no longer sampled; their results are discarded.
+        keep = set(paths)
+        for path in [p for p in self._pending if p not in keep]:
+            del self._pending[path]
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
+
+    def _read(self, sensor_type: str, path: str) -> PathReading:
+        started = time.perf_counter_ns()
+        try:
+            reader = self._readers.get(sensor_type)
+            if reader is None:
+                raise ValueError("unknown_sensor_type")
+            value_c = round(float(reader.read_celsius(path)), 1)
+            return PathReading(value_c=value_c, latency_ns=time.perf_counter_ns() - started)
+        except Exception as e:
+            return PathReading(value_c=None, error=str(e), latency_ns=time.perf_counter_ns() - started)
@@ -0,0 +1,104 @@
+# app/services/status_broadcaster.py
+import asyncio
+import itertools
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+
+@dataclass(frozen=True)
+class StatusMessage:
+    seq: int
+    # Both are serialized once per published tick and shared by every subscriber.
+    delta: bytes
+    snapshot: bytes
+
+
+class StatusBroadcaster:
+    # Fans out status changes published by the control loop to push subscribers (SSE).
+    # A subscriber only ever holds a reference to the newest message: updates that arrive faster than a
+    # client's rate cap, or while its connection is still busy, are skipped. A client that missed a delta
+    # gets the full snapshot instead, so its view never diverges.
+    def __init__(self) -> None:
+        self._seq = itertools.count(1)
+        self._state: Dict[str, Any] = {}
+        self._latest: Optional[StatusMessage] = None
+        self._lock = threading.Lock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[asyncio.Event] = set()
+        self.published = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, state: Dict[str, Any]) -> None:
+        # Called from the control loop thread once per tick. Unchanged state publishes nothing.
+        with self._lock:
+            delta = {k: v for k, v in state.items() if self._state.get(k, _MISSING) != v}
+            if not delta and self._latest is not None:
+                return
+            self._state = dict(state)
+            seq = next(self._seq)
+            self._latest = StatusMessage(
+                seq=seq,
+                delta=_sse("delta", seq, delta),
+                snapshot=_sse("snapshot", seq, self._state),
+            )
+            self.published += 1
+
+        loop = self._loop
+        if loop is not None and self._subscribers:
+            try:
+                loop.call_soon_threadsafe(self._wake_all)
+            except RuntimeError:
+                # Event loop already closed (shutdown).
+                pass
+
+    def latest(self) -> Optional[StatusMessage]:
+        return self._latest
+
+    async def stream(self, min_interval_s: float, keepalive_s: float = 15.0) -> AsyncIterator[bytes]:
+        # Yields SSE frames for one subscriber until the client disconnects (the generator is cancelled).
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        wake = asyncio.Event()
+        self._subscribers.add(wake)
+        try:
+            last_seq = 0
+            last_sent = 0.0
+            while True:
+                message = self._latest
+                if message is None or message.seq == last_seq:
+                    wake.clear()
+                    try:
+                        await asyncio.wait_for(wake.wait(), timeout=keepalive_s)
+                    except asyncio.TimeoutError:
+                        yield b": keepalive\n\n"
+                    continue
+
+                # Rate cap: wait out the interval, then send whatever is newest by then.
+                delay = last_sent + min_interval_s - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    message = self._latest
+
+                yield message.delta if message.seq == last_seq + 1 else message.snapshot
+                last_seq = message.seq
+                last_sent = loop.time()
+        finally:
+            self._subscribers.discard(wake)
+
+    def _wake_all(self) -> None:
+        for wake in self._subscribers:
+            wake.set()
+
+
+_MISSING = object()
+
+
+def _sse(event: str, seq: int, data: Dict[str, Any]) -> bytes:
+    payload = json.dumps(data, separators=(",", ":"))
+    return f"id: {seq}\nevent: {event}\ndata: {payload}\n\n".encode("utf-8")
@@ -0,0 +1,192 @@
+# app/services/telemetry_history.py
+import math
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DOWNSAMPLE_METHODS = ("minmax", "lttb")
+
+_NAN = float("nan")
+_NO_DUTY = -1
+
+
+class TelemetryHistory:
+    # Fixed-capacity ring buffer holding one sample per control loop tick. Every series is a preallocated
+    # array, so record() only overwrites slots and never creates objects that outlive the call.
+    # Temperatures are kept per sensor name; a sensor without a value in a tick gets NaN.
+    def __init__(self, capacity: int = 3600) -> None:
+        self._capacity = max(2, int(capacity))
+        self._lock = threading.Lock()
+
+        self._ts = array("d", [0.0]) * self._capacity
+        self._target = array("h", [_NO_DUTY]) * self._capacity
+        self._applied = array("h", [_NO_DUTY]) * self._capacity
+        self._reason = array("B", [0]) * self._capacity
+        self._temps: Dict[str, array] = {}
+
+        # Safety reasons are stored as small codes; code 0 means "no safety intervention".
+        self._reason_codes: Dict[str, int] = {}
+        self._reason_names: List[Optional[str]] = [None]
+
+        self._next = 0
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def record(self, ts: float, temps_c: Dict[str, float], target_duty: int, applied_duty: Optional[int],
+               safety_reason: Optional[str]) -> None:
+        reason = self._reason_code(safety_reason)
+        with self._lock:
+            i = self._next
+            self._ts[i] = ts
+            self._target[i] = target_duty
+            self._applied[i] = _NO_DUTY if applied_duty is None else applied_duty
+            self._reason[i] = reason
+
+            for name, series in self._temps.items():
+                series[i] = temps_c.get(name, _NAN)
+            for name in temps_c:
+                if name not in self._temps:
+                    # First sample of a new sensor: the only allocation, once per sensor.
+                    series = array("d", [_NAN]) * self._capacity
+                    series[i] = temps_c[name]
+                    self._temps[name] = series
+
+            self._next = (i + 1) % self._capacity
+            if self._size < self._capacity:
+                self._size += 1
+
+    def retain(self, sensor_names: Sequence[str]) -> None:
+        # Drops the series of sensors that no longer exist.
+        keep = set(sensor_names)
+        with self._lock:
+            for name in [n for n in self._temps if n not in keep]:
+                del self._temps[name]
+
+    def query(self, start_ts: Optional[float], end_ts: Optional[float], max_points: int,
+              method: str = "minmax") -> Dict[str, Any]:
+        # Returns every series in [start_ts, end_ts] downsampled to at most max_points [ts, value] pairs.
+        # Safety reasons are returned as transitions only, which is already compact.
+        with self._lock:
+            ts, target, applied, reason, temps = self._ordered()
+
+        lo = 0 if start_ts is None else bisect_left(ts, start_ts)
+        hi = len(ts) if end_ts is None else bisect_right(ts, end_ts)
+        ts = ts[lo:hi]
+
+        def _series(values: Sequence[float], missing: float) -> List[Tuple[float, float]]:
+            out = []
+            for t, v in zip(ts, values[lo:hi]):
+                if v == missing or v != v:  # v != v for NaN
+                    continue
+                out.append((t, v))
+            return _downsample(out, max_points, method)
+
+        transitions = []
+        prev = None
+        for t, code in zip(ts, reason[lo:hi]):
+            if code != prev:
+                transitions.append([t, self._reason_names[code]])
+                prev = code
+
+        return {
+            "start_ts": ts[0] if ts else None,
+            "end_ts": ts[-1] if ts else None,
+            "samples": len(ts),
+            "method": method,
+            "temps_c": {name: _series(values, _NAN) for name, values in temps.items()},
+            "target_duty_percent": _series(target, _NO_DUTY),
+            "applied_duty_percent": _series(applied, _NO_DUTY),
+            "safety_reason": transitions,
+        }
+
+    def _ordered(self):
+        # Copies the buffer out in chronological order. Caller holds the lock.
+        n, i = self._size, self._next
+        start = (i - n) % self._capacity
+
+        def _chrono(a: array) -> array:
+            if n < self._capacity:
+                return a[:n]
+            return a[start:] + a[:start]
+
+        temps = {name: _chrono(series) for name, series in self._temps.items()}
+        return _chrono(self._ts), _chrono(self._target), _chrono(self._applied), _chrono(self._reason), temps
+
+    def _reason_code(self, reason: Optional[str]) -> int:
+        if reason is None:
+            return 0
+        # Reasons carry measured values ("hard_limit_preempt (81.2C >= 75.0C)"); keep only the kind.
+        kind = reason.split(" ", 1)[0]
+        code = self._reason_codes.get(kind)
+        if code is None:
+            if len(self._reason_names) >= 255:
+                return 0
+            code = len(self._reason_names)
+            self._reason_codes[kind] = code
+            self._reason_names.append(kind)
+        return code
+
+
+def _downsample(points: List[Tuple[float, float]], max_points: int, method: str) -> List[List[float]]:
+    max_points = max(2, int(max_points))
+    if len(points) <= max_points:
+        return [[t, v] for t, v in points]
+    if method == "lttb":
+        return _lttb(points, max_points)
+    return _min_max(points, max_points)
+
+
+def _min_max(points: List[Tuple[float, float]], max_points: int) -> List[List[float]]:
+    # Splits the range into max_points / 2 buckets and keeps the min and max of each, in time order,
+    # so peaks survive downsampling.
+    buckets = max(1, max_points // 2)
+    size = len(points) / buckets
+    out: List[List[float]] = []
+    for b in range(buckets):
+        chunk = points[int(b * size):int((b + 1) * size)]
+        if not chunk:
+            continue
+        lo = min(chunk, key=lambda p: p[1])
+        hi = max(chunk, key=lambda p: p[1])
+        if lo is hi:
+            out.append([lo[0], lo[1]])
+        else:
+            first, second = (lo, hi) if lo[0] <= hi[0] else (hi, lo)
+            out.append([first[0], first[1]])
+            out.append([second[0], second[1]])
+    return out
+
+
+def _lttb(points: List[Tuple[float, float]], threshold: int) -> List[List[float]]:
+    # Largest-Triangle-Three-Buckets: keeps first and last point and, per bucket, the point forming the
+    # largest triangle with the previously selected point and the average of the next bucket.
+    n = len(points)
+    every = (n - 2) / (threshold - 2)
+    out: List[List[float]] = [[points[0][0], points[0][1]]]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int(math.floor((i + 1) * every)) + 1
+        avg_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        avg_range = points[avg_start:avg_end] or [points[-1]]
+        avg_x = sum(p[0] for p in avg_range) / len(avg_range)
+        avg_y = sum(p[1] for p in avg_range) / len(avg_range)
+
+        range_start = int(math.floor(i * every)) + 1
+        range_end = int(math.floor((i + 1) * every)) + 1
+        ax, ay = points[a]
+        best_area = -1.0
+        best = range_start
+        for j in range(range_start, range_end):
+            px, py = points[j]
+            area = abs((ax - avg_x) * (py - ay) - (ax - px) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        out.append([points[best][0], points[best][1]])
+        a = best
+    out.append([points[-1][0], points[-1][1]])
+    return out
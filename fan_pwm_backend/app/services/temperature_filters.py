@@ -0,0 +1,394 @@
+# app/services/temperature_filters.py
+import heapq
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # NumPy is optional; push_many() then runs sample by sample.
+    np = None
+
+FILTER_TYPES = ("mean", "ema", "median")
+
+# Upper bound of window values the vectorized median holds in memory at once.
+_MEDIAN_CHUNK_VALUES = 1 << 20
+
+
+def _to_tenths(value_c: float) -> int:
+    # Sensor values are rounded to 0.1C; integer tenths keep running sums exact.
+    return int(round(value_c * 10.0))
+
+
+def _windows(ts: Sequence[float], values: Sequence[float], window_s: float):
+    # Integer tenths of a series and, per sample, the index of the oldest sample still in its time window
+    # (the same cutoff the per-sample filters apply; timestamps must not decrease).
+    t = np.asarray(ts, dtype=np.float64)
+    v = np.rint(np.asarray(values, dtype=np.float64) * 10.0).astype(np.int64)
+    return v, np.searchsorted(t, t - window_s, side="left")
+
+
+class FilterStage(ABC):
+    @abstractmethod
+    def push(self, ts: float, value_c: float) -> Optional[float]:
+        # Returns the filtered value, or None to drop the sample (the chain then repeats its last output).
+        raise NotImplementedError
+
+    def push_many(self, ts: Sequence[float], values: Sequence[float]) -> List[Optional[float]]:
+        # Same as push() for every sample in turn. Stages that can process a whole series at once override it.
+        return [self.push(t, v) for t, v in zip(ts, values)]
+
+
+class SpikeRejector(FilterStage):
+    # Drops a sample that jumps more than threshold_c away from the last accepted one. After
+    # max_consecutive drops in a row the jump is accepted as real.
+    def __init__(self, threshold_c: float, max_consecutive: int = 3) -> None:
+        self._threshold_c = float(threshold_c)
+        self._max_consecutive = int(max_consecutive)
+        self._last: Optional[float] = None
+        self._rejected = 0
+
+    def push(self, ts: float, value_c: float) -> Optional[float]:
+        if self._last is not None and abs(value_c - self._last) > self._threshold_c and self._rejected < self._max_consecutive:
+            self._rejected += 1
+            return None
+        self._rejected = 0
+        self._last = value_c
+        return value_c
+
+    def push_many(self, ts: Sequence[float], values: Sequence[float]) -> List[Optional[float]]:
+        # push() without the per-call overhead; every output depends on the previous one.
+        threshold, max_consecutive = self._threshold_c, self._max_consecutive
+        last, rejected = self._last, self._rejected
+        out: List[Optional[float]] = []
+        for v in values:
+            if last is not None and abs(v - last) > threshold and rejected < max_consecutive:
+                rejected += 1
+                out.append(None)
+            else:
+                rejected = 0
+                last = v
+                out.append(v)
+        self._last, self._rejected = last, rejected
+        return out
+
+
+class WindowMean(FilterStage):
+    # Moving average over the last window_s seconds with a running sum.
+    def __init__(self, window_s: float) -> None:
+        self._window_s = float(window_s)
+        self._samples: Deque[Tuple[float, int]] = deque()
+        self._sum = 0
+
+    def push(self, ts: float, value_c: float) -> Optional[float]:
+        v = _to_tenths(value_c)
+        self._samples.append((ts, v))
+        self._sum += v
+
+        cutoff = ts - self._window_s
+        while self._samples[0][0] < cutoff:
+            _, old = self._samples.popleft()
+            self._sum -= old
+
+        return round(self._sum / len(self._samples)) / 10.0
+
+    def push_many(self, ts: Sequence[float], values: Sequence[float]) -> List[Optional[float]]:
+        # Vectorized: window sums from a cumulative sum, window starts by binary search on the timestamps
+        # (which must not decrease, as in the loop). Integer tenths and the same float operations as push()
+        # make the output identical; the window state afterwards is the same too.
+        if np is None or self._samples or len(values) < 2:
+            return super().push_many(ts, values)
+
+        v, start = _windows(ts, values, self._window_s)
+        csum = np.concatenate((np.zeros(1, dtype=np.int64), np.cumsum(v)))
+        sums = csum[1:] - csum[start]
+        counts = np.arange(1, len(v) + 1) - start
+        out = np.rint(sums / counts) / 10.0
+
+        first = int(start[-1])
+        self._samples = deque(zip(ts[first:], v[first:].tolist()))
+        self._sum = int(sums[-1])
+        return out.tolist()
+
+
+class Ema(FilterStage):
+    # Exponential moving average; time_constant_s plays the role of the window.
+    def __init__(self, time_constant_s: float) -> None:
+        self._tau = float(time_constant_s)
+        self._value: Optional[float] = None
+        self._last_ts: Optional[float] = None
+
+    def push(self, ts: float, value_c: float) -> Optional[float]:
+        if self._value is None or self._last_ts is None:
+            self._value = float(value_c)
+        else:
+            dt = max(0.0, ts - self._last_ts)
+            alpha = 1.0 - math.exp(-dt / self._tau) if self._tau > 0 else 1.0
+            self._value += alpha * (float(value_c) - self._value)
+        self._last_ts = ts
+        return round(self._value, 1)
+
+    def push_many(self, ts: Sequence[float], values: Sequence[float]) -> List[Optional[float]]:
+        # push() without the per-call overhead (a recurrence, so not vectorized). alpha is only recomputed
+        # when the sample spacing changes.
+        tau = self._tau
+        value, last_ts = self._value, self._last_ts
+        last_dt: Optional[float] = None
+        alpha = 1.0
+        out: List[Optional[float]] = []
+        for t, v in zip(ts, values):
+            if value is None or last_ts is None:
+                value = float(v)
+            else:
+                dt = max(0.0, t - last_ts)
+                if dt != last_dt:
+                    last_dt = dt
+                    alpha = 1.0 - math.exp(-dt / tau) if tau > 0 else 1.0
+                value += alpha * (float(v) - value)
+            last_ts = t
+            out.append(round(value, 1))
+        self._value, self._last_ts = value, last_ts
+        return out
+
+
+class SlidingMedian(FilterStage):
+    # Median over the last window_s seconds. Two heaps with lazy deletion: O(log n) per sample.
+    def __init__(self, window_s: float) -> None:
+        self._window_s = float(window_s)
+        self._samples: Deque[Tuple[float, int]] = deque()
+        self._low: List[int] = []  # max-heap (negated) holding the smaller half
+        self._high: List[int] = []  # min-heap holding the larger half
+        self._low_size = 0
+        self._high_size = 0
+        self._delayed: Dict[int, int] = {}
+
+    def push(self, ts: float, value_c: float) -> Optional[float]:
+        v = _to_tenths(value_c)
+        self._samples.append((ts, v))
+        self._insert(v)
+
+        cutoff = ts - self._window_s
+        while self._samples[0][0] < cutoff:
+            _, old = self._samples.popleft()
+            self._remove(old)
+
+        # Lazily deleted values can stay buried in the heaps; rebuild once they dominate (amortized O(log n)).
+        if len(self._low) + len(self._high) > 2 * len(self._samples) + 16:
+            self._compact()
+
+        if self._low_size > self._high_size:
+            median = float(-self._low[0])
+        else:
+            median = (-self._low[0] + self._high[0]) / 2.0
+        return round(median) / 10.0
+
+    def push_many(self, ts: Sequence[float], values: Sequence[float]) -> List[Optional[float]]:
+        # Vectorized: windows holding the same number of samples are rows of a strided view of the series,
+        # so each window length is one np.median call (in chunks). The median of integer tenths averages the
+        # middle pair exactly like push() does; the heaps are rebuilt from the last window afterwards.
+        if np is None or self._samples or len(values) < 2:
+            return super().push_many(ts, values)
+
+        v, start = _windows(ts, values, self._window_s)
+        counts = np.arange(1, len(v) + 1) - start
+        medians = np.empty(len(v), dtype=np.float64)
+        for count in np.unique(counts).tolist():
+            ends = np.flatnonzero(counts == count)
+            rows = sliding_window_view(v, count)
+            step = max(1, _MEDIAN_CHUNK_VALUES // count)
+            for i in range(0, len(ends), step):
+                chunk = ends[i:i + step]
+                medians[chunk] = np.median(rows[chunk - count + 1], axis=1)
+
+        first = int(start[-1])
+        self._samples = deque(zip(ts[first:], v[first:].tolist()))
+        self._compact()
+        return (np.rint(medians) / 10.0).tolist()
+
+    def _compact(self) -> None:
+        values = sorted(v for _, v in self._samples)
+        split = (len(values) + 1) // 2
+        self._low = [-v for v in values[:split]]
+        self._high = values[split:]
+        heapq.heapify(self._low)
+        heapq.heapify(self._high)
+        self._low_size = len(self._low)
+        self._high_size = len(self._high)
+        self._delayed.clear()
+
+    def _insert(self, v: int) -> None:
+        if not self._low or v <= -self._low[0]:
+            heapq.heappush(self._low, -v)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, v)
+            self._high_size += 1
+        self._rebalance()
+
+    def _remove(self, v: int) -> None:
+        self._delayed[v] = self._delayed.get(v, 0) + 1
+        if v <= -self._low[0]:
+            self._low_size -= 1
+            if v == -self._low[0]:
+                self._prune(self._low, negated=True)
+        else:
+            self._high_size -= 1
+            if self._high and v == self._high[0]:
+                self._prune(self._high, negated=False)
+        self._rebalance()
+
+    def _rebalance(self) -> None:
+        if self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, negated=True)
+        elif self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._high_size -= 1
+            self._low_size += 1
+            self._prune(self._high, negated=False)
+
+    def _prune(self, heap: List[int], negated: bool) -> None:
+        while heap:
+            v = -heap[0] if negated else heap[0]
+            count = self._delayed.get(v, 0)
+            if not count:
+                return
+            if count == 1:
+                del self._delayed[v]
+            else:
+                self._delayed[v] = count - 1
+            heapq.heappop(heap)
+
+
+class Hysteresis(FilterStage):
+    # Freezes the output while the input stays within band_c of it.
+    def __init__(self, band_c: float) -> None:
+        self._band_c = float(band_c)
+        self._last: Optional[float] = None
+
+    def push(self, ts: float, value_c: float) -> Optional[float]:
+        if self._last is None or abs(value_c - self._last) >= self._band_c:
+            self._last = value_c
+        return self._last
+
+    def push_many(self, ts: Sequence[float], values: Sequence[float]) -> List[Optional[float]]:
+        band, last = self._band_c, self._last
+        out: List[Optional[float]] = []
+        for v in values:
+            if last is None or abs(v - last) >= band:
+                last = v
+            out.append(last)
+        self._last = last
+        return out
+
+
+@dataclass(frozen=True)
+class FilterConfig:
+    smoothing_filter: str
+    smoothing_window_s: float
+    hysteresis_c: float
+    spike_threshold_c: float
+
+
+class FilterChain:
+    def __init__(self, stages: List[FilterStage]) -> None:
+        self._stages = stages
+        self._last: Optional[float] = None
+
+    @property
+    def last(self) -> Optional[float]:
+        return self._last
+
+    def push(self, ts: float, value_c: float) -> Optional[float]:
+        v: Optional[float] = value_c
+        for stage in self._stages:
+            v = stage.push(ts, v)
+            if v is None:
+                return self._last
+        self._last = v
+        return v
+
+    def push_many(self, ts: Sequence[float], values: Sequence[float]) -> List[Optional[float]]:
+        # Same outputs as push() for every sample in turn, computed stage by stage over the whole series.
+        # Samples a stage drops do not reach the next one; their output repeats the last value, as in push().
+        index = list(range(len(values)))
+        stage_ts: Sequence[float] = ts
+        stage_values: List[Optional[float]] = list(values)
+        for stage in self._stages:
+            out = stage.push_many(stage_ts, stage_values)
+            kept = [i for i, v in enumerate(out) if v is not None]
+            if len(kept) != len(out):
+                index = [index[i] for i in kept]
+                stage_ts = [stage_ts[i] for i in kept]
+                out = [out[i] for i in kept]
+            stage_values = out
+
+        if len(index) == len(values):
+            # Nothing was dropped.
+            if stage_values:
+                self._last = stage_values[-1]
+            return stage_values
+
+        result: List[Optional[float]] = []
+        last = self._last
+        passed = iter(zip(index, stage_values))
+        next_index, next_value = next(passed, (None, None))
+        for i in range(len(values)):
+            if i == next_index:
+                last = next_value
+                next_index, next_value = next(passed, (None, None))
+            result.append(last)
+        self._last = last
+        return result
+
+
+def build_filter_chain(config: FilterConfig) -> FilterChain:
+    stages: List[FilterStage] = []
+    if config.spike_threshold_c > 0:
+        stages.append(SpikeRejector(config.spike_threshold_c))
+    if config.smoothing_window_s > 0:
+        if config.smoothing_filter == "ema":
+            stages.append(Ema(config.smoothing_window_s))
+        elif config.smoothing_filter == "median":
+            stages.append(SlidingMedian(config.smoothing_window_s))
+        else:
+            stages.append(WindowMean(config.smoothing_window_s))
+    if config.hysteresis_c > 0:
+        stages.append(Hysteresis(config.hysteresis_c))
+    return FilterChain(stages)
+
+
+class SensorFilterBank:
+    # One filter chain per sensor. Chains are rebuilt when the configuration changes and dropped when a
+    # sensor goes away.
+    def __init__(self) -> None:
+        self._config: Optional[FilterConfig] = None
+        self._chains: Dict[int, FilterChain] = {}
+
+    def configure(self, config: FilterConfig) -> None:
+        if config != self._config:
+            self._config = config
+            self._chains.clear()
+
+    def push(self, sensor_id: int, ts: float, value_c: float) -> Optional[float]:
+        chain = self._chains.get(sensor_id)
+        if chain is None:
+            if self._config is None:
+                raise RuntimeError("SensorFilterBank is not configured")
+            chain = build_filter_chain(self._config)
+            self._chains[sensor_id] = chain
+        return chain.push(ts, value_c)
+
+    def last(self, sensor_id: int) -> Optional[float]:
+        chain = self._chains.get(sensor_id)
+        return chain.last if chain is not None else None
+
+    def retain(self, sensor_ids: Iterable[int]) -> None:
+        keep = set(sensor_ids)
+        for sensor_id in [s for s in self._chains if s not in keep]:
+            del self._chains[sensor_id]
@@ -0,0 +1,127 @@
+# app/services/tick_scheduler.py
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Optional
+
+from app.core.clock import SYSTEM_CLOCK, Clock
+
+# Upper bucket bounds in microseconds; one extra bucket counts everything above the last bound.
+_BUCKET_BOUNDS_US = (100, 250, 500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000,
+                     100_000, 250_000, 500_000, 1_000_000, 2_500_000)
+
+_MIN_INTERVAL_NS = 50_000_000  # 50ms, same floor the loop always had
+
+
+class LatencyHistogram:
+    # Fixed-size histogram; record() does not allocate.
+    def __init__(self) -> None:
+        self._counts = array("q", [0] * (len(_BUCKET_BOUNDS_US) + 1))
+        self._count = 0
+        self._sum_ns = 0
+        self._max_ns = 0
+
+    def record(self, value_ns: int) -> None:
+        if value_ns < 0:
+            value_ns = 0
+        self._counts[bisect_left(_BUCKET_BOUNDS_US, value_ns // 1000)] += 1
+        self._count += 1
+        self._sum_ns += value_ns
+        if value_ns > self._max_ns:
+            self._max_ns = value_ns
+
+    def quantile_ms(self, q: float) -> Optional[float]:
+        # Upper bound of the bucket holding the q-quantile (None if that is the overflow bucket).
+        if not self._count:
+            return None
+        rank = q * self._count
+        seen = 0
+        for i, n in enumerate(self._counts):
+            seen += n
+            if seen >= rank and n:
+                return _BUCKET_BOUNDS_US[i] / 1000.0 if i < len(_BUCKET_BOUNDS_US) else None
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {f"le_{b / 1000.0:g}ms": self._counts[i] for i, b in enumerate(_BUCKET_BOUNDS_US)}
+        buckets["inf"] = self._counts[-1]
+        return {
+            "count": self._count,
+            "mean_ms": round(self._sum_ns / self._count / 1e6, 3) if self._count else None,
+            "max_ms": round(self._max_ns / 1e6, 3),
+            "p50_ms": self.quantile_ms(0.5),
+            "p99_ms": self.quantile_ms(0.99),
+            "buckets": buckets,
+        }
+
+
+class TickScheduler:
+    # Runs ticks on a fixed grid of absolute monotonic deadlines (start + k * interval), so the time a tick
+    # takes never shifts later ticks. If a tick overruns one or more deadlines, those ticks are skipped and
+    # counted instead of being run back to back. Changing the interval or an early wake-up re-anchors the grid.
+    def __init__(self, clock: Clock = SYSTEM_CLOCK) -> None:
+        self._clock = clock
+        self._clock_ns = clock.monotonic_ns
+        self._deadline_ns: Optional[int] = None
+        self._interval_ns = 0
+        self._tick_started_ns = 0
+
+        self.ticks = 0
+        self.missed = 0
+        self.lateness = LatencyHistogram()
+        self.duration = LatencyHistogram()
+
+    def wait(self, wake: threading.Event) -> None:
+        # Sleeps until the next deadline. Setting wake ends the sleep early and runs the next tick right away;
+        # the grid is then re-anchored at that tick.
+        if self._deadline_ns is None:
+            self._deadline_ns = self._clock_ns()
+        while True:
+            remaining_ns = self._deadline_ns - self._clock_ns()
+            if remaining_ns <= 0:
+                return
+            if self._clock.wait(wake, remaining_ns / 1e9):
+                wake.clear()
+                self._deadline_ns = self._clock_ns()
+                self._interval_ns = 0
+                return
+
+    def begin_tick(self) -> None:
+        now = self._clock_ns()
+        self._tick_started_ns = now
+        self.lateness.record(now - self._deadline_ns if self._deadline_ns is not None else 0)
+
+    def end_tick(self, interval_s: float) -> None:
+        now = self._clock_ns()
+        self.ticks += 1
+        self.duration.record(now - self._tick_started_ns)
+
+        interval_ns = max(_MIN_INTERVAL_NS, int(interval_s * 1e9))
+        if interval_ns != self._interval_ns:
+            self._interval_ns = interval_ns
+            self._deadline_ns = self._tick_started_ns
+
+        deadline = (self._deadline_ns if self._deadline_ns is not None else self._tick_started_ns) + interval_ns
+        if now >= deadline:
+            skipped = (now - deadline) // interval_ns + 1
+            self.missed += skipped
+            deadline += skipped * interval_ns
+        self._deadline_ns = deadline
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "interval_ms": self._interval_ns / 1e6,
+            "ticks": self.ticks,
+            "missed_ticks": self.missed,
+            "lateness_p99_ms": self.lateness.quantile_ms(0.99),
+            "duration_p99_ms": self.duration.quantile_ms(0.99),
+        }
+
+    def histograms(self) -> Dict[str, Any]:
+        return {
+            "interval_ms": self._interval_ns / 1e6,
+            "ticks": self.ticks,
+            "missed_ticks": self.missed,
+            "lateness": self.lateness.snapshot(),
+            "duration": self.duration.snapshot(),
+        }
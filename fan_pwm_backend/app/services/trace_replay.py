@@ -0,0 +1,220 @@
+# app/services/trace_replay.py
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from app.services.control_plane_cache import ControlPlaneSnapshot, FanPlan
+from app.services.safety_service import SafetyService
+from app.services.temperature_filters import FilterConfig, build_filter_chain
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the replay then runs in plain Python, with the same results.
+    np = None
+
+_NAN = float("nan")
+
+# Longest accepted trace: a week of 1 Hz samples.
+MAX_TRACE_SAMPLES = 7 * 86400
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    ts: List[float]
+    # Filtered temperature per sensor name and tick (NaN where the sensor had no value).
+    temps_c: Dict[str, List[float]]
+    # Duty written per fan name and tick.
+    duty: Dict[str, List[int]]
+    stats: Dict[str, Any]
+
+
+class TraceReplay:
+    # Runs recorded sensor readings through the decision pipeline of ControlLoopService._tick for a given
+    # control plane: spike rejection, smoothing and hysteresis per sensor, curve evaluation, the maximum per
+    # fan, safety preemption and kickstarts. A tick is a timestamp plus one raw reading per sensor (None for
+    # a failed read). The pipeline is applied to whole series instead of tick by tick: the moving average,
+    # the curves and the safety rules are vectorized when NumPy is installed; recursive filters (EMA, median,
+    # spike rejection, hysteresis) run through the live filter classes. Same operations in the same order, so
+    # the result is identical to what the loop would have written.
+    def __init__(self, plan: ControlPlaneSnapshot) -> None:
+        if not plan.fans:
+            raise ValueError("No enabled fan to replay")
+        self._plan = plan
+        self._safety = SafetyService()
+
+    def run(self, ts: Sequence[float], readings: Mapping[str, Sequence[Optional[float]]]) -> ReplayResult:
+        plan = self._plan
+        settings = plan.settings
+        ts = [float(t) for t in ts]
+        n = len(ts)
+        if n == 0:
+            raise ValueError("Trace is empty")
+        if n > MAX_TRACE_SAMPLES:
+            raise ValueError(f"Trace is longer than {MAX_TRACE_SAMPLES} samples")
+        increasing = bool(np.all(np.diff(ts) > 0)) if np is not None else all(b > a for a, b in zip(ts, ts[1:]))
+        if not increasing:
+            raise ValueError("Timestamps must be strictly increasing")
+
+        known = {s.name for s in plan.sensors}
+        unknown = sorted(set(readings) - known)
+        if unknown:
+            raise ValueError(f"Unknown or disabled sensor: {', '.join(unknown)}")
+        for name, values in readings.items():
+            if len(values) != n:
+                raise ValueError(f"Trace of sensor {name} has {len(values)} samples, expected {n}")
+        # Sensors without a trace are left out, as if they were disabled.
+        sensors = [s for s in plan.sensors if s.name in readings]
+        if not sensors:
+            raise ValueError("No sensor trace given")
+
+        config = FilterConfig(
+            smoothing_filter=settings.smoothing_filter,
+            smoothing_window_s=settings.smoothing_window_s,
+            hysteresis_c=settings.hysteresis_c,
+            spike_threshold_c=settings.spike_threshold_c,
+        )
+        temps = {s.name: _filter_trace(config, ts, readings[s.name]) for s in sensors}
+
+        # Max across sensors and the target per fan: the highest duty of the curves mapped to it.
+        targets = [_zeros(n) for _ in plan.fans]
+        max_temp = _full(n, _NAN)
+        for s in sensors:
+            t = temps[s.name]
+            if np is not None:
+                valid = ~np.isnan(t)
+                max_temp = np.fmax(max_temp, t)
+                for sc in s.curves:
+                    targets[sc.fan_index][valid] = np.maximum(targets[sc.fan_index][valid], sc.curve.evaluate_many(t[valid]))
+            else:
+                valid = [i for i, v in enumerate(t) if not math.isnan(v)]
+                for i in valid:
+                    max_temp[i] = t[i] if math.isnan(max_temp[i]) else max(max_temp[i], t[i])
+                for sc in s.curves:
+                    target = targets[sc.fan_index]
+                    for i, duty in zip(valid, sc.curve.evaluate_many([t[i] for i in valid])):
+                        if duty > target[i]:
+                            target[i] = duty
+
+        # SafetyService.apply() over the whole series: unknown max -> 100%, max >= hard limit - margin -> 100%.
+        threshold = max(0.0, float(settings.hard_limit_c) - float(settings.hard_limit_margin_c))
+        if np is not None:
+            unknown_temp = np.isnan(max_temp)
+            preempt = ~unknown_temp & (max_temp >= threshold)
+            duty = [np.where(unknown_temp | preempt, 100, target) for target in targets]
+            fail_safe_ticks, preempt_ticks = int(unknown_temp.sum()), int(preempt.sum())
+        else:
+            decisions = [self._safety.apply(0, None if math.isnan(m) else m, settings.hard_limit_c,
+                                            settings.hard_limit_margin_c) for m in max_temp]
+            forced = [d.reason is not None for d in decisions]
+            duty = [[100 if f else d for f, d in zip(forced, target)] for target in targets]
+            fail_safe_ticks = sum(1 for m in max_temp if math.isnan(m))
+            preempt_ticks = sum(forced) - fail_safe_ticks
+
+        # Each tick counts until the next one; the last one for one loop interval.
+        dt = [b - a for a, b in zip(ts, ts[1:])] + [float(settings.loop_interval_s)]
+        fans: Dict[str, Dict[str, Any]] = {}
+        for fan, series in zip(plan.fans, duty):
+            fans[fan.name] = {
+                "mean_duty_percent": round(_mean(series), 3),
+                "duty_changes": _changes(series),
+                "kickstarts": _kickstarts(fan, ts, series),
+            }
+        if np is not None:
+            above_s = float(np.sum(np.asarray(dt)[max_temp >= threshold]))
+        else:
+            above_s = sum(d for d, m in zip(dt, max_temp) if not math.isnan(m) and m >= threshold)
+        stats = {
+            "ticks": n,
+            "duration_s": round(sum(dt), 3),
+            "threshold_c": threshold,
+            "max_temp_c": _nanmax(max_temp),
+            "time_above_threshold_s": round(above_s, 3),
+            "fail_safe_ticks": fail_safe_ticks,
+            "hard_limit_ticks": preempt_ticks,
+            "fans": fans,
+        }
+        return ReplayResult(
+            ts=ts,
+            temps_c={name: _to_list(t) for name, t in temps.items()},
+            duty={fan.name: [int(d) for d in _to_list(series)] for fan, series in zip(plan.fans, duty)},
+            stats=stats,
+        )
+
+
+def _filter_trace(config: FilterConfig, ts: List[float], values: Sequence[Optional[float]]):
+    # A fresh filter chain per sensor, fed with the successful reads only (the loop skips failed ones).
+    # Readings are rounded to 0.1C first, like SensorSampler does.
+    chain = build_filter_chain(config)
+    index: List[int] = []
+    sample_ts: List[float] = []
+    sample_values: List[float] = []
+    for i, v in enumerate(values):
+        if v is not None and not math.isnan(v):
+            index.append(i)
+            sample_ts.append(ts[i])
+            sample_values.append(round(float(v), 1))
+    filtered = chain.push_many(sample_ts, sample_values)
+    out = _full(len(ts), _NAN)
+    if np is not None:
+        out[np.asarray(index, dtype=np.int64)] = np.asarray([_NAN if v is None else v for v in filtered], dtype=np.float64)
+    else:
+        for i, v in zip(index, filtered):
+            out[i] = _NAN if v is None else v
+    return out
+
+
+def _kickstarts(fan: FanPlan, ts: List[float], duty) -> int:
+    # PwmService.set_duty(): a kickstart starts on a 0 -> >0 transition of the written duty; while its window
+    # runs, new targets only replace the pending one.
+    if not fan.kickstart_enabled or fan.kickstart_ms <= 0:
+        return 0
+    window_s = fan.kickstart_ms / 1000.0
+    if np is not None and len(ts) > 1 and window_s < float(np.min(np.diff(ts))):
+        # Every window ends before the next tick: each 0 -> >0 step between ticks is one kickstart.
+        prev = np.concatenate((np.zeros(1, dtype=duty.dtype), duty[:-1]))
+        return int(np.count_nonzero((prev == 0) & (duty > 0)))
+
+    count = 0
+    last_set = 0
+    pending: Optional[int] = None
+    window_end: Optional[float] = None
+    for t, d in zip(ts, _to_list(duty)):
+        if window_end is not None and t >= window_end:
+            last_set, pending, window_end = pending, None, None
+        if window_end is not None:
+            pending = d
+        elif last_set == 0 and d > 0:
+            count += 1
+            last_set, pending, window_end = fan.kickstart_duty_percent, d, t + window_s
+        else:
+            last_set = d
+    return count
+
+
+def _zeros(n: int):
+    return np.zeros(n, dtype=np.int64) if np is not None else [0] * n
+
+
+def _full(n: int, value: float):
+    return np.full(n, value, dtype=np.float64) if np is not None else [value] * n
+
+
+def _to_list(series) -> list:
+    return series.tolist() if np is not None else list(series)
+
+
+def _mean(series) -> float:
+    return float(np.mean(series)) if np is not None else sum(series) / len(series)
+
+
+def _changes(series) -> int:
+    if np is not None:
+        return int(np.count_nonzero(series[1:] != series[:-1]))
+    return sum(1 for a, b in zip(series, series[1:]) if a != b)
+
+
+def _nanmax(series) -> Optional[float]:
+    if np is not None:
+        return None if np.all(np.isnan(series)) else float(np.nanmax(series))
+    values = [v for v in series if not math.isnan(v)]
+    return max(values) if values else None
@@ -0,0 +1,96 @@
+# benchmarks/bench_config_cache.py
+#
+# Configuration GETs (/sensors, /sensors/{id}/curves, /curves/{id}/points, /settings) through the generation
+# keyed response cache: a query + serialization per request (the previous behaviour), a cached body for an
+# unchanged generation, and a 304 for a matching If-None-Match. Also checks that a write moves the ETag on and
+# the next response carries the new data, and that writes to other tables (events) do not. Exits non-zero if
+# a check fails. Run from fan_pwm_backend/:
+#
+#   python -m benchmarks.bench_config_cache --sensors 20
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from app.api.conditional import ResponseCache
+from app.database.database import Database
+
+
+def _per_call_us(fn: Callable[[], Any], calls: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / calls)
+    return best * 1e6
+
+
+def _seed(db: Database, sensor_dir: str, sensors: int) -> Tuple[int, int]:
+    sensor_id = curve_id = 0
+    for i in range(sensors):
+        path = os.path.join(sensor_dir, f"temp{i}_input")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("45000\n")
+        sensor_id = db.sensors.create(name=f"sensor{i}", sensor_type="hwmon", path=path)["id"]
+        for k in range(3):
+            curve_id = db.curves.create(sensor_id=sensor_id, name=f"curve{k}")["id"]
+            db.curve_points.replace_all(curve_id, [(30.0 + 5 * p, 10 * p) for p in range(8)])
+    return sensor_id, curve_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Config GETs: query per request vs generation keyed cache")
+    parser.add_argument("--sensors", type=int, default=20)
+    parser.add_argument("--min-speedup", type=float, default=4.0, help="cached 200 vs query per request")
+    args = parser.parse_args()
+
+    db = Database(tempfile.mkdtemp(prefix="fan-config-cache-"))
+    db.init()
+    sensor_id, curve_id = _seed(db, tempfile.mkdtemp(prefix="fan-config-cache-sensors-"), args.sensors)
+    cache = ResponseCache()
+    curve_tables = ("sensors", "curves", "curve_points")
+    endpoints: Dict[str, Tuple[Tuple[str, ...], Callable[[], Any]]] = {
+        "/sensors": (("sensors",), db.sensors.list),
+        f"/sensors/{sensor_id}/curves": (curve_tables, lambda: db.curves.list(sensor_id=sensor_id)),
+        f"/curves/{curve_id}/points": (curve_tables, lambda: db.curve_points.list(curve_id=curve_id)),
+        "/settings": (("app_settings",), db.settings.get_all),
+    }
+
+    checks: Dict[str, bool] = {}
+    print(f"sensors={args.sensors} (3 curves x 8 points each)")
+    print(f"{'endpoint':24s} {'query+json':>12s} {'cached 200':>12s} {'304':>10s}")
+    for path, (tables, build) in endpoints.items():
+        def uncached() -> bytes:
+            return json.dumps(build(), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+        etag = cache.respond(db, tables, path, None, build).headers["etag"]
+        query_us = _per_call_us(uncached, 200)
+        cached_us = _per_call_us(lambda: cache.respond(db, tables, path, None, build), 2000)
+        not_modified_us = _per_call_us(lambda: cache.respond(db, tables, path, etag, build), 2000)
+        print(f"{path:24s} {query_us:10.1f}us {cached_us:10.1f}us {not_modified_us:8.1f}us")
+        checks[f"{path} cached faster"] = query_us / cached_us >= args.min_speedup
+        checks[f"{path} same body"] = cache.respond(db, tables, path, None, build).body == uncached()
+
+    # Writes: events leave the config ETags alone; a config write moves them on.
+    tables, build = endpoints[f"/curves/{curve_id}/points"]
+    before = cache.respond(db, tables, f"/curves/{curve_id}/points", None, build)
+    db.events.create_many([("INFO", "bench", None, time.time())])
+    after_event = cache.respond(db, tables, f"/curves/{curve_id}/points", before.headers["etag"], build)
+    db.curve_points.replace_all(curve_id, [(40.0, 50)])
+    after_write = cache.respond(db, tables, f"/curves/{curve_id}/points", before.headers["etag"], build)
+    checks["event write keeps 304"] = after_event.status_code == 304
+    checks["config write invalidates"] = (after_write.status_code == 200
+                                          and json.loads(after_write.body)[0]["duty_percent"] == 50)
+    db.close()
+
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_config_import.py
+#
+# Provisioning cost: a full configuration (fans, sensors, curves with points, settings) applied to fresh
+# nodes once the way a client does it call by call (create sensor, create curve, replace points, activate,
+# patch settings; one commit each) and once as a single bundle through ConfigBundleService (one transaction,
+# executemany per table). Both must end in the same configuration. Exits non-zero if the bundle is not at
+# least --min-speedup times faster. Run from fan_pwm_backend/:
+#
+#   python -m benchmarks.bench_config_import --nodes 50 --sensors 8 --curves 3 --points 8
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from app.database.database import Database
+from app.services.config_bundle_service import ConfigBundleService
+
+
+def _bundle(sensor_dir: str, sensors: int, curves: int, points: int) -> Dict[str, Any]:
+    fans = [{"name": f"fan{i}", "pwm_chip": "pwmchip0", "pwm_channel": i} for i in range(2)]
+    out_sensors: List[Dict[str, Any]] = []
+    for s in range(sensors):
+        path = os.path.join(sensor_dir, f"temp{s}_input")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("45000\n")
+        out_sensors.append({
+            "name": f"sensor{s}",
+            "type": "hwmon",
+            "path": path,
+            "enabled": True,
+            "curves": [
+                {
+                    "name": f"curve{k}",
+                    "fan": f"fan{k % 2}",
+                    "active": k < 2,
+                    "points": [{"temp_c": 30.0 + 5.0 * p, "duty_percent": min(100, 10 * p + k)} for p in range(points)],
+                }
+                for k in range(curves)
+            ],
+        })
+    settings = {"loop_interval_s": 2.0, "hysteresis_c": 1.5, "smoothing_filter": "ema", "kickstart_ms": 400,
+                "hard_limit_c": 75.0, "events_max_rows": 50000}
+    return {"settings": settings, "fans": fans, "sensors": out_sensors}
+
+
+def _per_call(db: Database, bundle: Dict[str, Any]) -> None:
+    fan_ids = {f["name"]: db.fans.create(**f)["id"] for f in bundle["fans"]}
+    for s in bundle["sensors"]:
+        sensor = db.sensors.create(name=s["name"], sensor_type=s["type"], path=s["path"], enabled=s["enabled"])
+        for cu in s["curves"]:
+            curve = db.curves.create(sensor_id=sensor["id"], name=cu["name"], fan_id=fan_ids[cu["fan"]])
+            db.curve_points.replace_all(curve["id"], [(p["temp_c"], p["duty_percent"]) for p in cu["points"]])
+            if cu["active"]:
+                db.curves.activate(curve["id"])
+    for key, value in bundle["settings"].items():
+        db.settings.update_from_payload({key: value})
+
+
+def _bulk(db: Database, bundle: Dict[str, Any]) -> None:
+    ConfigBundleService(db).apply_bundle(bundle)
+
+
+def _provision(nodes: int, bundle: Dict[str, Any], apply) -> Dict[str, Any]:
+    times: List[float] = []
+    export: Dict[str, Any] = {}
+    for _ in range(nodes):
+        db = Database(tempfile.mkdtemp(prefix="fan-provision-"))
+        db.init()
+        t0 = time.perf_counter()
+        apply(db, bundle)
+        times.append(time.perf_counter() - t0)
+        export = ConfigBundleService(db).export_bundle()
+        db.close()
+    return {"times": times, "export": export}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Provisioning: call by call vs one bulk import")
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--sensors", type=int, default=8)
+    parser.add_argument("--curves", type=int, default=3, help="curves per sensor")
+    parser.add_argument("--points", type=int, default=8, help="points per curve")
+    parser.add_argument("--min-speedup", type=float, default=3.0)
+    args = parser.parse_args()
+
+    bundle = _bundle(tempfile.mkdtemp(prefix="fan-provision-sensors-"), args.sensors, args.curves, args.points)
+    calls = 2 + args.sensors * (1 + 2 * args.curves) + min(2, args.curves) * args.sensors + len(bundle["settings"])
+    per_call = _provision(args.nodes, bundle, _per_call)
+    bulk = _provision(args.nodes, bundle, _bulk)
+
+    print(f"nodes={args.nodes} sensors={args.sensors} curves/sensor={args.curves} points/curve={args.points} "
+          f"({calls} calls per node)")
+    for name, result in (("per call", per_call), ("bulk", bulk)):
+        times = result["times"]
+        print(f"{name:9s}: total={sum(times) * 1000:8.1f}ms per node: mean={statistics.fmean(times) * 1000:7.2f}ms "
+              f"max={max(times) * 1000:7.2f}ms")
+    speedup = sum(per_call["times"]) / sum(bulk["times"])
+    print(f"speedup  : {speedup:.1f}x")
+
+    checks = {
+        "same configuration": per_call["export"] == bulk["export"],
+        f"bulk at least {args.min_speedup:g}x faster": speedup >= args.min_speedup,
+    }
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
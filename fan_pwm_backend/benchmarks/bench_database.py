@@ -0,0 +1,127 @@
+# benchmarks/bench_database.py
+#
+# Per-call latency of the database layer under concurrent API-like load.
+# Compares the previous behaviour (new sqlite3 connection + PRAGMAs per call) against the pooled
+# ConnectionManager. Run from fan_pwm_backend/:
+#
+#   python -m benchmarks.bench_database --threads 8 --calls 500
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+from app.database.database import Database
+
+
+def _legacy_connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA foreign_keys=ON;")
+    return conn
+
+
+def _legacy_list_sensors(db_path: str) -> None:
+    conn = _legacy_connect(db_path)
+    try:
+        conn.execute("SELECT id, name, type, path, enabled, created_at, updated_at FROM sensors ORDER BY name").fetchall()
+    finally:
+        conn.close()
+
+
+def _legacy_set_setting(db_path: str, key: str, value: str) -> None:
+    conn = _legacy_connect(db_path)
+    try:
+        conn.execute("INSERT OR REPLACE INTO app_settings(key, value, updated_at) VALUES(?, ?, ?)", (key, value, time.time()))
+        conn.commit()
+        conn.execute("SELECT key, value, updated_at FROM app_settings WHERE key = ?", (key,)).fetchone()
+    finally:
+        conn.close()
+
+
+def _run_concurrent(threads: int, calls: int, read: Callable[[], None], write: Callable[[int], None]) -> Dict[str, List[float]]:
+    reads: List[float] = []
+    writes: List[float] = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads + 1)
+
+    def reader() -> None:
+        local: List[float] = []
+        start.wait()
+        for _ in range(calls):
+            t0 = time.perf_counter()
+            read()
+            local.append(time.perf_counter() - t0)
+        with lock:
+            reads.extend(local)
+
+    def writer() -> None:
+        local: List[float] = []
+        start.wait()
+        for i in range(max(1, calls // 10)):
+            t0 = time.perf_counter()
+            write(i)
+            local.append(time.perf_counter() - t0)
+        with lock:
+            writes.extend(local)
+
+    workers = [threading.Thread(target=reader) for _ in range(threads - 1)] + [threading.Thread(target=writer)]
+    for t in workers:
+        t.start()
+    start.wait()
+    for t in workers:
+        t.join()
+    return {"read": reads, "write": writes}
+
+
+def _summary(samples: List[float]) -> str:
+    if not samples:
+        return "n/a"
+    s = sorted(samples)
+    p95 = s[min(len(s) - 1, int(len(s) * 0.95))]
+    return f"n={len(s):5d} mean={statistics.fmean(s) * 1e6:8.1f}us p50={statistics.median(s) * 1e6:8.1f}us p95={p95 * 1e6:8.1f}us"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Database per-call latency under concurrent load")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--sensors", type=int, default=20)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="fan-bench-")
+    sensor_path = os.path.join(data_dir, "temp")
+    with open(sensor_path, "w", encoding="utf-8") as f:
+        f.write("42000\n")
+
+    db = Database(data_dir)
+    db.init()
+    for i in range(args.sensors):
+        db.sensors.create(name=f"sensor{i}", sensor_type="hwmon", path=sensor_path)
+    db_path = os.path.join(data_dir, "app.db")
+
+    legacy = _run_concurrent(
+        args.threads, args.calls,
+        read=lambda: _legacy_list_sensors(db_path),
+        write=lambda i: _legacy_set_setting(db_path, "bench", str(i)),
+    )
+    pooled = _run_concurrent(
+        args.threads, args.calls,
+        read=lambda: db.sensors.list(),
+        write=lambda i: db.settings.set("bench", str(i)),
+    )
+    db.close()
+
+    print(f"threads={args.threads} calls/thread={args.calls} sensors={args.sensors}")
+    print(f"legacy read : {_summary(legacy['read'])}")
+    print(f"pooled read : {_summary(pooled['read'])}")
+    print(f"legacy write: {_summary(legacy['write'])}")
+    print(f"pooled write: {_summary(pooled['write'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# benchmarks/bench_discovery.py
+#
+# Sensor discovery against a fake sysfs tree laid out like the real one: /sys/devices/... holds the device
+# directories, /sys/class/hwmon/hwmonN and /sys/class/thermal/thermal_zoneN are symlinks to them. Times a
+# full scan and an unchanged rescan of a host with hundreds of hwmon attributes, then checks that keys stay
+# the same when the hwmonN numbers are shuffled (as after a reboot), that a new device is the only one parsed
+# on the next rescan, and that bulk registration creates every sensor once. Finally shuffles the numbers again
+# after registration and checks that every registered sensor, as the control plane reads it, still reads its
+# own device. Exits non-zero if a check fails. Run from fan_pwm_backend/:
+#
+#   python -m benchmarks.bench_discovery --devices 64 --inputs 8
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from app.database.database import Database
+from app.hardware.sensors.sensor_discovery import SensorScanner
+from app.services.control_plane_cache import ControlPlaneCache
+from app.services.curve_engine import CurveEngine
+from app.services.sensor_registry_service import SensorRegistryService
+
+
+def _make_device(root: str, index: int, inputs: int) -> str:
+    # Half of the devices share a driver name (and labels), like several NVMe drives do.
+    driver = "nvme" if index % 2 else f"chip{index}"
+    device_dir = os.path.join(root, "devices", f"0000:{index:02x}:00.0")
+    hwmon_dir = os.path.join(device_dir, "hwmon", f"dev{index}")
+    os.makedirs(hwmon_dir)
+    os.symlink(device_dir, os.path.join(hwmon_dir, "device"))
+    with open(os.path.join(hwmon_dir, "name"), "w", encoding="utf-8") as f:
+        f.write(f"{driver}\n")
+    for i in range(1, inputs + 1):
+        # A value unique to the device and input, so a read shows which one a path points at.
+        with open(os.path.join(hwmon_dir, f"temp{i}_input"), "w", encoding="utf-8") as f:
+            f.write(f"{20000 + index * 1000 + i}\n")
+        if i % 4:  # some inputs have no label
+            with open(os.path.join(hwmon_dir, f"temp{i}_label"), "w", encoding="utf-8") as f:
+                f.write(f"Sensor {i}\n")
+        for attr in ("max", "crit", "alarm"):
+            with open(os.path.join(hwmon_dir, f"temp{i}_{attr}"), "w", encoding="utf-8") as f:
+                f.write("0\n")
+    return hwmon_dir
+
+
+def _link_hwmon(root: str, device_dirs: List[str], rng: random.Random) -> None:
+    class_dir = os.path.join(root, "class", "hwmon")
+    shutil.rmtree(class_dir, ignore_errors=True)
+    os.makedirs(class_dir)
+    order = list(device_dirs)
+    rng.shuffle(order)
+    for n, target in enumerate(order):
+        os.symlink(target, os.path.join(class_dir, f"hwmon{n}"))
+
+
+def _make_thermal(root: str, zones: int) -> None:
+    class_dir = os.path.join(root, "class", "thermal")
+    os.makedirs(class_dir)
+    for i in range(zones):
+        zone_dir = os.path.join(root, "devices", "virtual", "thermal", f"zone{i}")
+        os.makedirs(zone_dir)
+        with open(os.path.join(zone_dir, "type"), "w", encoding="utf-8") as f:
+            f.write("cpu-thermal\n" if i == 0 else f"soc{i}-thermal\n")
+        with open(os.path.join(zone_dir, "temp"), "w", encoding="utf-8") as f:
+            f.write(f"{90000 + i}\n")
+        os.symlink(zone_dir, os.path.join(class_dir, f"thermal_zone{i}"))
+    # Not a thermal zone.
+    os.makedirs(os.path.join(class_dir, "cooling_device0"))
+
+
+def _read(path: str) -> Optional[int]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _plan_readings(plane: ControlPlaneCache) -> Dict[str, Optional[int]]:
+    # What each sensor reads at the path the control loop would use.
+    return {s.name: _read(s.path) for s in plane.get().sensors}
+
+
+def _timed(fn, repeat: int) -> List[float]:
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000.0)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sensor discovery on a fake sysfs tree")
+    parser.add_argument("--devices", type=int, default=64, help="hwmon devices")
+    parser.add_argument("--inputs", type=int, default=8, help="temperature inputs per hwmon device")
+    parser.add_argument("--zones", type=int, default=4, help="thermal zones")
+    parser.add_argument("--max-scan-ms", type=float, default=100.0, help="fail if a full scan takes longer")
+    parser.add_argument("--max-rescan-ms", type=float, default=10.0, help="fail if an unchanged rescan takes longer")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="fan-sysfs-")
+    rng = random.Random(3)
+    device_dirs = [_make_device(root, i, args.inputs) for i in range(args.devices)]
+    _link_hwmon(root, device_dirs, rng)
+    _make_thermal(root, args.zones)
+    thermal_root, hwmon_root = os.path.join(root, "class", "thermal"), os.path.join(root, "class", "hwmon")
+    expected = args.devices * args.inputs + args.zones
+
+    full = _timed(lambda: SensorScanner(thermal_root, hwmon_root).scan(), 20)
+    scanner = SensorScanner(thermal_root, hwmon_root)
+    first = {s.key: s for s in scanner.scan()}
+    rescan = _timed(scanner.scan, 50)
+    unchanged_stats = scanner.stats()
+    identity: Dict[str, str] = {k: os.path.realpath(s.path) for k, s in first.items()}
+
+    # Reboot: same devices, other hwmonN numbers.
+    _link_hwmon(root, device_dirs, rng)
+    renumbered = {s.key: s for s in scanner.scan()}
+    moved = sum(1 for k, s in renumbered.items() if k in first and s.path != first[k].path)
+    same_identity = set(first) == set(renumbered) and all(
+        os.path.realpath(s.path) == identity[k] for k, s in renumbered.items())
+
+    # Hotplug: one more device.
+    new_dir = _make_device(root, args.devices, args.inputs)
+    os.symlink(new_dir, os.path.join(hwmon_root, f"hwmon{args.devices}"))
+    scanner.scan()
+    hotplug_stats = scanner.stats()
+
+    data_dir = tempfile.mkdtemp(prefix="fan-discovery-")
+    db = Database(data_dir)
+    db.init()
+    registry = SensorRegistryService(db=db, scanner=scanner)
+    t0 = time.perf_counter()
+    created = registry.register_discovered()
+    register_ms = (time.perf_counter() - t0) * 1000.0
+    again = registry.register_discovered()
+    registered = len(db.sensors.list())
+
+    # Reboot after registration: the stored paths now point at other devices, the keys do not.
+    plane = ControlPlaneCache(db=db, curve_engine=CurveEngine(), scanner=scanner)
+    before_reboot = _plan_readings(plane)
+    stored_paths = {s["name"]: s["path"] for s in db.sensors.list()}
+    _link_hwmon(root, device_dirs + [new_dir], rng)
+    plane.invalidate()
+    after_reboot = _plan_readings(plane)
+    wrong_stored = sum(1 for name, path in stored_paths.items() if _read(path) != before_reboot[name])
+    wrong_plan = sum(1 for name, value in after_reboot.items() if value != before_reboot[name])
+    plane.close()
+    db.close()
+
+    print(f"tree: {args.devices} hwmon devices x {args.inputs} inputs + {args.zones} thermal zones = {expected} sensors")
+    print(f"full scan     : median={statistics.median(full):7.2f}ms max={max(full):7.2f}ms")
+    print(f"rescan        : median={statistics.median(rescan):7.2f}ms max={max(rescan):7.2f}ms "
+          f"(parsed={unchanged_stats['devices_parsed']} reused={unchanged_stats['devices_reused']})")
+    print(f"renumbered    : {moved} paths moved, keys {'stable' if same_identity else 'CHANGED'}")
+    print(f"hotplug       : parsed={hotplug_stats['devices_parsed']} reused={hotplug_stats['devices_reused']}")
+    print(f"register      : {len(created)} sensors in {register_ms:.1f}ms, second call created {len(again)}")
+    print(f"reboot        : {wrong_stored} stored paths now read another device, control plane reads "
+          f"{wrong_plan} wrong")
+    print("sample keys   : " + ", ".join(sorted(first)[:4]))
+
+    checks = {
+        "all inputs found": len(first) == expected,
+        "full scan time": statistics.median(full) <= args.max_scan_ms,
+        "rescan reuses every device": unchanged_stats["devices_parsed"] == 0,
+        "rescan time": statistics.median(rescan) <= args.max_rescan_ms,
+        "keys stable across renumbering": same_identity and moved > 0,
+        "hotplug parses only the new device": hotplug_stats["devices_parsed"] == 1,
+        "register all once": len(created) == expected + args.inputs and not again and registered == len(created),
+        "registered sensors read their own device after renumbering": (
+            wrong_stored > 0 and wrong_plan == 0 and None not in after_reboot.values()),
+    }
+    shutil.rmtree(root, ignore_errors=True)
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
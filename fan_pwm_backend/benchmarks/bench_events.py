@@ -0,0 +1,127 @@
+# benchmarks/bench_events.py
+#
+# Event log retention under a long-running flood of events. Inserts millions of events spread over a year,
+# runs one retention pass and reports the database size before/after, how long each pruning step held the
+# writer and the write latency a concurrent event sink saw meanwhile. Also checks that a flapping event is
+# rolled up into one row per window. Exits non-zero if a check fails. Run from fan_pwm_backend/:
+#
+#   python -m benchmarks.bench_events --events 2000000 --max-rows 100000
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import List
+
+from app.core.time_utils import now_ts
+from app.database.database import Database
+from app.services.event_retention import EventRetention
+
+_YEAR_S = 365 * 86400.0
+
+
+def _file_size(db_path: str) -> int:
+    return sum(os.path.getsize(p) for p in (db_path, db_path + "-wal") if os.path.exists(p))
+
+
+def _fill(db: Database, events: int, batch: int) -> float:
+    # One sensor_read_failed per second over the last year, with a few distinct contexts.
+    start = now_ts() - _YEAR_S
+    step = _YEAR_S / events
+    t0 = time.perf_counter()
+    for first in range(0, events, batch):
+        rows = [("ERROR", "sensor_read_failed", f"{i % 4}:/sys/class/hwmon/hwmon{i % 4}/temp1_input:EIO",
+                 start + i * step) for i in range(first, min(events, first + batch))]
+        db.events.create_many(rows)
+    return time.perf_counter() - t0
+
+
+def _concurrent_writes(db: Database, stop: threading.Event, latencies: List[float]) -> None:
+    # What the event sink does while retention runs: small batches every 10ms.
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        db.events.create_many([("INFO", "bench_tick", None, now_ts())])
+        latencies.append(time.perf_counter() - t0)
+        stop.wait(0.01)
+
+
+def _ms(samples: List[float], q: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(len(s) * q))] * 1000.0 if s else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event retention: bounded file size and pruning latency")
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--max-rows", type=int, default=100_000)
+    parser.add_argument("--max-age-days", type=float, default=30.0)
+    parser.add_argument("--batch-size", type=int, default=500)
+    # The tick never takes the writer (events go through the sink), so a step only has to stay well below the
+    # sink's flush interval. Merging the full-text index after the initial catch-up is the slowest step.
+    parser.add_argument("--max-step-ms", type=float, default=500.0, help="fail if one pruning step holds the writer longer")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="fan-bench-")
+    db = Database(data_dir)
+    db.init()
+    db.settings.update_from_payload({
+        "events_max_rows": args.max_rows,
+        "events_max_age_days": args.max_age_days,
+        "events_rollup_window_s": 60,
+    })
+    db_path = os.path.join(data_dir, "app.db")
+
+    fill_s = _fill(db, args.events, batch=10_000)
+    db.events.checkpoint()
+    size_full = _file_size(db_path)
+    rows_full = db.events.count()
+
+    retention = EventRetention(db.events, db.settings, batch_size=args.batch_size)
+    stop = threading.Event()
+    latencies: List[float] = []
+    writer = threading.Thread(target=_concurrent_writes, args=(db, stop, latencies))
+    writer.start()
+    t0 = time.perf_counter()
+    deleted = retention.run_once()
+    prune_s = time.perf_counter() - t0
+    stop.set()
+    writer.join()
+    size_pruned = _file_size(db_path)
+    rows_pruned = db.events.count()
+
+    # Rollup: one failing sensor per second for an hour is 60 rows with a 60s window, not 3600.
+    before = db.events.count()
+    base = now_ts()
+    for minute in range(60):
+        db.events.create_many([("ERROR", "sensor_read_failed", "9:flapping", base + minute * 60 + s) for s in range(60)],
+                              rollup_window_s=60)
+    rolled_rows = db.events.count() - before
+    db.close()
+
+    row_bytes = size_full / max(1, rows_full)
+    size_bound = max(args.max_rows, rows_pruned) * row_bytes * 2 + 1_000_000
+    checks = {
+        "rows bounded": rows_pruned <= args.max_rows + len(latencies),
+        "file shrank to bound": size_pruned <= size_bound,
+        "short pruning steps": retention.max_batch_ms <= args.max_step_ms,
+        "rollup": rolled_rows == 60,
+    }
+
+    print(f"events={args.events} max_rows={args.max_rows} max_age_days={args.max_age_days} batch={args.batch_size}")
+    print(f"fill        : {fill_s:8.1f}s ({args.events / fill_s:,.0f} events/s) rows={rows_full} size={size_full / 1e6:8.1f}MB")
+    print(f"retention   : {prune_s:8.1f}s deleted={deleted} rows={rows_pruned} size={size_pruned / 1e6:8.1f}MB"
+          f" (bound {size_bound / 1e6:.1f}MB)")
+    print(f"pruning step: max={retention.max_batch_ms:8.2f}ms vacuumed_pages={retention.vacuumed_pages}")
+    if latencies:
+        print(f"sink writes : n={len(latencies)} mean={statistics.fmean(latencies) * 1000:6.2f}ms "
+              f"p99={_ms(latencies, 0.99):6.2f}ms max={max(latencies) * 1000:6.2f}ms")
+    print(f"rollup      : 3600 events -> {rolled_rows} rows")
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
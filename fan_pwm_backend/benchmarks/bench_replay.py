@@ -0,0 +1,173 @@
+# benchmarks/bench_replay.py
+#
+# Trace replay: equivalence with the live control loop and speed. For several filter/safety configurations the
+# control loop runs on simulated hardware and a virtual clock (two fans, three sensors, some failed reads)
+# while every raw reading and every written duty is recorded; the recorded readings are then replayed with
+# TraceReplay and the duty series and kickstart counts must match exactly. Finally a day of 1 Hz samples is
+# replayed and timed. Exits non-zero if a check fails. Run from fan_pwm_backend/:
+#
+#   python -m benchmarks.bench_replay --ticks 20000
+#   python -m benchmarks.bench_replay --no-numpy      # the pure Python fallback
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from app.core.clock import VirtualClock
+from app.core.config import AppConfig
+from app.database.database import Database
+from app.hardware.sensors.sensor_reader_base import SensorReaderBase
+from app.services import curve_engine, temperature_filters, trace_replay
+from app.services.control_loop_service import ControlLoopService
+from app.services.sensor_sampler import PathReading
+from app.services.trace_replay import TraceReplay
+
+_VARIANTS = {
+    "mean": {"smoothing_filter": "mean", "smoothing_window_s": 15, "hysteresis_c": 1.0},
+    "ema": {"smoothing_filter": "ema", "smoothing_window_s": 10, "hysteresis_c": 0.5},
+    "median+spike": {"smoothing_filter": "median", "smoothing_window_s": 15, "spike_threshold_c": 1.5},
+    "raw+hard-limit": {"smoothing_window_s": 0, "hysteresis_c": 0, "hard_limit_c": 39, "hard_limit_margin_c": 2},
+    # Kickstart window (300ms) longer than the loop interval.
+    "fast-loop": {"loop_interval_s": 0.2, "smoothing_window_s": 5, "hysteresis_c": 0.3},
+}
+
+
+class _FlakyReader(SensorReaderBase):
+    # Fails a share of reads, so the replay also sees failed reads and fail-safe ticks (all sensors failed).
+    def __init__(self, inner: SensorReaderBase, failure_rate: float) -> None:
+        self._inner = inner
+        self._failure_rate = failure_rate
+        self._rng = random.Random(7)
+
+    def read_celsius(self, path: str) -> float:
+        if self._rng.random() < self._failure_rate:
+            raise OSError("EIO")
+        return self._inner.read_celsius(path)
+
+
+class _RecordingControlLoop(ControlLoopService):
+    def __init__(self, db: Database, config: AppConfig, clock: VirtualClock, failure_rate: float) -> None:
+        super().__init__(db=db, config=config, clock=clock)
+        for sensor_type, reader in self._readers.items():
+            self._sampler._readers[sensor_type] = _FlakyReader(reader, failure_rate)
+        self.ts: List[float] = []
+        self.readings: Dict[int, List[Optional[float]]] = {}
+        self.duty: List[List[Optional[int]]] = []
+
+    def _filter_reading(self, sensor_id: int, sensor_path: str, reading: PathReading, now: float) -> Optional[float]:
+        if not self.ts or self.ts[-1] != now:
+            self.ts.append(now)
+        self.readings.setdefault(sensor_id, []).append(reading.value_c)
+        return super()._filter_reading(sensor_id, sensor_path, reading, now)
+
+    def _publish(self, temps_c: Dict[str, float], targets: List[int], applied: List[Optional[int]],
+                 reason: Optional[str]) -> None:
+        super()._publish(temps_c, targets, applied, reason)
+        self.duty.append(list(applied))
+
+
+def _check_variant(name: str, overrides: Dict, ticks: int) -> bool:
+    data_dir = tempfile.mkdtemp(prefix="fan-replay-")
+    db = Database(data_dir)
+    db.init()
+    db.settings.update_from_payload({"sensor_timeout_ms": 0, **overrides})
+    settings = db.settings.get_model()
+    db.fans.create(name="main", pwm_chip="pwmchip0", pwm_channel=0)
+    aux = db.fans.create(name="aux", pwm_chip="pwmchip0", pwm_channel=1)
+    config = AppConfig(data_dir=data_dir, log_level="WARNING", pwm_pin_physical=33, pwm_chip="pwmchip0",
+                       pwm_channel=0, pwm_frequency_hz=25000, hardware_backend="simulated", simulation_sensors=3)
+
+    clock = VirtualClock()
+    loop = _RecordingControlLoop(db=db, config=config, clock=clock, failure_rate=0.15)
+    loop._ensure_seeded()
+    # A second curve on zone1 drives the aux fan.
+    zone1 = next(s for s in db.sensors.list() if s["name"] == "zone1")
+    curve = db.curves.create(sensor_id=int(zone1["id"]), name="aux", fan_id=int(aux["id"]))
+    db.curves.activate(int(curve["id"]))
+    db.curve_points.replace_all(curve_id=int(curve["id"]), points=[(30.0, 0), (36.0, 35), (45.0, 100)])
+
+    clock.call_later(ticks * settings.loop_interval_s - settings.loop_interval_s / 2, loop.stop)
+    asyncio.run(loop.run())
+    kickstarts = {fan.plan.name: fan.pwm.kickstart_stats()["count"] for fan in loop._fans}
+    plan = loop._control_plane.get()
+    db.close()
+
+    names = {s.id: s.name for s in plan.sensors}
+    t0 = time.perf_counter()
+    result = TraceReplay(plan).run(loop.ts, {names[i]: values for i, values in loop.readings.items()})
+    replay_s = time.perf_counter() - t0
+
+    live = {fan.name: [row[i] for row in loop.duty] for i, fan in enumerate(plan.fans)}
+    same_duty = live == result.duty
+    same_kickstarts = kickstarts == {k: v["kickstarts"] for k, v in result.stats["fans"].items()}
+    stats = result.stats
+    print(f"{name:15s}: ticks={len(loop.ts)} replay={replay_s * 1000:7.1f}ms fail_safe={stats['fail_safe_ticks']} "
+          f"hard_limit={stats['hard_limit_ticks']} "
+          + " ".join(f"{k}[changes={v['duty_changes']} kick={v['kickstarts']}/{kickstarts[k]}]"
+                     for k, v in stats["fans"].items())
+          + f" -> {'identical' if same_duty and same_kickstarts else 'DIFFERENT'}")
+    if not same_duty:
+        for fan_name, series in live.items():
+            diff = next((i for i, (a, b) in enumerate(zip(series, result.duty[fan_name])) if a != b), None)
+            if diff is not None:
+                print(f"  {fan_name}: first difference at tick {diff}: live={series[diff]} replay={result.duty[fan_name][diff]}")
+    return same_duty and same_kickstarts
+
+
+def _time_day(max_s: float) -> bool:
+    data_dir = tempfile.mkdtemp(prefix="fan-replay-")
+    db = Database(data_dir)
+    db.init()
+    config = AppConfig(data_dir=data_dir, log_level="WARNING", pwm_pin_physical=33, pwm_chip="pwmchip0",
+                       pwm_channel=0, pwm_frequency_hz=25000, hardware_backend="simulated", simulation_sensors=1)
+    loop = ControlLoopService(db=db, config=config, clock=VirtualClock())
+    loop._ensure_seeded()
+
+    rng = random.Random(1)
+    temp = 45.0
+    values: List[Optional[float]] = []
+    for _ in range(86400):
+        temp = min(85.0, max(30.0, temp + rng.gauss(0.0, 0.3)))
+        values.append(round(temp + rng.gauss(0.0, 0.2), 3))
+    ts = [float(i) for i in range(86400)]
+
+    ok = True
+    for smoothing in ("mean", "ema", "median"):
+        replay = TraceReplay(loop._control_plane.preview(settings={"smoothing_filter": smoothing}))
+        t0 = time.perf_counter()
+        result = replay.run(ts, {"cpu": values})
+        elapsed = time.perf_counter() - t0
+        ok = ok and elapsed <= max_s
+        print(f"day @ 1 Hz, {smoothing:6s}: {elapsed * 1000:7.1f}ms "
+              f"mean_duty={result.stats['fans']['default']['mean_duty_percent']:.1f}% "
+              f"above_threshold={result.stats['time_above_threshold_s']:g}s")
+    loop._control_plane.close()
+    db.close()
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Trace replay: identical to the live loop, and fast")
+    parser.add_argument("--ticks", type=int, default=20000, help="live ticks per configuration")
+    parser.add_argument("--max-day-s", type=float, default=None,
+                        help="fail if replaying a day of 1 Hz samples takes longer (default 0.5s, 1s without NumPy)")
+    parser.add_argument("--no-numpy", action="store_true", help="replay without NumPy (pure Python fallback)")
+    args = parser.parse_args()
+
+    if args.no_numpy:
+        curve_engine.np = temperature_filters.np = trace_replay.np = None
+    print(f"numpy={'no' if trace_replay.np is None else 'yes'}")
+
+    checks = {f"identical: {name}": _check_variant(name, overrides, args.ticks) for name, overrides in _VARIANTS.items()}
+    max_day_s = args.max_day_s if args.max_day_s is not None else (1.0 if trace_replay.np is None else 0.5)
+    checks["day of 1 Hz samples"] = _time_day(max_day_s)
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
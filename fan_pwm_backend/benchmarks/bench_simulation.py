@@ -0,0 +1,106 @@
+# benchmarks/bench_simulation.py
+#
+# Soak test of the control loop against the simulated hardware backend. The loop runs on a VirtualClock, so
+# days of 1s ticks pass in seconds: every tick reads the thermal model, runs filters, curves and safety and
+# writes the simulated fan, exactly as on the Pi. Reports control behaviour (temperatures, duty changes,
+# kickstarts, stalled fans) and real time per tick. Exits non-zero if a check fails. Run from fan_pwm_backend/:
+#
+#   python -m benchmarks.bench_simulation --days 3 --sensors 4
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from app.core.clock import VirtualClock
+from app.core.config import AppConfig
+from app.database.database import Database
+from app.services.control_loop_service import ControlLoopService
+
+
+class _SoakControlLoop(ControlLoopService):
+    # Records what every tick decided, in simulated time.
+    def __init__(self, db: Database, config: AppConfig, clock: VirtualClock) -> None:
+        super().__init__(db=db, config=config, clock=clock)
+        self.tick_ns: List[int] = []
+        self.max_temps: List[float] = []
+        self.duty_changes = 0
+        self.forced_ticks = 0
+        self._last_duty: Optional[int] = None
+
+    def _tick(self) -> None:
+        t0 = time.perf_counter_ns()
+        super()._tick()
+        self.tick_ns.append(time.perf_counter_ns() - t0)
+
+    def _publish(self, temps_c: Dict[str, float], targets: List[int], applied: List[Optional[int]],
+                 reason: Optional[str]) -> None:
+        super()._publish(temps_c, targets, applied, reason)
+        if temps_c:
+            self.max_temps.append(max(temps_c.values()))
+        duty = max((d for d in applied if d is not None), default=None)
+        if duty != self._last_duty:
+            self.duty_changes += 1
+            self._last_duty = duty
+        if reason:
+            self.forced_ticks += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Control loop soak test on simulated hardware and a virtual clock")
+    parser.add_argument("--days", type=float, default=1.0, help="simulated time to run")
+    parser.add_argument("--sensors", type=int, default=1)
+    parser.add_argument("--interval-s", type=float, default=1.0, help="loop_interval_s setting")
+    parser.add_argument("--min-ticks-per-s", type=float, default=1000.0, help="fail if the loop runs slower (real time)")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="fan-sim-")
+    db = Database(data_dir)
+    db.init()
+    db.settings.update_from_payload({"loop_interval_s": args.interval_s})
+    settings = db.settings.get_model()
+    config = AppConfig(data_dir=data_dir, log_level="WARNING", pwm_pin_physical=33, pwm_chip="pwmchip0",
+                       pwm_channel=0, pwm_frequency_hz=25000, hardware_backend="simulated",
+                       simulation_sensors=args.sensors)
+
+    clock = VirtualClock()
+    loop = _SoakControlLoop(db=db, config=config, clock=clock)
+    duration_s = args.days * 86400.0
+    clock.call_later(duration_s, loop.stop)
+
+    t0 = time.perf_counter()
+    asyncio.run(loop.run())
+    real_s = time.perf_counter() - t0
+    plant = loop._plant.stats()
+    kickstarts = sum(fan.pwm.kickstart_stats()["count"] for fan in loop._fans)
+    db.close()
+
+    ticks = len(loop.tick_ns)
+    expected = int(duration_s / args.interval_s)
+    tick_us = sorted(ns / 1000.0 for ns in loop.tick_ns)
+    above_s = sum(1 for t in loop.max_temps if t >= settings.hard_limit_c - settings.hard_limit_margin_c) * args.interval_s
+    checks = {
+        "all ticks ran": abs(ticks - expected) <= 1,
+        "below hard limit": bool(loop.max_temps) and max(loop.max_temps) < settings.hard_limit_c,
+        "no stalled fan": plant["stalled_fans"] == 0,
+        "ticks per second": ticks / real_s >= args.min_ticks_per_s,
+    }
+
+    print(f"simulated={args.days:g}d sensors={args.sensors} interval={args.interval_s:g}s")
+    print(f"run         : {real_s:8.1f}s real, {ticks} ticks ({ticks / real_s:,.0f} ticks/s, "
+          f"{duration_s / real_s:,.0f}x real time)")
+    print(f"tick        : mean={statistics.fmean(tick_us):8.1f}us p99={tick_us[int(len(tick_us) * 0.99)]:8.1f}us "
+          f"max={tick_us[-1]:8.1f}us")
+    print(f"temperature : min={min(loop.max_temps):6.1f}C mean={statistics.fmean(loop.max_temps):6.1f}C "
+          f"max={max(loop.max_temps):6.1f}C above hard-limit margin={above_s:g}s")
+    print(f"fan         : duty_changes={loop.duty_changes} kickstarts={kickstarts} forced_ticks={loop.forced_ticks} "
+          f"stall_writes={plant['stall_writes']}")
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/bench_status.py
+#
+# Cost of serving /status. Compares the previous path (copy the state under the RuntimeState lock, then
+# serialize it per request) with the published snapshot (one reference read; the bytes were serialized when
+# the loop published). Also runs reader threads against a publisher that updates the state like the control
+# loop does and reports how long the publisher's updates take while readers are active. Exits non-zero if a
+# check fails. Run from fan_pwm_backend/:
+#
+#   python -m benchmarks.bench_status --sensors 10 --readers 8
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+from app.services.runtime_state import RuntimeState
+
+
+def _legacy_snapshot() -> dict:
+    # RuntimeState.snapshot() before snapshots were published: copies under the lock on every call.
+    rs = RuntimeState
+    with rs._lock:
+        return {
+            "mode": rs._mode,
+            "current_duty_percent": rs._current_duty_percent,
+            "target_duty_percent": rs._target_duty_percent,
+            "override": {"duty_percent": rs._override_duty_percent, "until_ts": rs._override_until_ts},
+            "fans": {k: dict(v) for k, v in rs._fans.items()},
+            "temps_c": dict(rs._last_temps_c),
+            "stale_sensors": list(rs._stale_sensors),
+            "last_errors": list(rs._last_errors),
+            "stats": {k: dict(v) for k, v in rs._stats.items()},
+        }
+
+
+def _legacy_request() -> bytes:
+    return json.dumps(_legacy_snapshot(), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _published_request() -> bytes:
+    return RuntimeState.status().body
+
+
+def _update(tick: int, sensors: int) -> None:
+    # What the control loop sets per tick.
+    RuntimeState.set_temps({f"sensor{i}": 40.0 + (tick + i) % 20 * 0.1 for i in range(sensors)})
+    RuntimeState.set_stats("sensors", {"read_timeouts": 0})
+    RuntimeState.set_target_duty(30 + tick % 10)
+    RuntimeState.set_current_duty(30 + tick % 10)
+    RuntimeState.set_fans({f"fan{i}": {"target_duty_percent": 30, "current_duty_percent": 30} for i in range(2)})
+    RuntimeState.set_stats("pwm", {"writes_issued": tick, "writes_suppressed": tick // 2})
+    RuntimeState.set_stats("kickstart", {f"fan{i}": {"count": 1, "last_ts": 0.0} for i in range(2)})
+    RuntimeState.set_stats("events", {"written": tick, "dropped": 0, "failed": 0})
+    RuntimeState.set_stats("scheduler", {"ticks": tick, "missed": 0, "lateness_p99_ms": 0.4})
+
+
+def _per_call_ns(fn: Callable[[], bytes], calls: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter_ns()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.perf_counter_ns() - t0) / calls)
+    return best
+
+
+def _contended(read: Callable[[], bytes], publish: bool, readers: int, sensors: int, seconds: float) -> Dict[str, float]:
+    stop = threading.Event()
+    reads = [0] * readers
+
+    def reader(i: int) -> None:
+        n = 0
+        while not stop.is_set():
+            read()
+            n += 1
+        reads[i] = n
+
+    threads = [threading.Thread(target=reader, args=(i,), daemon=True) for i in range(readers)]
+    for t in threads:
+        t.start()
+    updates: List[float] = []
+    tick = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        t0 = time.perf_counter_ns()
+        _update(tick, sensors)
+        if publish:
+            RuntimeState.publish()
+        updates.append((time.perf_counter_ns() - t0) / 1000.0)
+        tick += 1
+        time.sleep(0.005)
+    stop.set()
+    for t in threads:
+        t.join()
+    updates.sort()
+    return {
+        "reads_per_s": sum(reads) / seconds,
+        "update_p50_us": statistics.median(updates),
+        "update_p99_us": updates[int(len(updates) * 0.99)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="/status: per-request copy + serialize vs published snapshot")
+    parser.add_argument("--sensors", type=int, default=10)
+    parser.add_argument("--readers", type=int, default=8, help="concurrent reader threads")
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of each contended run")
+    parser.add_argument("--min-speedup", type=float, default=10.0, help="per request, published vs previous")
+    args = parser.parse_args()
+
+    _update(0, args.sensors)
+    for i in range(50):
+        RuntimeState.add_error("pwm_write_failed", {"fan": "fan0", "error": f"EIO {i}"})
+    RuntimeState.publish()
+
+    same_body = _published_request() == _legacy_request()
+    legacy_ns = _per_call_ns(_legacy_request, 2000)
+    published_ns = _per_call_ns(_published_request, 200000)
+    speedup = legacy_ns / published_ns
+
+    print(f"sensors={args.sensors} body={len(_published_request())} bytes")
+    print(f"per request : previous={legacy_ns / 1000:8.2f}us published={published_ns:8.1f}ns ({speedup:,.0f}x)")
+    for name, read, publish in (("previous", _legacy_request, False), ("published", _published_request, True)):
+        r = _contended(read, publish, args.readers, args.sensors, args.seconds)
+        print(f"{name:9s} with {args.readers} readers: {r['reads_per_s']:12,.0f} reads/s, "
+              f"publisher update p50={r['update_p50_us']:7.1f}us p99={r['update_p99_us']:7.1f}us")
+
+    checks = {
+        "same body": same_body,
+        f"at least {args.min_speedup:g}x faster per request": speedup >= args.min_speedup,
+    }
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
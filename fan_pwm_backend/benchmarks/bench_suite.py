@@ -0,0 +1,477 @@
+# benchmarks/bench_suite.py
+#
+# Micro-benchmarks for the control pipeline: curve evaluation, temperature filters, sysfs sensor readers and
+# the PWM writer (against a fake sysfs tree on tmpfs), the hot calls of every database schema and a full
+# control loop tick with 1, 10 and 100 sensors. Runs offline. Results are written as JSON and can be compared
+# against a stored baseline; the run exits non-zero if any benchmark got slower than the threshold allows.
+# benchmarks/baseline.json has to be re-recorded (--save-baseline) in every change to benchmarked code, so
+# that the gate passes against the tree it was recorded on. Run from fan_pwm_backend/:
+#
+#   python -m benchmarks.bench_suite --compare benchmarks/baseline.json
+#   python -m benchmarks.bench_suite --filter tick --output /tmp/bench.json
+#   python -m benchmarks.bench_suite --save-baseline        # after an intended performance change
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import AppConfig
+from app.core.time_utils import now_ts
+from app.database.database import Database
+from app.hardware.pwm.sysfs_pwm_writer import SysfsPwmWriter
+from app.hardware.sensors.hwmon_reader import HwmonReader
+from app.hardware.sensors.thermal_zone_reader import ThermalZoneReader
+from app.services.control_loop_service import ControlLoopService
+from app.services.control_plane_cache import FanPlan
+from app.services.curve_engine import CompiledCurve, CurveEngine
+from app.services.pwm_service import PwmService
+from app.services.temperature_filters import FILTER_TYPES, FilterConfig, SensorFilterBank
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# A setup returns the function to time and how many operations one call of it performs.
+Setup = Callable[[ExitStack], Tuple[Callable[[], Any], int]]
+
+_BENCHMARKS: List[Tuple[str, Setup]] = []
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        _BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Fixtures
+
+
+def _fake_sysfs(stack: ExitStack, sensors: int = 1) -> str:
+    # thermal/thermal_zoneN/temp, hwmon/hwmon0/tempN_input and pwm/pwmchip0/pwm0 in tmpfs when available, so
+    # reads cost what a sysfs attribute costs rather than what the disk does.
+    parent = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+    root = tempfile.mkdtemp(prefix="fan-bench-sysfs-", dir=parent)
+    stack.callback(shutil.rmtree, root, True)
+    for i in range(sensors):
+        _write(os.path.join(root, "thermal", f"thermal_zone{i}", "temp"), f"{45000 + i * 100}\n")
+        _write(os.path.join(root, "hwmon", "hwmon0", f"temp{i + 1}_input"), f"{45000 + i * 100}\n")
+    pwm = os.path.join(root, "pwm", "pwmchip0")
+    _write(os.path.join(pwm, "export"), "")
+    for name, value in (("period", "40000\n"), ("duty_cycle", "0\n"), ("enable", "0\n")):
+        _write(os.path.join(pwm, "pwm0", name), value)
+    return root
+
+
+def _write(path: str, value: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(value)
+
+
+def _database(stack: ExitStack) -> Database:
+    data_dir = tempfile.mkdtemp(prefix="fan-bench-db-")
+    stack.callback(shutil.rmtree, data_dir, True)
+    db = Database(data_dir)
+    db.init()
+    stack.callback(db.close)
+    return db
+
+
+def _curve_points(n: int) -> List[Tuple[float, int]]:
+    return [(20.0 + 60.0 * i / (n - 1), round(100 * i / (n - 1))) for i in range(n)]
+
+
+# Temperatures swept by curve benchmarks: below, inside and above the curve, and exactly on points.
+_SWEEP = [15.0 + 0.37 * i for i in range(256)]
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Curves
+
+
+def _register_curves() -> None:
+    for n in (2, 8, 32, 128):
+        def setup(stack: ExitStack, n: int = n) -> Tuple[Callable[[], Any], int]:
+            evaluate = CompiledCurve(_curve_points(n)).evaluate
+
+            def run() -> None:
+                for t in _SWEEP:
+                    evaluate(t)
+            return run, len(_SWEEP)
+        benchmark(f"curve.evaluate[points={n}]")(setup)
+
+    def engine(stack: ExitStack) -> Tuple[Callable[[], Any], int]:
+        # CurveEngine.evaluate compiles on every call (API preview path).
+        engine, points = CurveEngine(), _curve_points(8)
+        return (lambda: engine.evaluate(points, 47.3)), 1
+    benchmark("curve.engine_evaluate[points=8]")(engine)
+
+
+_register_curves()
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Temperature filters: 1 Hz samples with noise, 15s window, 1C hysteresis, 2C spike rejection
+
+
+def _register_filters() -> None:
+    rng = random.Random(42)
+    samples = [50.0 + 5.0 * ((i // 120) % 2) + rng.gauss(0.0, 0.4) for i in range(1000)]
+
+    for kind in FILTER_TYPES:
+        def setup(stack: ExitStack, kind: str = kind) -> Tuple[Callable[[], Any], int]:
+            bank = SensorFilterBank()
+            bank.configure(FilterConfig(smoothing_filter=kind, smoothing_window_s=15.0, hysteresis_c=1.0,
+                                        spike_threshold_c=2.0))
+            clock = [0.0]
+
+            def run() -> None:
+                ts = clock[0]
+                for i, v in enumerate(samples):
+                    bank.push(1, ts + i, v)
+                clock[0] = ts + len(samples)
+            return run, len(samples)
+        benchmark(f"filters.push[{kind},window=15s]")(setup)
+
+
+_register_filters()
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Hardware access against the fake sysfs tree
+
+
+@benchmark("readers.thermal_zone.read_celsius")
+def _thermal_read(stack: ExitStack) -> Tuple[Callable[[], Any], int]:
+    path = os.path.join(_fake_sysfs(stack), "thermal", "thermal_zone0", "temp")
+    reader = ThermalZoneReader()
+    stack.callback(reader.close)
+    return (lambda: reader.read_celsius(path)), 1
+
+
+@benchmark("readers.hwmon.read_celsius")
+def _hwmon_read(stack: ExitStack) -> Tuple[Callable[[], Any], int]:
+    path = os.path.join(_fake_sysfs(stack), "hwmon", "hwmon0", "temp1_input")
+    reader = HwmonReader()
+    stack.callback(reader.close)
+    return (lambda: reader.read_celsius(path)), 1
+
+
+@benchmark("pwm.set_duty_percent[changing]")
+def _pwm_changing(stack: ExitStack) -> Tuple[Callable[[], Any], int]:
+    writer = SysfsPwmWriter("pwmchip0", 0, sysfs_root=os.path.join(_fake_sysfs(stack), "pwm"))
+    stack.callback(writer.disable)
+    duties = list(range(0, 101, 5))
+
+    def run() -> None:
+        for d in duties:
+            writer.set_duty_percent(d)
+    return run, len(duties)
+
+
+@benchmark("pwm.set_duty_percent[unchanged]")
+def _pwm_unchanged(stack: ExitStack) -> Tuple[Callable[[], Any], int]:
+    writer = SysfsPwmWriter("pwmchip0", 0, sysfs_root=os.path.join(_fake_sysfs(stack), "pwm"))
+    stack.callback(writer.disable)
+    writer.set_duty_percent(40)
+    return (lambda: writer.set_duty_percent(40)), 1
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Database schemas: the calls made per tick, per control-plane rebuild or per API request
+
+
+def _seeded_database(stack: ExitStack, sensors: int = 10) -> Database:
+    root = _fake_sysfs(stack, sensors=sensors)
+    db = _database(stack)
+    fan = db.fans.create(name="default", pwm_chip="pwmchip0", pwm_channel=0)
+    for i in range(sensors):
+        s = db.sensors.create(name=f"sensor{i}", sensor_type="thermal_zone",
+                              path=os.path.join(root, "thermal", f"thermal_zone{i}", "temp"))
+        c = db.curves.create(sensor_id=s["id"], name="default", fan_id=fan["id"])
+        db.curves.activate(c["id"])
+        db.curve_points.replace_all(c["id"], _curve_points(8))
+    now = now_ts()
+    db.events.create_many([("ERROR", "sensor_read_failed", f"{i % 10}:/fake:EIO", now - 10_000 + i) for i in range(10_000)])
+    return db
+
+
+def _register_database() -> None:
+    calls: Dict[str, Callable[[Database], Any]] = {
+        "sensors.list": lambda db: db.sensors.list(),
+        "fans.list": lambda db: db.fans.list(),
+        "curves.list_active": lambda db: db.curves.list_active(),
+        "curve_points.list_for_active_curves": lambda db: db.curve_points.list_for_active_curves(),
+        "settings.get_model[cached]": lambda db: db.settings.get_model(),
+        "settings.get_all": lambda db: db.settings.get_all(),
+        "events.query[page=100]": lambda db: db.events.query(limit=100),
+        "events.query[level,search]": lambda db: db.events.query(limit=100, level="ERROR", search="fake"),
+    }
+    for name, call in calls.items():
+        def setup(stack: ExitStack, call: Callable[[Database], Any] = call) -> Tuple[Callable[[], Any], int]:
+            db = _seeded_database(stack)
+            return (lambda: call(db)), 1
+        benchmark(f"db.{name}")(setup)
+
+    @benchmark("db.events.create_many[100]")
+    def _create_many(stack: ExitStack) -> Tuple[Callable[[], Any], int]:
+        db = _database(stack)
+        batch = [("ERROR", "sensor_read_failed", f"{i}:/fake:EIO", now_ts()) for i in range(100)]
+        return (lambda: db.events.create_many(batch)), 100
+
+    @benchmark("db.settings.set")
+    def _settings_set(stack: ExitStack) -> Tuple[Callable[[], Any], int]:
+        db = _database(stack)
+        return (lambda: db.settings.set("bench", "1")), 1
+
+
+_register_database()
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Full control loop tick
+
+
+class _BenchControlLoop(ControlLoopService):
+    # Drives the fake PWM chip instead of /sys/class/pwm.
+    def __init__(self, db: Database, config: AppConfig, pwm_root: str) -> None:
+        super().__init__(db=db, config=config)
+        self._pwm_root = pwm_root
+
+    def _make_pwm(self, plan: FanPlan) -> PwmService:
+        writer = SysfsPwmWriter(plan.pwm_chip, plan.pwm_channel, sysfs_root=self._pwm_root)
+        return PwmService(pwm_chip=plan.pwm_chip, pwm_channel=plan.pwm_channel, writer=writer)
+
+
+def _register_ticks() -> None:
+    for n in (1, 10, 100):
+        def setup(stack: ExitStack, n: int = n) -> Tuple[Callable[[], Any], int]:
+            root = _fake_sysfs(stack, sensors=n)
+            db = _database(stack)
+            for i in range(n):
+                db.sensors.create(name=f"sensor{i}", sensor_type="thermal_zone",
+                                  path=os.path.join(root, "thermal", f"thermal_zone{i}", "temp"))
+            config = AppConfig(data_dir=db._data_dir, log_level="WARNING", pwm_pin_physical=33, pwm_chip="pwmchip0",
+                               pwm_channel=0, pwm_frequency_hz=25000)
+            loop = _BenchControlLoop(db=db, config=config, pwm_root=os.path.join(root, "pwm"))
+            loop._ensure_seeded()
+            loop._control_plane.invalidate()
+            stack.callback(loop._sampler.close)
+            stack.callback(loop._control_plane.close)
+            loop._tick()
+            return loop._tick, 1
+        benchmark(f"tick[sensors={n}]")(setup)
+
+
+_register_ticks()
+
+
+# ---------------------------------------------------------------------------------------------------------------
+# Harness
+
+
+def _time_calls(fn: Callable[[], Any], calls: int) -> int:
+    t0 = time.perf_counter_ns()
+    for _ in range(calls):
+        fn()
+    return time.perf_counter_ns() - t0
+
+
+def _calibration_loop() -> None:
+    # Fixed pure-Python work (integer and float arithmetic, dict and list operations) that no change to the
+    # repository affects. Its time tells how fast the machine is right now.
+    d: Dict[int, float] = {}
+    acc = 0.0
+    for i in range(2000):
+        acc += (i * 7 % 13) * 0.5
+        d[i & 255] = acc
+    sorted(d.values())
+
+
+def _calls_for(fn: Callable[[], Any], min_run_s: float) -> int:
+    # Like timeit: the call count that makes one run take at least min_run_s.
+    calls = 1
+    while True:
+        elapsed = _time_calls(fn, calls)
+        if elapsed >= min_run_s * 1e9 or calls >= 1 << 20:
+            return calls
+        calls = max(calls * 2, int(calls * min_run_s * 1e9 / max(elapsed, 1) * 1.2))
+
+
+def _timed_runs(fn: Callable[[], Any], calls: int, ops_per_call: int, repeat: int) -> List[float]:
+    # ns per operation of `repeat` runs, with GC disabled while timing.
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [_time_calls(fn, calls) / (calls * ops_per_call) for _ in range(repeat)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _run_process(name_filter: Optional[str], repeat: int, min_run_s: float) -> Dict[str, Any]:
+    # One worker process: sets every benchmark up, then times it `repeat` times, with the calibration loop
+    # timed between benchmarks so both see the same machine conditions.
+    selected = [(name, setup) for name, setup in _BENCHMARKS if not name_filter or name_filter in name]
+    calibration_calls = _calls_for(_calibration_loop, min_run_s)
+    calibration: List[float] = []
+    results: Dict[str, Any] = {}
+    with ExitStack() as stack:
+        for name, setup in selected:
+            fn, ops = setup(stack)
+            calls = _calls_for(fn, min_run_s)
+            calibration += _timed_runs(_calibration_loop, calibration_calls, 1, 1)
+            results[name] = {"runs": _timed_runs(fn, calls, ops, repeat), "calls": calls, "ops_per_call": ops}
+    return {"calibration_ns": min(calibration), "results": results}
+
+
+def run(name_filter: Optional[str], repeat: int, rounds: int, min_run_s: float) -> Dict[str, Any]:
+    # Timings on a small board differ by up to ~1.5x from one process to the next (memory layout, other
+    # load), far more than between runs inside one process. So every round runs in a fresh worker process
+    # and a benchmark's result is its best run over all of them. The calibration loop is timed in every
+    # worker; rel_to_calibration is the best run divided by the calibration of the same worker.
+    processes: List[Dict[str, Any]] = []
+    for r in range(rounds):
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            out = f.name
+        try:
+            cmd = [sys.executable, "-m", "benchmarks.bench_suite", "--worker", "--output", out,
+                   "--repeat", str(repeat), "--min-run-s", str(min_run_s)]
+            if name_filter:
+                cmd += ["--filter", name_filter]
+            subprocess.run(cmd, check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            with open(out, "r", encoding="utf-8") as f:
+                processes.append(json.load(f))
+        finally:
+            os.unlink(out)
+        print(f"round {r + 1}/{rounds} done", flush=True)
+
+    results: Dict[str, Any] = {}
+    for name, first in processes[0]["results"].items():
+        best = [min(p["results"][name]["runs"]) for p in processes]
+        rel = [b / p["calibration_ns"] for b, p in zip(best, processes)]
+        samples = [x for p in processes for x in p["results"][name]["runs"]]
+        results[name] = {
+            "ns_per_op": round(statistics.median(samples), 1),
+            "min_ns_per_op": round(min(best), 1),
+            "rel_to_calibration": round(min(rel), 6),
+            "spread": round(max(rel) / min(rel), 2),
+            "calls": first["calls"],
+            "ops_per_call": first["ops_per_call"],
+            "runs": len(samples),
+        }
+        print(f"{name:48s} {_fmt_ns(results[name]['min_ns_per_op']):>12s}/op  "
+              f"spread over rounds {results[name]['spread']:.2f}x")
+    return {
+        "machine": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "created_at": now_ts(),
+        "calibration_ns": round(min(p["calibration_ns"] for p in processes), 1),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float, normalize: bool = True) -> List[str]:
+    # Returns the names of benchmarks that got slower than baseline * (1 + threshold). Compares the best run
+    # over all rounds, which is much less sensitive to other load on the machine than the median. With
+    # normalize, every benchmark is compared relative to the calibration loop timed in the same worker, so a
+    # machine that is uniformly faster or slower (CPU governor, thermal throttling, another board) does not
+    # show up as a regression.
+    if baseline.get("machine") != current.get("machine"):
+        print("note: baseline was recorded on a different machine/interpreter")
+    base_results = baseline.get("results", {})
+    key = "min_ns_per_op"
+    if normalize:
+        if all("rel_to_calibration" in r for r in base_results.values()):
+            key = "rel_to_calibration"
+            print(f"machine speed vs baseline: {current['calibration_ns'] / baseline['calibration_ns']:.2f}x "
+                  f"(calibration loop; ratios below are relative to it)")
+        else:
+            print("note: baseline has no calibration, comparing raw times (re-record it with --save-baseline)")
+
+    regressions: List[str] = []
+    print(f"\n{'benchmark (best run per op)':48s} {'baseline':>12s} {'current':>12s} {'ratio':>7s}")
+    for name, result in current["results"].items():
+        base = base_results.get(name)
+        if base is None or base[key] <= 0:
+            print(f"{name:48s} {'-':>12s} {_fmt_ns(result['min_ns_per_op']):>12s}     new")
+            continue
+        ratio = result[key] / base[key]
+        flag = ""
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:48s} {_fmt_ns(base['min_ns_per_op']):>12s} "
+              f"{_fmt_ns(result['min_ns_per_op']):>12s} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def _fmt_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f}ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f}us"
+    return f"{ns:.0f}ns"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Control pipeline micro-benchmarks")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark and round")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds, each in a fresh worker process")
+    parser.add_argument("--min-run-s", type=float, default=0.1, help="minimum duration of one timed run")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, default=None,
+                        help=f"baseline JSON to compare against (default {BASELINE_PATH})")
+    # Even with the best of 5 worker processes, an unchanged tree measures up to ~1.5x slower than its own
+    # baseline on a single-core board, so anything below that is noise rather than a regression.
+    parser.add_argument("--threshold", type=float, default=0.6, help="allowed slowdown, 0.6 = 60%%")
+    parser.add_argument("--no-normalize", action="store_true",
+                        help="compare raw times instead of times relative to the calibration loop")
+    parser.add_argument("--save-baseline", action="store_true", help=f"store the results as {BASELINE_PATH}")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Failure paths of the loop (e.g. the default sensor not existing here) should not flood the output.
+    logging.basicConfig(level=logging.ERROR)
+
+    if args.worker:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(_run_process(args.filter, max(1, args.repeat), max(0.001, args.min_run_s)), f)
+        return
+
+    current = run(args.filter, repeat=max(1, args.repeat), rounds=max(1, args.rounds),
+                  min_run_s=max(0.001, args.min_run_s))
+    for path in ([args.output] if args.output else []) + ([BASELINE_PATH] if args.save_baseline else []):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"results written to {path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold, normalize=not args.no_normalize)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than {args.threshold:.0%} over baseline: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
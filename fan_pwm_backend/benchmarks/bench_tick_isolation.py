@@ -0,0 +1,147 @@
+# benchmarks/bench_tick_isolation.py
+#
+# Runs the application (startup, control loop thread, shutdown) on the simulated backend and drives /status
+# through the ASGI app while a control loop tick is blocked for --block-ms (as a hung sysfs read or a slow
+# SQLite write would). Request latency has to stay flat: ticks run on their own thread, so a blocked tick
+# must not delay the event loop. Then shuts down while a tick is blocked for longer than the shutdown timeout
+# and checks that the database is never closed under the running loop thread. Exits non-zero if a check
+# fails. Run from fan_pwm_backend/:
+#
+#   python -m benchmarks.bench_tick_isolation --block-ms 500
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+
+async def _get(app: Any, path: str) -> Tuple[int, float]:
+    # One GET through the ASGI app; returns the status code and the latency in ms.
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+    }
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    t0 = time.perf_counter()
+    await app(scope, receive, send)
+    return messages[0]["status"], (time.perf_counter() - t0) * 1000.0
+
+
+async def _sample(app: Any, seconds: float, interval_s: float) -> List[float]:
+    latencies: List[float] = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        status, ms = await _get(app, "/status")
+        if status != 200:
+            raise RuntimeError(f"/status returned {status}")
+        latencies.append(ms)
+        await asyncio.sleep(interval_s)
+    return latencies
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, bool]:
+    from app import main as app_main
+    from app.services.runtime_state import RuntimeState
+
+    app = app_main.app
+    await app.router.startup()
+    loop = app_main._control_loop
+    assert loop is not None
+
+    # Block the next tick(s) on request.
+    block = threading.Event()
+    entered = threading.Event()
+    block_s = [args.block_ms / 1000.0]
+    original_tick = loop._tick
+
+    def blocking_tick() -> None:
+        if block.is_set():
+            entered.set()
+            time.sleep(block_s[0])
+        original_tick()
+
+    loop._tick = blocking_tick  # type: ignore[method-assign]
+
+    while RuntimeState.status().seq < 2:
+        await asyncio.sleep(0.01)
+
+    window_s = args.block_ms / 1000.0 * 0.8
+    normal = await _sample(app, window_s, 0.005)
+
+    block.set()
+    await asyncio.to_thread(entered.wait, 5.0)
+    seq_before = RuntimeState.status().seq
+    blocked = await _sample(app, window_s, 0.005)
+    # Nothing was published while sampling: the tick really was blocked the whole time.
+    tick_was_blocked = entered.is_set() and RuntimeState.status().seq == seq_before
+
+    # Shut down while a tick is blocked past the shutdown timeout: the database must outlive the loop thread.
+    close_order: List[bool] = []
+    original_close = app_main._db.close
+
+    def recording_close() -> None:
+        close_order.append(loop._thread is not None and loop._thread.is_alive())
+        original_close()
+
+    app_main._db.close = recording_close  # type: ignore[method-assign]
+    block_s[0] = args.shutdown_block_ms / 1000.0
+    entered.clear()
+    await asyncio.to_thread(entered.wait, 5.0)
+    t0 = time.perf_counter()
+    await app.router.shutdown()
+    shutdown_ms = (time.perf_counter() - t0) * 1000.0
+    # The loop thread still finishes its exit path (event flush, fans disabled) on the open database.
+    thread_exited = await asyncio.to_thread(loop.join, args.shutdown_block_ms / 1000.0 + 5.0)
+    if not close_order:
+        original_close()
+
+    p = lambda xs, q: sorted(xs)[min(len(xs) - 1, int(len(xs) * q))]  # noqa: E731
+    print(f"tick blocked for {args.block_ms:g}ms")
+    for name, xs in (("normal", normal), ("blocked", blocked)):
+        print(f"{name:8s}: {len(xs):4d} requests, p50={statistics.median(xs):6.2f}ms p99={p(xs, 0.99):6.2f}ms "
+              f"max={max(xs):6.2f}ms")
+    print(f"shutdown : {shutdown_ms:.0f}ms with a tick blocked for {args.shutdown_block_ms:g}ms, database "
+          f"{'closed under the running loop thread' if any(close_order) else 'left open for the loop thread'}")
+
+    return {
+        "tick was blocked while sampling": tick_was_blocked,
+        f"blocked p99 <= {args.max_p99_ms:g}ms": p(blocked, 0.99) <= args.max_p99_ms,
+        f"blocked max <= {args.max_ms:g}ms": max(blocked) <= args.max_ms,
+        "blocked p50 within 3x of normal (+1ms)": statistics.median(blocked) <= 3 * statistics.median(normal) + 1.0,
+        "database not closed under the running loop thread": not any(close_order),
+        "loop thread exited": thread_exited,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="/status latency while a control loop tick is blocked")
+    parser.add_argument("--block-ms", type=float, default=500.0, help="how long the tick blocks")
+    parser.add_argument("--max-p99-ms", type=float, default=20.0)
+    parser.add_argument("--max-ms", type=float, default=50.0)
+    parser.add_argument("--shutdown-block-ms", type=float, default=6000.0,
+                        help="tick blocked during shutdown (longer than the 5s shutdown timeout)")
+    args = parser.parse_args()
+
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="fan-tick-isolation-")
+    os.environ["HARDWARE_BACKEND"] = "simulated"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    checks = asyncio.run(_run(args))
+    for name, ok in checks.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()